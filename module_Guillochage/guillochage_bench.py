@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+Banc de performance du moteur (sans interface) : calcul, découpe, exports SVG / DXF
+Exemple : python guillochage_bench.py -o bench.json --compare bench_v1.json
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from guillochage_engine import GuillochageEngine, np
+from guillochage_io import GuillochageIO
+
+# Format du fichier de résultats (à incrémenter si la structure change)
+BENCH_FORMAT = 1
+
+TIERS = {"faible": "Faible (Rapide)", "moyenne": "Moyenne", "haute": "Haute", "ultra": "Ultra (Export)"}
+
+# Brut de référence : cadran rond de 40 mm
+BRUT = {"type_index": 0, "dim1": 40.0, "dim2": 40.0, "radius": 0.0}
+BRUT_RECT = {"type_index": 1, "dim1": 44.0, "dim2": 36.0, "radius": 6.0}
+
+# Paramètres globaux d'un calque neuf (voir CalqueRow)
+DEFAULT_GLOBAL = {
+    "traj_type": "Ligne Droite", "wave_type": "Sinus", "preset": "Défaut",
+    "nb_lines": 12.0, "amplitude": 2.0, "invert": False, "height": 10.0,
+    "period": 1.0, "phase": 0.0, "rotation": 0.0, "pos_x": 0.0, "pos_y": 0.0,
+    "thickness": 1.0, "margin_in": 0.0, "margin_out": 0.0,
+    "flambage": False, "amp_start": 1.0, "amp_end": 3.0, "resolution": "Moyenne",
+    "mirror_h": False, "mirror_v": False
+}
+
+
+# --- PROJETS DE RÉFÉRENCE ---
+def make_layer(name, params, resolution):
+    g = dict(DEFAULT_GLOBAL)
+    g.update(params)
+    g["resolution"] = resolution
+    return {"name": name, "color": "#000000", "visible": True, "locked": False, "data": {"global": g, "lines": []}}
+
+def scenarios(tiers):
+    """(nom, palier, calques) : un projet par préréglage livré, plus un projet avec toutes les trajectoires"""
+    lib = os.path.join(current_dir, "lib_courbes")
+    presets = []
+    for path in sorted(glob.glob(os.path.join(lib, "Prereglages", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f: presets.append((os.path.splitext(os.path.basename(path))[0], json.load(f).get("params", {})))
+    trajs = sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(lib, "Trajectoires", "*.py")))
+    for tier in tiers:
+        resolution = TIERS[tier]
+        for name, params in presets:
+            yield name, tier, [make_layer(name, params, resolution)]
+        yield "trajectoires", tier, [make_layer(t, {"traj_type": t, "nb_lines": 12.0}, resolution) for t in trajs]
+
+
+# --- MESURES ---
+def _best(fn, repeat):
+    """Meilleur temps sur `repeat` essais (le moins perturbé par la machine) et dernier résultat"""
+    best, result = math.inf, None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t)
+    return best, result
+
+def _peak_mb(fn):
+    """Pic mémoire Python pendant fn (passe séparée : tracemalloc fausse les temps)"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+def bench_scenario(name, tier, layers, repeat, vectorized, memory, tmp_dir):
+    # Moteur neuf à chaque essai : on mesure le calcul, pas le cache
+    calc = lambda: GuillochageEngine(vectorized=vectorized).calculate_geometry(layers, BRUT)
+    calc_s, geo = _best(calc, repeat)
+    result = {"scenario": name, "tier": tier, "layers": len(layers), "segments": len(geo), "points": geo.point_count,
+              "calc_s": calc_s, "points_per_s": geo.point_count / calc_s if calc_s > 0 else None,
+              "geometry_bytes": geo.nbytes}
+    if memory: result["peak_mb"] = _peak_mb(calc)
+
+    for fmt, export in (("svg", GuillochageIO.export_svg), ("dxf", GuillochageIO.export_dxf)):
+        path = os.path.join(tmp_dir, f"{name}_{tier}.{fmt}")
+        result[f"{fmt}_s"], _ = _best(lambda: export(path, geo, BRUT), repeat)
+        result[f"{fmt}_bytes"] = os.path.getsize(path)
+        os.remove(path)
+    return result
+
+def bench_clip(repeat, vectorized, n_points=200000):
+    """Découpe d'une spirale dense qui déborde du brut (rond et rectangle arrondi)"""
+    engine = GuillochageEngine(vectorized=vectorized)
+    pts = []
+    for i in range(n_points):
+        a = i * 0.01
+        r = 0.0002 * i
+        pts.append((r * math.cos(a), r * math.sin(a)))
+    results = []
+    for label, brut in (("cercle", BRUT), ("rectangle", BRUT_RECT)):
+        is_circle = brut["type_index"] == 0
+        clip = lambda: engine._clip_polyline(pts, is_circle, brut["dim1"], brut["dim2"], brut["radius"])
+        clip_s, segments = _best(clip, repeat)
+        results.append({"brut": label, "points": n_points, "segments": len(segments), "clip_s": clip_s,
+                        "points_per_s": n_points / clip_s if clip_s > 0 else None})
+    return results
+
+
+# --- RAPPORT ---
+def run(tiers, repeat=3, vectorized=True, memory=True, log=print):
+    with open(os.path.join(current_dir, "info.json"), "r", encoding="utf-8-sig") as f: version = json.load(f).get("version")
+    meta = {"format": BENCH_FORMAT, "module_version": version, "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(), "platform": platform.platform(), "numpy": np.__version__ if np is not None else None,
+            "vectorized": bool(vectorized and np is not None), "repeat": repeat, "tiers": list(tiers)}
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, tier, layers in scenarios(tiers):
+            r = bench_scenario(name, tier, layers, repeat, vectorized, memory, tmp_dir)
+            results.append(r)
+            log(f"{name:<14} {tier:<8} {r['points']:>9} pts  calcul {r['calc_s']*1000:8.1f} ms  "
+                f"svg {r['svg_s']*1000:7.1f} ms  dxf {r['dxf_s']*1000:7.1f} ms"
+                + (f"  pic {r['peak_mb']:.1f} Mo" if memory else ""))
+    clip = bench_clip(repeat, vectorized)
+    for c in clip: log(f"découpe {c['brut']:<10} {c['points']} pts  {c['clip_s']*1000:.1f} ms")
+    return {"meta": meta, "results": results, "clip": clip}
+
+def compare(current, reference, log=print, threshold=1.10):
+    """Rapports de temps actuel / référence ; renvoie les mesures plus lentes que threshold"""
+    ref = {(r["scenario"], r["tier"]): r for r in reference.get("results", [])}
+    slower = []
+    for r in current["results"]:
+        old = ref.get((r["scenario"], r["tier"]))
+        if not old: continue
+        parts = []
+        for key in ("calc_s", "svg_s", "dxf_s"):
+            if old.get(key):
+                ratio = r[key] / old[key]
+                parts.append(f"{key[:-2]} x{ratio:.2f}")
+                if ratio > threshold: slower.append((r["scenario"], r["tier"], key, ratio))
+        log(f"{r['scenario']:<14} {r['tier']:<8} " + "  ".join(parts))
+    ref_clip = {c["brut"]: c for c in reference.get("clip", [])}
+    for c in current["clip"]:
+        old = ref_clip.get(c["brut"])
+        if old and old.get("clip_s"):
+            ratio = c["clip_s"] / old["clip_s"]
+            log(f"découpe {c['brut']:<10} x{ratio:.2f}")
+            if ratio > threshold: slower.append(("découpe", c["brut"], "clip_s", ratio))
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de performance du moteur Guillochage")
+    parser.add_argument("-o", "--output", help="fichier de résultats JSON")
+    parser.add_argument("--tiers", default="faible,moyenne,haute,ultra", help="paliers de résolution (faible,moyenne,haute,ultra)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="essais par mesure (on garde le meilleur)")
+    parser.add_argument("--scalar", action="store_true", help="force le calcul point par point (sans NumPy)")
+    parser.add_argument("--no-memory", action="store_true", help="saute la mesure du pic mémoire")
+    parser.add_argument("--compare", help="résultats de référence (JSON) à comparer")
+    parser.add_argument("--threshold", type=float, default=1.10, help="ralentissement signalé au-delà de ce rapport")
+    args = parser.parse_args(argv)
+
+    tiers = [t.strip().lower() for t in args.tiers.split(",") if t.strip()]
+    unknown = [t for t in tiers if t not in TIERS]
+    if unknown:
+        print(f"Palier inconnu : {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    report = run(tiers, max(1, args.repeat), not args.scalar, not args.no_memory)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: json.dump(report, f, indent=4)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f: reference = json.load(f)
+        slower = compare(report, reference, threshold=args.threshold)
+        if slower:
+            print(f"{len(slower)} mesure(s) plus lente(s) que la référence (x{args.threshold:.2f})")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
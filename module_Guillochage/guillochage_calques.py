@@ -29,27 +29,21 @@ class ToolTip:
             self.tip_window = None
 
 class CalqueRow(tk.Frame):
+    # Identifiant stable des calques (réconciliation au rechargement / annuler)
+    _next_uid = 1
+
     def __init__(self, parent, panel_manager, name="Nouveau Calque", color="#ff0000", data=None):
         super().__init__(parent, bg="#2d2d30", pady=1)
         self.manager = panel_manager
+        self.uid = CalqueRow._next_uid
+        CalqueRow._next_uid += 1
         self.name = name
         self.color = color 
         
         if data:
             self.data = data
         else:
-            self.data = {
-                "global": {
-                    "traj_type": "Ligne Droite", "wave_type": "Sinus", "preset": "Défaut",
-                    "nb_lines": 12.0, "amplitude": 2.0, "invert": False, "height": 10.0,
-                    "period": 1.0, "phase": 0.0, "rotation": 0.0, "pos_x": 0.0, "pos_y": 0.0,
-                    "thickness": 1.0, "margin_in": 0.0, "margin_out": 0.0,
-                    "flambage": False, "amp_start": 1.0, "amp_end": 3.0, "resolution": "Moyenne",
-                    "mirror_h": False, "mirror_v": False
-                },
-                "lines": []
-            }
-            self.regenerate_lines()
+            self.reset_data()
 
         self.is_visible = True
         self.btn_eye = tk.Button(self, text="👁", command=self.toggle_visible, bg="#2d2d30", fg="#d4d4d4", bd=0, width=2, cursor="hand2")
@@ -73,6 +67,32 @@ class CalqueRow(tk.Frame):
         self.entry_name.bind("<KeyRelease>", self.on_rename_typing)
         self.bind("<Button-1>", self.select_me)
 
+    def new_uid(self):
+        """Uid neuf (la ligne reprend un calque dont l'uid manque ou est déjà pris)"""
+        self.uid = CalqueRow._next_uid
+        CalqueRow._next_uid += 1
+
+    def adopt_uid(self, uid):
+        """Reprend l'uid d'un état chargé (les suivants ne pourront pas le réutiliser)"""
+        if not isinstance(uid, int): return
+        self.uid = uid
+        CalqueRow._next_uid = max(CalqueRow._next_uid, uid + 1)
+
+    def reset_data(self):
+        """Paramètres d'un calque neuf"""
+        self.data = {
+            "global": {
+                "traj_type": "Ligne Droite", "wave_type": "Sinus", "preset": "Défaut",
+                "nb_lines": 12.0, "amplitude": 2.0, "invert": False, "height": 10.0,
+                "period": 1.0, "phase": 0.0, "rotation": 0.0, "pos_x": 0.0, "pos_y": 0.0,
+                "thickness": 1.0, "margin_in": 0.0, "margin_out": 0.0,
+                "flambage": False, "amp_start": 1.0, "amp_end": 3.0, "resolution": "Moyenne",
+                "mirror_h": False, "mirror_v": False
+            },
+            "lines": []
+        }
+        self.regenerate_lines()
+
     def regenerate_lines(self):
         try: nb = int(self.data["global"]["nb_lines"])
         except: nb = 1
@@ -327,6 +347,7 @@ class CalquesPanel:
         state_list = []
         for row in self.rows:
             layer_state = {
+                "uid": row.uid,
                 "name": row.var_name.get(),
                 "color": row.color,
                 "visible": row.is_visible,
@@ -337,28 +358,86 @@ class CalquesPanel:
         return state_list
 
     def load_all_layers_state(self, state_list):
-        for row in self.rows: row.destroy()
-        self.rows = []
-        self.selected_row = None
+        """
+        Réconciliation : les calques sont appariés aux lignes existantes par uid (sinon dans l'ordre),
+        mis à jour sur place ; seules les lignes en trop ou manquantes sont détruites ou créées.
+        """
         self.color_index = 0
-        
         if not state_list:
+            for row in self.rows: row.destroy()
+            self.rows = []
+            self.selected_row = None
             self.action_add()
             return
 
+        # Uid en double dans l'état (fichier retouché, collage) : les suivants reçoivent un uid neuf
+        seen, uids = set(), []
         for s in state_list:
-            name = s.get("name", "Calque")
-            color = s.get("color", "#ff0000")
-            data = s.get("data", None)
-            
-            row = CalqueRow(self.list_container, self, name, color, data)
-            row.set_visible(s.get("visible", True))
-            row.set_lock(s.get("locked", False))
-            
-            row.pack(fill="x", pady=1)
-            self.rows.append(row)
-            
-        if self.rows: self.select_row(self.rows[0])
+            uid = s.get("uid")
+            if not isinstance(uid, int) or uid in seen: uid = None
+            else: seen.add(uid)
+            uids.append(uid)
+        CalqueRow._next_uid = max([CalqueRow._next_uid] + [uid + 1 for uid in seen])
+
+        # Appariement par uid ; une ligne (même à uid dupliqué) n'est appariée qu'une fois
+        by_uid = {}
+        for row in self.rows: by_uid.setdefault(row.uid, []).append(row)
+        matched = [by_uid[uid].pop(0) if uid is not None and by_uid.get(uid) else None for uid in uids]
+        taken = {id(row) for row in matched if row is not None}
+        spare = [row for row in self.rows if id(row) not in taken]
+
+        new_rows, selection_changed = [], False
+        for s, uid, row in zip(state_list, uids, matched):
+            if row is None and spare:
+                # Calque sans correspondance (fichier, ancien état) : une ligne libre est réutilisée
+                row = spare.pop(0)
+                if uid is None: row.new_uid()
+                else: row.adopt_uid(uid)
+                # Calque sans "data" : paramètres d'un calque neuf, pas ceux du calque précédent de la ligne
+                if not s.get("data"):
+                    row.reset_data()
+                    if row is self.selected_row: selection_changed = True
+            if row is None:
+                row = CalqueRow(self.list_container, self, s.get("name", "Calque"), s.get("color", "#ff0000"), s.get("data", None))
+                if uid is not None: row.adopt_uid(uid)
+                row.set_visible(s.get("visible", True))
+                row.set_lock(s.get("locked", False))
+            elif self._update_row(row, s) and row is self.selected_row:
+                selection_changed = True
+            new_rows.append(row)
+
+        for row in spare:
+            if row is self.selected_row: self.selected_row = None
+            row.destroy()
+        if new_rows != self.rows:
+            self.rows = new_rows
+            self.refresh_view()
+
+        if self.selected_row is None: self.select_row(self.rows[0])
+        elif selection_changed: self.select_row(self.selected_row)
+
+    def _update_row(self, row, s):
+        """Met une ligne existante dans l'état s ; renvoie True si quelque chose a changé"""
+        name, color = s.get("name", "Calque"), s.get("color", "#ff0000")
+        visible, locked = s.get("visible", True), s.get("locked", False)
+        data = s.get("data", None)
+        changed = False
+        if name != row.var_name.get() or color != row.color:
+            row.update_visuals(name, color)
+            changed = True
+        if visible != row.is_visible: row.set_visible(visible)
+        if locked != row.is_locked: row.set_lock(locked)
+        if data is not None and data != row.data:
+            row.data = data
+            changed = True
+        return changed
+
+    def apply_layer_state(self, index, s):
+        """Annuler/Rétablir : remet un seul calque dans l'état donné, sans reconstruire les autres"""
+        if not (0 <= index < len(self.rows)): return
+        row = self.rows[index]
+        if s.get("uid") != row.uid: row.adopt_uid(s.get("uid"))
+        if self._update_row(row, s) and row is self.selected_row: self.select_row(row)
 
     def get_selected_layer_state(self):
         if self.selected_row:
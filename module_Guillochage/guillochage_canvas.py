@@ -3,7 +3,18 @@
 Module CanvasPanel - Affichage central du guillochage
 """
 import tkinter as tk
+from tkinter import ttk
 import math
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from guillochage_geometry import RenderGeometry
+from guillochage_perf import PerfStats
+from guillochage_raster import TILE_SIZE, TileCache, png_data, rasterize_tile, tile_bounds
 
 class CanvasPanel:
     def __init__(self, parent_frame):
@@ -21,11 +32,53 @@ class CanvasPanel:
         
         # Données sources
         self.brut_data = None
-        self.calculated_lines = []
+        self.calculated_lines = RenderGeometry()
         
         # État de surbrillance (Selection Zone 5)
         self.highlight_layer = None
         self.highlight_index = None
+
+        # Culling / niveau de détail : marge autour de la vue et taille de case de décimation (px)
+        self.cull_margin_px = 10
+        self.lod_pixel = 1.0
+        # Zoom relatif au-delà duquel la décimation d'un item est recalculée
+        self.lod_refresh_ratio = 2.0
+
+        # Scène retenue : items Tk par segment, style normal par ligne, transformation courante
+        self._seg_items = {}
+        self._seg_lod = {}
+        self._line_styles = {}
+        self._scene_view = (0.0, 0.0, 1.0)
+        self._geometry_dirty = True
+        # Géométrie dont les items de la scène sont issus (None : scène vide ou à refaire entièrement)
+        self._scene_geo = None
+
+        # Aperçu matriciel optionnel : tuiles d'images en cache par niveau de zoom
+        self.raster_mode = False
+        self.tile_cache = TileCache()
+        self._tile_items = {}
+        self._tiles_zoom = None
+        self._tiles_origin = (0.0, 0.0)
+        self._rgb_cache = {}
+
+        # Grille et brut persistants : clés de reconstruction et origine écran au dernier tracé
+        self._grid_key = None
+        self._brut_overlay_key = None
+        self._overlay_origin = (0.0, 0.0)
+
+        # Ordonnanceur de rendu : les invalidations sont regroupées en un rendu par image au plus
+        self.target_fps = 60
+        self._redraw_job = None
+        self._last_frame = 0.0
+        self._view_dirty = False
+        self._highlight_dirty = False
+        self._highlight_stale = set()   # (calque, ligne) dont le style est à réappliquer
+
+        # Mesures du dernier rendu et overlay de performance (⏱)
+        self.perf = PerfStats(category="canvas")
+        self.show_perf = False
+        self.stats_source = None        # callable -> bilan du dernier calcul moteur (dict) ou None
+        self.on_perf_toggle = None      # callable(actif), pour activer les mesures du moteur
         
         # Création du canvas
         self.canvas = tk.Canvas(self.parent, bg="#ffffff", highlightthickness=0)
@@ -47,6 +100,12 @@ class CanvasPanel:
         btn_c.pack(side="left", padx=1)
         btn_g = tk.Button(self.overlay_frame, text="#", command=self.toggle_grid, bg="#007acc", fg="white", bd=0, width=3)
         btn_g.pack(side="left", padx=1)
+        self.btn_perf = tk.Button(self.overlay_frame, text="⏱", command=self.toggle_perf, bg="#2d2d30", fg="#d4d4d4", bd=0, width=3)
+        self.btn_perf.pack(side="left", padx=1)
+
+        # Indicateur de calcul en cours (bas à gauche, masqué par défaut)
+        self.progress_bar = ttk.Progressbar(self.canvas, orient="horizontal", length=140, mode="determinate", maximum=1.0)
+        self.progress_visible = False
         
         self.pan_start_x = 0
         self.pan_start_y = 0
@@ -54,27 +113,90 @@ class CanvasPanel:
     def set_brut_data(self, data):
         self.brut_data = data
         if self.auto_fit_mode: self.fit_to_brut()
-        else: self.redraw()
+        else: self.invalidate(view=True)
 
     def set_calculated_lines(self, render_list):
+        old_geo = self.calculated_lines
         self.calculated_lines = render_list
-        self.redraw()
+        self._invalidate_tiles(old_geo, render_list)
+        self.invalidate(geometry=True)
+
+    def set_progress(self, fraction):
+        """Avancement du calcul (0..1) ; None masque l'indicateur"""
+        if fraction is None:
+            if self.progress_visible:
+                self.progress_bar.place_forget()
+                self.progress_visible = False
+            return
+        self.progress_bar["value"] = max(0.0, min(1.0, fraction))
+        if not self.progress_visible:
+            self.progress_bar.place(x=10, rely=1.0, y=-10, anchor="sw")
+            self.progress_visible = True
 
     def set_highlight(self, layer_name, line_index):
-        """Définit quelle ligne doit être mise en surbrillance"""
+        """Définit quelle ligne doit être mise en surbrillance (seuls ses items et ceux de l'ancienne changent)"""
+        self._highlight_stale.add((self.highlight_layer, self.highlight_index))
+        self._highlight_stale.add((layer_name, line_index))
         self.highlight_layer = layer_name
         self.highlight_index = line_index
-        self.redraw()
+        self.invalidate(highlight=True)
+
+    def _apply_highlight(self):
+        stale, self._highlight_stale = self._highlight_stale, set()
+        if self._use_tiles():
+            self._draw_highlight_overlay(self.canvas.winfo_width(), self.canvas.winfo_height())
+            return
+        for layer_name, line_index in stale: self._restyle_line(layer_name, line_index)
+
+    def toggle_perf(self):
+        """Affiche / masque les mesures (rendu du canvas et dernier calcul du moteur)"""
+        self.show_perf = not self.show_perf
+        self.perf.enabled = self.show_perf
+        self.btn_perf.config(bg="#007acc" if self.show_perf else "#2d2d30", fg="white" if self.show_perf else "#d4d4d4")
+        if self.on_perf_toggle: self.on_perf_toggle(self.show_perf)
+        if not self.show_perf: self.canvas.delete("perf")
+        self.invalidate(view=True)
+
+    def get_stats(self):
+        """Mesures du dernier rendu : étapes, items du canvas, segments visibles"""
+        return self.perf.snapshot()
+
+    def _draw_perf_overlay(self):
+        self.canvas.delete("perf")
+        lines = ["CANVAS (dernier rendu)"] + self.perf.summary_lines()
+        stats = self.stats_source() if self.stats_source else None
+        if stats:
+            lines.append("")
+            lines.append("MOTEUR (aperçu)" if stats.get("preview") else "MOTEUR")
+            def stages(d): return {k: [v["s"], v["calls"]] for k, v in d.items()}
+            summary = PerfStats()
+            summary.stages, summary.counters = stages(stats["stages"]), stats["counters"]
+            lines += summary.summary_lines(limit=10)
+            # Calques les plus lents
+            slow = sorted(stats["layers"].items(), key=lambda kv: -sum(v["s"] for v in kv[1]["stages"].values()))[:5]
+            for name, entry in slow:
+                total = sum(v["s"] for v in entry["stages"].values())
+                if total > 0: lines.append(f"  {name[:18]:<18}{total * 1000:8.1f} ms")
+        text = self.canvas.create_text(12, 12, text="\n".join(lines), anchor="nw", fill="#d4d4d4", font=("Consolas", 8), tags="perf")
+        bbox = self.canvas.bbox(text)
+        if bbox:
+            bg = self.canvas.create_rectangle(bbox[0] - 4, bbox[1] - 4, bbox[2] + 4, bbox[3] + 4, fill="#1e1e1e", outline="#3e3e42", tags="perf")
+            self.canvas.tag_lower(bg, text)
+        self.canvas.tag_raise("perf")
 
     def toggle_grid(self):
         self.show_grid = not self.show_grid
-        self.redraw()
+        self.invalidate(view=True)
         
     def set_25d_mode(self, active):
         self.render_mode_25d = active
         bg_color = "#e0e0e0" if active else "#ffffff"
         self.canvas.config(bg=bg_color)
-        self.redraw()
+        # Les tuiles ne rendent pas les flancs 2.5D : le mode vectoriel reprend la main
+        self._clear_scene()
+        self.canvas.delete("tile", "hl")
+        self._tile_items = {}
+        self.invalidate(geometry=True)
 
     def fit_to_brut(self):
         if not self.brut_data: return
@@ -90,12 +212,12 @@ class CanvasPanel:
                 self.zoom_level = min((w_c * 0.8) / d1, (h_c * 0.8) / d2)
                 self.offset_x, self.offset_y = 0, 0
                 self.auto_fit_mode = True
-                self.redraw()
+                self.invalidate(view=True)
         except: pass
 
     def on_resize(self, event):
         if self.auto_fit_mode: self.fit_to_brut()
-        else: self.redraw()
+        else: self.invalidate(view=True)
 
     def reset_view_to_fit(self):
         self.auto_fit_mode = True
@@ -110,13 +232,13 @@ class CanvasPanel:
         self.offset_x += event.x - self.pan_start_x
         self.offset_y += event.y - self.pan_start_y
         self.pan_start_x, self.pan_start_y = event.x, event.y
-        self.redraw()
+        self.invalidate(view=True)
 
     def do_zoom(self, event, factor=None):
         self.auto_fit_mode = False
         scale = 1.1 if (factor > 0 if factor else event.delta > 0) else 0.9
         self.zoom_level = max(0.01, min(500.0, self.zoom_level * scale))
-        self.redraw()
+        self.invalidate(view=True)
 
     def to_screen_x(self, x):
         return self.canvas.winfo_width() / 2 + x * self.zoom_level + self.offset_x
@@ -145,54 +267,458 @@ class CanvasPanel:
         pts.extend([pts[0], pts[1]])
         return pts
 
-    def redraw(self, event=None):
-        self.canvas.delete("all")
-        w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
+    # --- CULLING ET NIVEAU DE DÉTAIL ---
+    def _view_transform(self, w, h):
+        """(origine x, origine y, zoom) : écran = origine + (x, -y) * zoom"""
+        return (w / 2 + self.offset_x, h / 2 + self.offset_y, self.zoom_level)
 
-        if self.show_grid: self.draw_grid(w, h)
-        if self.brut_data: self.draw_brut()
+    def _visible_window(self, w, h):
+        """Fenêtre visible en mm (xmin, ymin, xmax, ymax), élargie de la marge de culling"""
+        ox, oy, zoom = self._view_transform(w, h)
+        margin = self.cull_margin_px / zoom
+        return (-ox / zoom - margin, (oy - h) / zoom - margin, (w - ox) / zoom + margin, oy / zoom + margin)
 
-        for obj in self.calculated_lines:
-            pts = obj.get("points", [])
-            if len(pts) < 2: continue
-            
-            # Paramètres de base
-            base_col = obj.get("color", "black")
-            base_thick = float(obj.get("thickness", 1.0))
-            
-            # --- LOGIQUE SURBRILLANCE (Zone 5 -> Canvas) ---
-            is_highlighted = False
-            if self.highlight_layer is not None and self.highlight_index is not None:
-                if obj.get("layer_name") == self.highlight_layer and obj.get("line_index") == self.highlight_index:
-                    is_highlighted = True
-            
-            # Si surbrillance : Orange + plus large
-            if is_highlighted:
-                base_col = "#ffae00"  # Orange vif
-                base_thick = max(2.5, base_thick + 2.0)
-
-            scr_pts = []
-            for px, py in pts:
-                scr_pts.extend([self.to_screen_x(px), self.to_screen_y(py)])
-            
-            if self.render_mode_25d:
-                # En mode 2.5D, on garde le gris pour les flancs, mais on peut colorer le fond
-                flanc_width = max(2.0, base_thick * 4)
-                self.canvas.create_line(scr_pts, fill="#888888", width=flanc_width, capstyle=tk.ROUND, joinstyle=tk.ROUND)
-                
-                fond_col = base_col # Le fond prend la couleur (Orange si sélectionné)
-                self.canvas.create_line(scr_pts, fill=fond_col, width=1.0, capstyle=tk.ROUND, joinstyle=tk.ROUND)
+    def _visible_indices(self, w, h):
+        """Index des segments dont la boîte englobante touche la vue"""
+        geo = self.calculated_lines
+        if not geo: return []
+        wx0, wy0, wx1, wy1 = self._visible_window(w, h)
+        bx0, by0, bx1, by1 = geo.segment_bounds()
+        if np is not None:
+            return np.flatnonzero((bx1 >= wx0) & (bx0 <= wx1) & (by1 >= wy0) & (by0 <= wy1)).tolist()
+        return [i for i in range(len(geo)) if not (bx1[i] < wx0 or bx0[i] > wx1 or by1[i] < wy0 or by0[i] > wy1)]
+
+    def _screen_points(self, indices, w, h):
+        """
+        Coordonnées écran entrelacées des segments demandés, dans le même ordre.
+        Les sommets consécutifs tombant dans la même case de lod_pixel pixels sont fusionnés
+        (extrémités conservées) : environ un sommet par pixel envoyé au canvas.
+        """
+        if not indices: return []
+        geo = self.calculated_lines
+        ox, oy, zoom = self._view_transform(w, h)
+        cell = self.lod_pixel
+
+        if np is not None:
+            sel = np.asarray(indices, dtype=np.int64)
+            offs = np.frombuffer(geo.offsets, dtype=np.int64)
+            starts, lengths = offs[sel], offs[sel + 1] - offs[sel]
+            firsts = np.cumsum(lengths) - lengths
+            idx = np.arange(lengths.sum()) + np.repeat(starts - firsts, lengths)
+            X, Y = geo.as_numpy()
+            sx = X[idx] * zoom + ox
+            sy = oy - Y[idx] * zoom
+            del X, Y
+            gx, gy = np.floor(sx / cell), np.floor(sy / cell)
+            keep = np.ones(len(idx), dtype=bool)
+            keep[1:] = (gx[1:] != gx[:-1]) | (gy[1:] != gy[:-1])
+            keep[firsts] = True
+            keep[firsts + lengths - 1] = True
+            kept_per_seg = np.add.reduceat(keep.astype(np.int64), firsts)
+            flat = np.empty(2 * int(kept_per_seg.sum()))
+            flat[0::2] = sx[keep]
+            flat[1::2] = sy[keep]
+            flat = flat.tolist()
+            result, start = [], 0
+            for end in (2 * np.cumsum(kept_per_seg)).tolist():
+                result.append(flat[start:end])
+                start = end
+            return result
+
+        result = []
+        offsets = geo.offsets
+        for i in indices:
+            s, e = offsets[i], offsets[i + 1]
+            pts, last_cell = [], None
+            for j in range(s, e):
+                px, py = geo.xs[j] * zoom + ox, oy - geo.ys[j] * zoom
+                c = (math.floor(px / cell), math.floor(py / cell))
+                if c != last_cell or j == e - 1:
+                    pts.extend((px, py))
+                    last_cell = c
+            result.append(pts)
+        return result
+
+    # --- SCÈNE RETENUE (items Tk créés une fois, puis déplacés / mis à l'échelle) ---
+    def _line_style(self, lid, line_index, color, thickness):
+        """Style effectif d'une ligne (surbrillance comprise) : (couleur, épaisseur)"""
+        layer_name = self.calculated_lines.layer_names[lid]
+        if self.highlight_index is not None and layer_name == self.highlight_layer and line_index == self.highlight_index:
+            return "#ffae00", max(2.5, thickness + 2.0)  # Orange vif + plus large
+        return color, thickness
+
+    def _create_segment_items(self, i, scr_pts):
+        geo = self.calculated_lines
+        lid, line_index = geo.seg_layer[i], geo.seg_line[i]
+        color, thickness = geo.styles[geo.seg_style[i]]
+        self._line_styles[(lid, line_index)] = (color, thickness)
+        col, thick = self._line_style(lid, line_index, color, thickness)
+        tag_line = f"ln{lid}_{line_index}"
+        
+        if self.render_mode_25d:
+            # En mode 2.5D, on garde le gris pour les flancs, mais on peut colorer le fond
+            flanc = self.canvas.create_line(scr_pts, fill="#888888", width=max(2.0, thick * 4), capstyle=tk.ROUND, joinstyle=tk.ROUND, tags=("geo", f"fl{lid}_{line_index}"))
+            fond = self.canvas.create_line(scr_pts, fill=col, width=1.0, capstyle=tk.ROUND, joinstyle=tk.ROUND, tags=("geo", tag_line))
+            self._seg_items[i] = (flanc, fond)
+        else:
+            try:
+                self._seg_items[i] = (self.canvas.create_line(scr_pts, fill=col, width=thick, capstyle=tk.ROUND, joinstyle=tk.ROUND, tags=("geo", tag_line)),)
+            except: self._seg_items[i] = ()
+        self._seg_lod[i] = self.zoom_level
+
+    def _restyle_line(self, layer_name, line_index):
+        """Réapplique le style d'une ligne à ses items existants (2 itemconfig au plus)"""
+        if layer_name is None or line_index is None: return
+        lid = self.calculated_lines.layer_index(layer_name)
+        style = self._line_styles.get((lid, line_index))
+        if style is None: return
+        col, thick = self._line_style(lid, line_index, *style)
+        if self.render_mode_25d:
+            self.canvas.itemconfig(f"fl{lid}_{line_index}", width=max(2.0, thick * 4))
+            self.canvas.itemconfig(f"ln{lid}_{line_index}", fill=col)
+        else:
+            self.canvas.itemconfig(f"ln{lid}_{line_index}", fill=col, width=thick)
+
+    def _retag_segment_items(self, items, lid, line_index):
+        """Tags d'un segment conservé dont le calque a changé d'index dans la nouvelle géométrie"""
+        if len(items) == 2:
+            self.canvas.itemconfig(items[0], tags=("geo", f"fl{lid}_{line_index}"))
+        if items:
+            self.canvas.itemconfig(items[-1], tags=("geo", f"ln{lid}_{line_index}"))
+
+    def _clear_scene(self):
+        self.canvas.delete("geo")
+        self._seg_items = {}
+        self._seg_lod = {}
+        self._line_styles = {}
+        self._scene_geo = None
+
+    @staticmethod
+    def _layer_segments(geo):
+        """{index de calque: index de ses segments, dans l'ordre}"""
+        groups = {}
+        for i, lid in enumerate(geo.seg_layer): groups.setdefault(lid, []).append(i)
+        return groups
+
+    def _unchanged_layers(self, old, new):
+        """
+        Noms des calques dont tous les éléments (par uid) ont la même version dans les deux géométries.
+        Les segments sont rangés par nom : un nom porté par un calque modifié n'est pas conservé.
+        """
+        old_v, new_v = old.layer_versions, new.layer_versions
+        if not old_v or not new_v: return set()
+        def by_name(versions):
+            groups = {}
+            for uid, (name, version) in versions.items(): groups.setdefault(name, []).append((uid, version))
+            return groups
+        old_g = by_name(old_v)
+        return {name for name, group in by_name(new_v).items() if old_g.get(name) == group}
+
+    def _remap_scene(self, old, new, names):
+        """
+        Items des calques inchangés renumérotés selon la nouvelle géométrie, les autres supprimés.
+        Renvoie les noms des calques effectivement conservés.
+        """
+        old_segs, new_segs = self._layer_segments(old), self._layer_segments(new)
+        items, lods, styles, kept = {}, {}, {}, set()
+        for name in names:
+            o_lid, n_lid = old.layer_index(name), new.layer_index(name)
+            if o_lid is None or n_lid is None: continue
+            o_idx, n_idx = old_segs[o_lid], new_segs[n_lid]
+            if len(o_idx) != len(n_idx): continue
+            kept.add(name)
+            for i, j in zip(o_idx, n_idx):
+                seg = self._seg_items.pop(i, None)
+                if seg is None: continue
+                if n_lid != o_lid: self._retag_segment_items(seg, n_lid, new.seg_line[j])
+                items[j] = seg
+                lods[j] = self._seg_lod.pop(i)
+            for (lid, line_index), style in self._line_styles.items():
+                if lid == o_lid: styles[(n_lid, line_index)] = style
+        for seg in self._seg_items.values():
+            for item in seg: self.canvas.delete(item)
+        self._seg_items, self._seg_lod, self._line_styles = items, lods, styles
+        return kept
+
+    def _restack_layers(self, old, new, kept):
+        """
+        Les items créés sont au-dessus des autres : l'ordre des calques est rétabli à partir
+        du premier calque refait (ou déplacé par rapport aux calques conservés qui le précèdent).
+        """
+        last = -1
+        for lid, name in enumerate(new.layer_names):
+            o_lid = old.layer_index(name) if name in kept else None
+            if o_lid is None or o_lid < last: break
+            last = o_lid
+        else: return
+        lines = {}
+        for j in sorted(self._seg_items):
+            if new.seg_layer[j] >= lid: lines.setdefault((new.seg_layer[j], new.seg_line[j]))
+        for l, line_index in lines:
+            if self.render_mode_25d: self.canvas.tag_raise(f"fl{l}_{line_index}")
+            self.canvas.tag_raise(f"ln{l}_{line_index}")
+
+    def _rebuild_geometry(self, w, h):
+        """
+        Nouvelle géométrie : les items des calques inchangés (même version pour chaque uid) sont conservés,
+        seuls ceux des calques modifiés sont refaits. Sans géométrie précédente comparable (premier rendu,
+        changement de mode, calcul sans versions), on repart d'une scène vide.
+        """
+        self._geometry_dirty = False
+        old, new = self._scene_geo, self.calculated_lines
+        self._scene_geo = new
+        names = self._unchanged_layers(old, new) if old is not None and self._seg_items else set()
+        if names:
+            kept = self._remap_scene(old, new, names)
+            # Items conservés : encore à l'ancienne transformation, la mise à jour de vue les recale
+            self._update_geometry_view(w, h)
+            self._restack_layers(old, new, kept)
+            return
+        self._clear_scene()
+        self._scene_geo = new
+        self._scene_view = self._view_transform(w, h)
+        indices = self._visible_indices(w, h)
+        for i, scr_pts in zip(indices, self._screen_points(indices, w, h)):
+            self._create_segment_items(i, scr_pts)
+
+    def _update_geometry_view(self, w, h):
+        """Pan / zoom : transformation des items existants, création des segments devenus visibles"""
+        ox, oy, zoom = self._view_transform(w, h)
+        pox, poy, pzoom = self._scene_view
+        visible = self._visible_indices(w, h)
+        # Segments sortis de la vue (marge de découpe comprise) : items supprimés avant la transformation,
+        # la scène reste bornée à la vue et scale/move("geo") ne coûtent que les segments visibles
+        keep = set(visible)
+        for i in [i for i in self._seg_items if i not in keep]:
+            for item in self._seg_items.pop(i): self.canvas.delete(item)
+            del self._seg_lod[i]
+        if zoom != pzoom:
+            f = zoom / pzoom
+            self.canvas.scale("geo", pox, poy, f, f)
+        if (ox, oy) != (pox, poy):
+            self.canvas.move("geo", ox - pox, oy - poy)
+        self._scene_view = (ox, oy, zoom)
+
+        # Segments visibles absents de la scène, ou dont la décimation ne correspond plus au zoom
+        ratio = self.lod_refresh_ratio
+        missing, stale = [], []
+        for i in visible:
+            lod = self._seg_lod.get(i)
+            if lod is None: missing.append(i)
+            elif zoom > lod * ratio or zoom * ratio < lod: stale.append(i)
+        for i, scr_pts in zip(missing, self._screen_points(missing, w, h)):
+            self._create_segment_items(i, scr_pts)
+        for i, scr_pts in zip(stale, self._screen_points(stale, w, h)):
+            for item in self._seg_items[i]: self.canvas.coords(item, scr_pts)
+            self._seg_lod[i] = zoom
+
+    # --- APERÇU MATRICIEL (TUILES) ---
+    def set_raster_mode(self, active):
+        """Aperçu en tuiles d'images au lieu d'un item Tk par segment"""
+        self.raster_mode = bool(active)
+        self._clear_scene()
+        self.canvas.delete("tile", "hl")
+        self._tile_items = {}
+        self.invalidate(geometry=True)
+
+    def _use_tiles(self):
+        return self.raster_mode and not self.render_mode_25d
+
+    def _rgb(self, color):
+        rgb = self._rgb_cache.get(color)
+        if rgb is None:
+            try: r, g, b = self.canvas.winfo_rgb(color)
+            except tk.TclError: r, g, b = 0, 0, 0
+            rgb = self._rgb_cache[color] = (r >> 8, g >> 8, b >> 8)
+        return rgb
+
+    def _invalidate_tiles(self, old_geo, new_geo):
+        """Nouvelle géométrie : seules les tuiles des calques modifiés sont à refaire"""
+        old_v, new_v = old_geo.layer_versions, new_geo.layer_versions
+        # Les tuiles connaissent les calques par leur nom : noms (ancien et nouveau) des calques modifiés
+        changed = {version[0] for lid in set(old_v) | set(new_v) if old_v.get(lid) != new_v.get(lid)
+                   for version in (old_v.get(lid), new_v.get(lid)) if version is not None}
+        if not old_v or not new_v:
+            # Géométrie sans versions (calcul externe) : tout est à refaire
+            self.tile_cache.clear()
+        else:
+            self.tile_cache.invalidate_layers(changed, new_geo.layer_bounds(changed), TILE_SIZE)
+        for key in [k for k in self._tile_items if self.tile_cache.get(k) is None]:
+            self.canvas.delete(self._tile_items.pop(key))
+
+    def _render_tile(self, key):
+        zoom, tx, ty = key
+        geo = self.calculated_lines
+        bx0, by0, bx1, by1 = tile_bounds(tx, ty, zoom, TILE_SIZE)
+        margin = self.cull_margin_px / zoom
+        wx0, wy0, wx1, wy1 = bx0 - margin, by0 - margin, bx1 + margin, by1 + margin
+        indices = []
+        if geo:
+            sx0, sy0, sx1, sy1 = geo.segment_bounds()
+            if np is not None:
+                indices = np.flatnonzero((sx1 >= wx0) & (sx0 <= wx1) & (sy1 >= wy0) & (sy0 <= wy1)).tolist()
             else:
-                try:
-                    self.canvas.create_line(scr_pts, fill=base_col, width=base_thick, capstyle=tk.ROUND, joinstyle=tk.ROUND)
-                except: pass
+                indices = [i for i in range(len(geo)) if not (sx1[i] < wx0 or sx0[i] > wx1 or sy1[i] < wy0 or sy0[i] > wy1)]
+        rgba = rasterize_tile(geo, indices, tx, ty, zoom, self._rgb, TILE_SIZE)
+        image = tk.PhotoImage(data=png_data(TILE_SIZE, TILE_SIZE, rgba), format="png")
+        layers = {geo.layer_names[geo.seg_layer[i]] for i in indices}
+        self.tile_cache.put(key, image, layers)
+        return image
+
+    def _update_tiles(self, w, h):
+        """Pose les tuiles visibles ; seules celles absentes du cache sont rendues"""
+        ox, oy, zoom = self._view_transform(w, h)
+        if zoom != self._tiles_zoom:
+            self.canvas.delete("tile")
+            self._tile_items = {}
+            self._tiles_zoom = zoom
+        elif (ox, oy) != self._tiles_origin:
+            self.canvas.move("tile", ox - self._tiles_origin[0], oy - self._tiles_origin[1])
+        self._tiles_origin = (ox, oy)
+
+        T = TILE_SIZE
+        visible = set()
+        for ty in range(math.floor(-oy / T), math.floor((h - oy) / T) + 1):
+            for tx in range(math.floor(-ox / T), math.floor((w - ox) / T) + 1):
+                key = (zoom, tx, ty)
+                visible.add(key)
+                if key in self._tile_items: continue
+                entry = self.tile_cache.get(key)
+                image = entry[0] if entry else self._render_tile(key)
+                self._tile_items[key] = self.canvas.create_image(ox + tx * T, oy + ty * T, image=image, anchor="nw", tags="tile")
+        # Tuiles sorties de la vue : l'item disparaît, l'image reste en cache
+        for key in [k for k in self._tile_items if k not in visible]:
+            self.canvas.delete(self._tile_items.pop(key))
+
+    def _draw_highlight_overlay(self, w, h):
+        """En mode tuiles, la ligne en surbrillance reste vectorielle par-dessus"""
+        self.canvas.delete("hl")
+        geo = self.calculated_lines
+        if self.highlight_index is None or not geo: return
+        lid = geo.layer_index(self.highlight_layer)
+        if lid is None: return
+        visible = self._visible_indices(w, h)
+        indices = [i for i in visible if geo.seg_layer[i] == lid and geo.seg_line[i] == self.highlight_index]
+        for i, scr_pts in zip(indices, self._screen_points(indices, w, h)):
+            color, thickness = geo.styles[geo.seg_style[i]]
+            col, thick = self._line_style(lid, self.highlight_index, color, thickness)
+            self.canvas.create_line(scr_pts, fill=col, width=thick, capstyle=tk.ROUND, joinstyle=tk.ROUND, tags="hl")
+        self.canvas.tag_raise("hl")
+
+    # --- CALQUES FIXES (GRILLE / BRUT) ---
+    def _brut_key(self):
+        if not self.brut_data: return None
+        return tuple(sorted((k, repr(v)) for k, v in self.brut_data.items()))
+
+    def _update_overlays(self, w, h):
+        """
+        Grille et brut restent sur le canvas : reconstruits seulement si le zoom, la taille
+        ou le brut changent (ou si le pan sort de la marge de la grille), sinon simplement déplacés.
+        """
+        ox, oy = self.to_screen_x(0), self.to_screen_y(0)
+        grid_key = (self.zoom_level, w, h) if self.show_grid else None
+        brut_key = (self.zoom_level, self._brut_key())
+        dx, dy = ox - self._overlay_origin[0], oy - self._overlay_origin[1]
+        rebuilt = False
+
+        # La grille est tracée sur 3x la vue : on peut la déplacer d'une largeur/hauteur avant de la refaire
+        if grid_key != self._grid_key or abs(dx) > w or abs(dy) > h:
+            self.canvas.delete("grid")
+            if grid_key is not None: self.draw_grid(w, h)
+            self._grid_key = grid_key
+            rebuilt = True
+        elif grid_key is not None and (dx or dy):
+            self.canvas.move("grid", dx, dy)
+
+        if brut_key != self._brut_overlay_key:
+            self.canvas.delete("brut")
+            if self.brut_data: self.draw_brut()
+            self._brut_overlay_key = brut_key
+            rebuilt = True
+        elif self.brut_data and (dx or dy):
+            self.canvas.move("brut", dx, dy)
+
+        self._overlay_origin = (ox, oy)
+        return rebuilt
+
+    # --- ORDONNANCEUR DE RENDU ---
+    def invalidate(self, view=False, highlight=False, geometry=False):
+        """
+        Marque ce qui doit être refait et planifie un rendu. Une rafale d'événements
+        (molette, glisser) ne produit qu'un rendu par image, au plus target_fps par seconde.
+        """
+        self._view_dirty |= view
+        self._highlight_dirty |= highlight
+        self._geometry_dirty |= geometry
+        if self._redraw_job is not None: return
+        frame = 1.0 / max(1, self.target_fps)
+        wait = self._last_frame + frame - time.perf_counter()
+        if wait > 0: self._redraw_job = self.canvas.after(int(wait * 1000) + 1, self._flush_redraw)
+        else: self._redraw_job = self.canvas.after_idle(self._flush_redraw)
+
+    def _flush_redraw(self):
+        self._redraw_job = None
+        self._last_frame = time.perf_counter()
+        if self._view_dirty or self._geometry_dirty:
+            self.redraw()
+        elif self._highlight_dirty:
+            self._apply_highlight()
+        self._view_dirty = self._highlight_dirty = False
+
+    def redraw(self, event=None):
+        """Rendu immédiat (les événements passent par invalidate)"""
+        perf = self.perf
+        if not perf.enabled: return self._redraw()
+        perf.reset()
+        t0 = time.perf_counter()
+        self._redraw()
+        perf.add("rendu", time.perf_counter() - t0)
+        perf.set("segments_scene", len(self._seg_items))
+        perf.set("items_geo", sum(len(items) for items in self._seg_items.values()))
+        perf.set("tuiles", len(self._tile_items))
+        perf.set("segments_total", len(self.calculated_lines))
+        # Mesures actives sans overlay : enregistrement d'une trace
+        if self.show_perf: self._draw_perf_overlay()
+
+    def _redraw(self):
+        # Surbrillance : restyle des items existants (le mode tuiles la redessine de lui-même ; une scène
+        # à refaire la réapplique ensuite, pour les items conservés)
+        if self._highlight_dirty and not (self._use_tiles() or self._geometry_dirty):
+            self._apply_highlight()
+        self._highlight_dirty = False
+        w, h = self.canvas.winfo_width(), self.canvas.winfo_height()
+        perf = self.perf
+        if perf.enabled: t0 = time.perf_counter()
+        overlays_rebuilt = self._update_overlays(w, h)
+        if perf.enabled:
+            t1 = time.perf_counter()
+            perf.add("grille_brut", t1 - t0, end=t1)
+
+        if self._use_tiles():
+            self._geometry_dirty = False
+            self._update_tiles(w, h)
+            self._draw_highlight_overlay(w, h)
+            stage = "tuiles"
+        elif self._geometry_dirty:
+            self._rebuild_geometry(w, h)
+            if self._highlight_stale: self._apply_highlight()
+            stage = "scene_complete"
+        else:
+            self._update_geometry_view(w, h)
+            stage = "scene_vue"
+        self._highlight_stale.clear()
+        if perf.enabled: perf.add(stage, time.perf_counter() - t1)
+        # Grille et brut sous les lignes (les items créés ensuite sont déjà au-dessus)
+        if overlays_rebuilt:
+            self.canvas.tag_lower("brut")
+            self.canvas.tag_lower("grid")
 
     def draw_brut(self):
         cx, cy = self.to_screen_x(0), self.to_screen_y(0)
         try:
             d1 = float(self.brut_data.get('dim1', 50)) * self.zoom_level
             d2 = float(self.brut_data.get('dim2', 50)) * self.zoom_level
-            style = {"fill": "", "outline": "#ff4444", "width": 2, "dash": (4, 4)}
+            style = {"fill": "", "outline": "#ff4444", "width": 2, "dash": (4, 4), "tags": "brut"}
             
             if "type_index" in self.brut_data:
                 is_circle = (self.brut_data["type_index"] == 0)
@@ -206,7 +732,7 @@ class CanvasPanel:
                 radius = float(self.brut_data.get("radius", 0.0)) * self.zoom_level
                 if radius > 0.5:
                     pts = self._get_rounded_rect_points(cx, cy, d1, d2, radius)
-                    if pts: self.canvas.create_line(pts, fill="#ff4444", width=2, dash=(4, 4))
+                    if pts: self.canvas.create_line(pts, fill="#ff4444", width=2, dash=(4, 4), tags="brut")
                     else: self.canvas.create_rectangle(cx - d1/2, cy - d2/2, cx + d1/2, cy + d2/2, **style)
                 else:
                     self.canvas.create_rectangle(cx - d1/2, cy - d2/2, cx + d1/2, cy + d2/2, **style)
@@ -222,23 +748,26 @@ class CanvasPanel:
                 break
         px_step = step_mm * self.zoom_level
 
-        start_k = math.floor((0 - cx) / px_step)
-        end_k   = math.ceil((w - cx) / px_step)
+        # Zone tracée : la vue plus une largeur/hauteur de chaque côté (marge de pan)
+        x0, x1, y0, y1 = -w, 2 * w, -h, 2 * h
+
+        start_k = math.floor((x0 - cx) / px_step)
+        end_k   = math.ceil((x1 - cx) / px_step)
         for k in range(start_k, end_k + 1):
             x = cx + k * px_step
             if k == 0: continue
             is_major = (abs(k) % 5 == 0) if step_mm >= 10 else (round(k * step_mm) % (step_mm * 5) == 0)
-            self.canvas.create_line(x, 0, x, h, fill="#dddddd" if is_major else "#f5f5f5")
+            self.canvas.create_line(x, y0, x, y1, fill="#dddddd" if is_major else "#f5f5f5", tags="grid")
 
-        start_k = math.floor((cy - h) / px_step)
-        end_k   = math.ceil((cy - 0) / px_step)
+        start_k = math.floor((cy - y1) / px_step)
+        end_k   = math.ceil((cy - y0) / px_step)
         for k in range(start_k, end_k + 1):
             y = cy - k * px_step
             if k == 0: continue
             is_major = (abs(k) % 5 == 0) if step_mm >= 10 else (round(k * step_mm) % (step_mm * 5) == 0)
-            self.canvas.create_line(0, y, w, y, fill="#dddddd" if is_major else "#f5f5f5")
+            self.canvas.create_line(x0, y, x1, y, fill="#dddddd" if is_major else "#f5f5f5", tags="grid")
 
-        self.canvas.create_line(0, cy, w, cy, fill="#ffcccc", width=1)
-        self.canvas.create_line(cx, 0, cx, h, fill="#ffcccc", width=1)
-        self.canvas.create_line(0, cy, w, cy, fill="#cc0000", width=1, dash=(8, 4))
-        self.canvas.create_line(cx, 0, cx, h, fill="#cc0000", width=1, dash=(8, 4))
+        self.canvas.create_line(x0, cy, x1, cy, fill="#ffcccc", width=1, tags="grid")
+        self.canvas.create_line(cx, y0, cx, y1, fill="#ffcccc", width=1, tags="grid")
+        self.canvas.create_line(x0, cy, x1, cy, fill="#cc0000", width=1, dash=(8, 4), tags="grid")
+        self.canvas.create_line(cx, y0, cx, y1, fill="#cc0000", width=1, dash=(8, 4), tags="grid")
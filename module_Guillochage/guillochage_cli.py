@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Rendu en ligne de commande (sans Tk) : projets .guillo -> SVG / DXF
+Exemple : python guillochage_cli.py cadrans/*.guillo -o export -f svg,dxf --mode layer -j 4
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from guillochage_engine import GuillochageEngine
+from guillochage_io import GuillochageIO
+
+FORMATS = ("svg", "dxf")
+
+
+def clean_name(name, fallback):
+    """Nom de fichier sûr (mêmes règles que l'export par calque de l'application)"""
+    cleaned = "".join([c for c in str(name) if c.isalpha() or c.isdigit() or c in (' ', '-', '_')]).strip()
+    return cleaned or fallback
+
+def _write(path, fmt, render_list, brut_data):
+    if fmt == "svg": GuillochageIO.export_svg(path, render_list, brut_data)
+    else: GuillochageIO.export_dxf(path, render_list, brut_data)
+
+def render_project(path, out_dir, formats=("svg",), mode="global", tolerance=0.0):
+    """
+    Calcule et exporte un projet. Renvoie un rapport (dict) : fichiers écrits, temps par étape,
+    nombre de segments et de points. Les erreurs sont renvoyées dans le rapport, pas levées.
+    """
+    report = {"project": path, "files": [], "segments": 0, "points": 0, "error": None}
+    t0 = time.perf_counter()
+    try:
+        with open(path, "r", encoding="utf-8") as f: state = json.load(f)
+        brut_data = state.get("forme", {})
+        layers = state.get("calques", [])
+        t1 = time.perf_counter()
+        report["load_s"] = t1 - t0
+
+        stem = clean_name(os.path.splitext(os.path.basename(path))[0], "projet")
+        engine = GuillochageEngine()
+        if mode == "global":
+            jobs = [(os.path.join(out_dir, stem), layers)]
+        else:
+            # Un fichier par calque, comme l'export "dossier" de l'application
+            folder = os.path.join(out_dir, stem)
+            os.makedirs(folder, exist_ok=True)
+            jobs, used = [], set()
+            for i, layer in enumerate(layers):
+                layer_copy = dict(layer)
+                layer_copy["visible"] = True
+                name = clean_name(layer.get("name", ""), f"Calque_{i}")
+                # Deux calques du même nom ne doivent pas s'écraser
+                if name.lower() in used: name = f"{name}_{i + 1}"
+                used.add(name.lower())
+                jobs.append((os.path.join(folder, name), [layer_copy]))
+
+        compute_s = write_s = 0.0
+        for base, job_layers in jobs:
+            t = time.perf_counter()
+            render_list = engine.calculate_geometry(job_layers, brut_data, tolerance=tolerance)
+            compute_s += time.perf_counter() - t
+            report["segments"] += len(render_list)
+            report["points"] += render_list.point_count
+            t = time.perf_counter()
+            for fmt in formats:
+                target = f"{base}.{fmt}"
+                _write(target, fmt, render_list, brut_data)
+                report["files"].append(target)
+            write_s += time.perf_counter() - t
+        engine.shutdown()
+        report["plugin_errors"] = engine.plugins.errors()
+        report["compute_s"] = compute_s
+        report["write_s"] = write_s
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+    report["total_s"] = time.perf_counter() - t0
+    return report
+
+
+def expand_projects(patterns):
+    """Fichiers, motifs glob et dossiers (tous les .guillo qu'ils contiennent)"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(sorted(glob.glob(os.path.join(pattern, "*.guillo"))))
+        else:
+            matches = sorted(glob.glob(pattern))
+            paths.extend(matches if matches else [pattern])
+    # Doublons éventuels (motifs qui se recouvrent)
+    return list(dict.fromkeys(paths))
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Rendu Guillochage sans interface : projets .guillo vers SVG/DXF")
+    parser.add_argument("projects", nargs="+", help="fichiers .guillo, motifs (*.guillo) ou dossiers")
+    parser.add_argument("-o", "--output", default="export", help="dossier de sortie (défaut : export)")
+    parser.add_argument("-f", "--format", default="svg", help="svg, dxf ou svg,dxf (défaut : svg)")
+    parser.add_argument("--mode", choices=("global", "layer"), default="global", help="un fichier par projet ou par calque")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="projets traités en parallèle")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="simplification à l'export en mm (0 = aucune, par défaut)")
+    parser.add_argument("--report", help="écrit le rapport complet (JSON) dans ce fichier")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    formats = tuple(f.strip().lower() for f in args.format.split(",") if f.strip())
+    bad = [f for f in formats if f not in FORMATS]
+    if bad or not formats:
+        print(f"Format inconnu : {', '.join(bad) or args.format}", file=sys.stderr)
+        return 2
+    projects = expand_projects(args.projects)
+    os.makedirs(args.output, exist_ok=True)
+
+    t0 = time.perf_counter()
+    reports = []
+    jobs = max(1, min(args.jobs, len(projects)))
+    if jobs == 1:
+        for path in projects:
+            reports.append(render_project(path, args.output, formats, args.mode, args.tolerance))
+            _print_report(reports[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(render_project, path, args.output, formats, args.mode, args.tolerance) for path in projects]
+            for future in as_completed(futures):
+                reports.append(future.result())
+                _print_report(reports[-1])
+    elapsed = time.perf_counter() - t0
+
+    failed = [r for r in reports if r["error"]]
+    print(f"{len(reports) - len(failed)}/{len(reports)} projets en {elapsed:.2f} s ({jobs} processus)")
+    if args.report:
+        order = {path: i for i, path in enumerate(projects)}
+        reports.sort(key=lambda r: order.get(r["project"], 0))
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"elapsed_s": elapsed, "jobs": jobs, "projects": reports}, f, indent=4)
+    return 1 if failed else 0
+
+def _print_report(r):
+    if r["error"]:
+        print(f"ERREUR {r['project']} : {r['error']}")
+        return
+    print(f"{r['project']} : {r['total_s']:.2f} s (calcul {r['compute_s']:.2f} s, écriture {r['write_s']:.2f} s) "
+          f"- {r['segments']} segments, {r['points']} points, {len(r['files'])} fichier(s)")
+    for path, error in r.get("plugin_errors", {}).items():
+        print(f"  plugin en erreur (version précédente ou repli utilisé) {path} : {error}")
+
+
+if __name__ == "__main__":
+    # Indispensable au pool de processus une fois gelé (exe Windows)
+    import multiprocessing
+    multiprocessing.freeze_support()
+    sys.exit(main())
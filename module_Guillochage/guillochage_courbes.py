@@ -1,8 +1,7 @@
 ﻿# -*- coding: utf-8 -*-
 import tkinter as tk
 from tkinter import ttk, colorchooser
-import os
-import glob
+from guillochage_plugins import plugin_index
 
 class ToolTip:
     def __init__(self, widget, text_getter):
@@ -246,13 +245,11 @@ class CourbesPanel:
             if self.on_calque_modified_callback: self.on_calque_modified_callback(self.var_calque_name.get(), color)
 
     def refresh_library(self):
-        base = os.path.join(os.path.dirname(__file__), "lib_courbes")
-        
-        traj_path = os.path.join(base, "Trajectoires")
-        traj_files = glob.glob(os.path.join(traj_path, "*.py"))
+        # Index partagé : simple parcours des dossiers, aucun plugin exécuté
+        index = plugin_index()
+
         display_traj = []
-        for f in traj_files:
-            name = os.path.basename(f).replace(".py", "")
+        for name, _, _ in index.list("Trajectoires"):
             display = name.replace("_", " ").title()
             self.map_traj_disp_to_int[display] = name
             self.map_traj_int_to_disp[name] = display
@@ -260,11 +257,8 @@ class CourbesPanel:
         self.combo_traj['values'] = display_traj
         if display_traj: self.combo_traj.current(0)
         
-        wave_path = os.path.join(base, "Ondes")
-        wave_files = glob.glob(os.path.join(wave_path, "*.py"))
         display_wave = []
-        for f in wave_files:
-            name = os.path.basename(f).replace(".py", "")
+        for name, _, _ in index.list("Ondes"):
             display = name.replace("_", " ").title()
             self.map_wave_disp_to_int[display] = name
             self.map_wave_int_to_disp[name] = display
@@ -1,50 +1,325 @@
 # -*- coding: utf-8 -*-
 import math
 import os
-import importlib.util
+import json
+import hashlib
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# NumPy est optionnel : sans lui, le moteur reste sur la boucle scalaire
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from guillochage_geometry import LineSegments, RenderGeometry, simplify_polyline
+from guillochage_perf import PerfStats
+from guillochage_plugins import PluginRegistry
+
+def _trajectoire_defaut(t, p):
+    """Ligne droite de secours quand le plugin de trajectoire est introuvable"""
+    return (((t - 0.5) * p.get("gen_len", 100), 0), (0, 1))
+
+# Paliers de résolution : (pas fixes, tolérance de corde en mm pour l'échantillonnage adaptatif)
+RESOLUTION_TIERS = {
+    "Faible": (200, 0.05),
+    "Moyenne": (800, 0.01),
+    "Haute": (2000, 0.002),
+    "Ultra": (10000, 0.0005),
+}
+# Écart mesuré (milieu et quarts) admis, en fraction de la tolérance : avec un seul coude entre
+# deux échantillons (onde triangle, trajectoire anguleuse), l'écart réel reste sous les 4/3 du mesuré
+ADAPTIVE_MARGIN = 0.75
+
+# --- ONDES INTÉGRÉES ---
+# Angle de l'onde (radians) -> offset normalisé entre -1 et 1, sans passer par un plugin
+def _onde_triangle(a):
+    cyc = a / (2 * math.pi)
+    return 2 * abs(2 * (cyc - math.floor(cyc + 0.5))) - 1
+
+# Carré : signe lu sur la fraction de cycle (même arithmétique en scalaire et en tableau ; math.sin et
+# np.sin peuvent différer d'un ulp au passage par zéro, donc de ±2 sur l'offset aux discontinuités)
+def _onde_carre(a):
+    cyc = a / (2 * math.pi)
+    return 1.0 if cyc - math.floor(cyc) <= 0.5 else -1.0
+
+def _onde_triangle_array(a):
+    cyc = a / (2 * math.pi)
+    return 2 * np.abs(2 * (cyc - np.floor(cyc + 0.5))) - 1
+
+def _onde_carre_array(a):
+    cyc = a / (2 * math.pi)
+    return np.where(cyc - np.floor(cyc) <= 0.5, 1.0, -1.0)
+
+# Nom du plugin -> (évaluation scalaire, évaluation tableau)
+_ONDES_INTEGREES = {
+    "sinus": (math.sin, lambda a: np.sin(a)),
+    "triangle": (_onde_triangle, _onde_triangle_array),
+    "carre": (_onde_carre, _onde_carre_array),
+}
+
+class CalculationCancelled(Exception):
+    """Levée quand un calcul est abandonné (résultat devenu obsolète)"""
+    pass
+
+# --- CALCUL MULTI-PROCESSUS ---
+# Réglages recopiés vers les moteurs du pool à chaque lot
+_WORKER_SETTINGS = ("adaptive_sampling", "adaptive_min_seed", "adaptive_seed_per_cycle", "adaptive_seed_divisor", "adaptive_max_points", "adaptive_max_density")
+
+# Moteur propre à chaque processus du pool : les plugins y sont chargés une seule fois
+_POOL_ENGINE = None
+
+def _pool_init(vectorized):
+    global _POOL_ENGINE
+    _POOL_ENGINE = GuillochageEngine(vectorized=vectorized)
+    _POOL_ENGINE.cache_enabled = False
+
+def _pool_compute_lines(params_list, brut_ctx, settings):
+    """Exécuté dans un processus du pool : segments découpés de chaque ligne du lot"""
+    for name, value in settings.items(): setattr(_POOL_ENGINE, name, value)
+    _POOL_ENGINE.plugins.refresh()
+    return [_POOL_ENGINE._compute_line_segments(params, brut_ctx) for params in params_list]
 
 class GuillochageEngine:
-    def __init__(self):
-        self.traj_cache = {}
-        self.wave_cache = {}
+    def __init__(self, vectorized=True):
+        # Plugins de lib_courbes, rechargés à chaud quand leur fichier change
+        self.plugins = PluginRegistry(os.path.join(os.path.dirname(__file__), "lib_courbes"))
+        # Mode tableau (NumPy) : toute la ligne est calculée d'un bloc
+        self.vectorized = bool(vectorized) and np is not None
+        # Entrées batch des plugins (get_trajectoire_batch / get_offset_batch)
+        self._batch_funcs = self.plugins.batch_funcs
+        # Fonctions de plugin ayant refusé un appel vectorisé (on ne retente pas)
+        self._scalar_only = set()
+        # Cache de géométrie : segments découpés par ligne (LRU) et éléments par calque
+        self.cache_enabled = True
+        self.cache_max_points = 2000000
+        self.line_cache = OrderedDict()
+        self.layer_cache = {}
+        self._cache_points = 0
+        # Plugins de chaque ligne en cache : {clé: ((dossier, nom) trajectoire, (dossier, nom) onde)}
+        # (_plan_deps : lignes du calcul en cours, reportées dans _cache_deps à leur mise en cache)
+        self._cache_deps = {}
+        self._plan_deps = {}
+        # Calcul parallèle (opt-in) : 1 = tout sur le processus courant
+        self.workers = 1
+        self.parallel_min_lines = 16
+        # Aperçu progressif : résolution imposée pendant l'interaction
+        self.preview_resolution = "Faible (Rapide)"
+        # Échantillonnage adaptatif : t subdivisé selon la tolérance de corde du palier
+        self.adaptive_sampling = True
+        self.adaptive_min_seed = 64
+        self.adaptive_seed_per_cycle = 8
+        self.adaptive_seed_divisor = 16
+        self.adaptive_max_points = 200000
+        # Pas minimal : jamais plus fin que le palier fixe multiplié par ce facteur
+        self.adaptive_max_density = 16
+        self._pool = None
+        # Un seul calcul à la fois (thread de fond + exports sur le thread Tk)
+        self._lock = threading.RLock()
+        # Mesures par étape (perf.enabled = True pour les activer) ; last_stats = bilan du dernier calcul
+        self.perf = PerfStats(category="moteur")
+        self.last_stats = None
+        self._perf_keys = {}
+        self._perf_layer = None
+        # perf.enabled lu une seule fois par calcul (l'interface peut le changer pendant le calcul)
+        self._timed = False
+
+    # --- POOL DE PROCESSUS ---
+    def set_workers(self, n):
+        """Nombre de processus de calcul (1 = séquentiel)"""
+        n = max(1, int(n))
+        if n != self.workers: self.shutdown()
+        self.workers = n
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
 
+    def _get_pool(self):
+        if self._pool is None:
+            # "spawn" partout : fork depuis un processus à plusieurs threads (Tk, calcul de fond) n'est pas sûr
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=_pool_init, initargs=(self.vectorized,))
+        return self._pool
+
+    def _compute_missing(self, pending, brut_ctx, cancel=None, progress=None, timed=False):
+        """
+        Calcule les lignes absentes du cache. pending : liste par calque de [(key, params), ...].
+        Renvoie {key: segments}. Les lots ne mélangent jamais deux calques.
+        Chaque ligne terminée entre au cache, même si le calcul est ensuite annulé.
+        """
+        results = {}
+        total = sum(len(jobs) for jobs in pending)
+
+        perf = self.perf
+
+        def _done(key, segments):
+            results[key] = segments
+            self._cache_put(key, segments)
+            if timed:
+                layer = self._perf_keys.get(key)
+                perf.count("lignes_calculees", 1, layer)
+                perf.count("points_decoupes", segments.point_count, layer)
+            if progress: progress(len(results), total)
+
+        if self.workers > 1 and total >= self.parallel_min_lines:
+            chunk_size = max(1, math.ceil(total / (self.workers * 4)))
+            batches = []
+            for jobs in pending:
+                for start in range(0, len(jobs), chunk_size):
+                    batches.append(jobs[start:start + chunk_size])
+            futures = []
+            if timed: t_pool = time.perf_counter()
+            try: pool = self._get_pool()
+            except (OSError, NotImplementedError):
+                # Processus indisponibles sur cette plateforme : calcul séquentiel
+                pool = None
+            if pool is not None:
+                try:
+                    settings = {name: getattr(self, name) for name in _WORKER_SETTINGS}
+                    futures = [pool.submit(_pool_compute_lines, [params for _, params in batch], brut_ctx, settings) for batch in batches]
+                    for batch, fut in zip(batches, futures):
+                        if cancel and cancel(): raise CalculationCancelled()
+                        for (key, _), segments in zip(batch, fut.result()):
+                            _done(key, segments)
+                    if timed: perf.add("pool", time.perf_counter() - t_pool)
+                    return results
+                except BrokenProcessPool:
+                    # Processus du pool morts : on repasse en séquentiel (pool recréé au prochain calcul)
+                    self.shutdown()
+                except BaseException:
+                    # Annulation ou erreur d'un plugin : remontée comme en séquentiel, le pool reste en service
+                    for fut in futures: fut.cancel()
+                    raise
+
+        for jobs in pending:
+            if timed:
+                layer = self._perf_layer = self._perf_keys.get(jobs[0][0])
+                t_layer = time.perf_counter()
+            for key, params in jobs:
+                if key in results: continue
+                if cancel and cancel(): raise CalculationCancelled()
+                _done(key, self._compute_line_segments(params, brut_ctx))
+            if timed: perf.add("calque", time.perf_counter() - t_layer, layer)
+        return results
+
+    # --- PLUGINS ---
     def _get_trajectory_func(self, traj_name):
-        clean = str(traj_name).lower().replace(" ", "_").replace(".py", "")
-        if clean in self.traj_cache: return self.traj_cache[clean]
-        path = os.path.join(os.path.dirname(__file__), "lib_courbes", "Trajectoires", f"{clean}.py")
-        if os.path.exists(path):
+        return self.plugins.resolve("Trajectoires", traj_name).func
+
+    def invalidate_plugins(self, changed):
+        """Retire du cache les lignes (et les calques) calculées avec l'un des plugins donnés"""
+        stale = {key for key, deps in self._cache_deps.items() if deps[0] in changed or deps[1] in changed}
+        if not stale: return 0
+        # Les versions simplifiées ("clé@tolérance") suivent leur ligne
+        for ckey in [k for k in self.line_cache if k.split("@", 1)[0] in stale]:
+            self._cache_points -= self.line_cache.pop(ckey).point_count
+        for key in stale: del self._cache_deps[key]
+        for layer_id in [lid for lid, (layer_key, _) in self.layer_cache.items() if not stale.isdisjoint(layer_key[3])]:
+            del self.layer_cache[layer_id]
+        return len(stale)
+
+    def _bind_wave(self, wave_name, current_params):
+        """
+        Évaluateurs (scalaire, tableau) de l'onde d'une ligne, résolus une fois avant la boucle des points.
+        Ondes intégrées : appel direct. Plugin : get_offset(angle, params) avec params = params_defaut
+        du plugin complétés par les paramètres fusionnés de la ligne ; il renvoie un offset normalisé
+        (amplitude, période, phase et flambage restent appliqués par le moteur).
+        """
+        handle = self.plugins.resolve("Ondes", wave_name)
+        builtin = _ONDES_INTEGREES.get(handle.name)
+        if builtin: return builtin
+        func = handle.func
+        if func is None: return _ONDES_INTEGREES["sinus"]
+        params = dict(handle.defaults)
+        params.update(current_params)
+
+        def array(angles):
+            for f in self._vector_candidates(func):
+                res = self._call_vectorized(f, angles, params)
+                if res is None: continue
+                try: return self._as_line_array(res, len(angles))
+                except Exception:
+                    self._scalar_only.add(f)
+            return None
+        return (lambda a: func(a, params)), array
+
+    # --- MODE TABLEAU (NUMPY) ---
+    def _call_vectorized(self, func, t_arr, params):
+        """
+        Tente un appel du plugin avec un tableau de t.
+        Renvoie None si le plugin n'accepte pas les tableaux (math.*, if, ...).
+        """
+        if func in self._scalar_only: return None
+        try:
+            with np.errstate(all="ignore"):
+                return func(t_arr, params)
+        except Exception:
+            self._scalar_only.add(func)
+            return None
+
+    def _vector_candidates(self, func):
+        """Entrée batch déclarée d'abord, puis la fonction scalaire elle-même"""
+        batch = self._batch_funcs.get(func)
+        if batch is not None: yield batch
+        yield func
+
+    def _as_line_array(self, value, n):
+        arr = np.asarray(value, dtype=float)
+        if arr.shape == (n,): return arr
+        if arr.ndim == 0: return np.full(n, float(arr))
+        raise ValueError("Forme de tableau inattendue")
+
+    def _eval_trajectory_array(self, traj_func, t_arr, params):
+        n = len(t_arr)
+        for func in self._vector_candidates(traj_func):
+            res = self._call_vectorized(func, t_arr, params)
+            if res is None: continue
             try:
-                spec = importlib.util.spec_from_file_location(f"dyn_traj_{clean}", path)
-                mod = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(mod)
-                if hasattr(mod, "get_trajectoire"):
-                    self.traj_cache[clean] = mod.get_trajectoire
-                    return mod.get_trajectoire
-            except: pass
+                (tx, ty), (nx, ny) = res
+                return tuple(self._as_line_array(v, n) for v in (tx, ty, nx, ny))
+            except Exception:
+                self._scalar_only.add(func)
         return None
 
-    def _eval_wave(self, wave_name, t):
-        clean = str(wave_name).lower().replace(" ", "_").replace(".py", "")
-        if clean == "sinus": return math.sin(t)
-        if clean == "triangle": return 2 * abs(2 * (t/(2*math.pi) - math.floor(t/(2*math.pi) + 0.5))) - 1
-        if clean == "carre": return 1.0 if math.sin(t) >= 0 else -1.0
-        
-        if clean in self.wave_cache: return self.wave_cache[clean](t, {})
-        
-        path = os.path.join(os.path.dirname(__file__), "lib_courbes", "Ondes", f"{clean}.py")
-        if os.path.exists(path):
+    def calculate_geometry(self, layers_state, brut_data, cancel=None, progress=None, preview=False, tolerance=0.0):
+        """
+        Géométrie de tous les calques visibles.
+        cancel() -> True abandonne le calcul (CalculationCancelled) ; progress(fait, total) suit les lignes calculées.
+        preview=True calcule toutes les lignes à la résolution d'aperçu (preview_resolution).
+        tolerance > 0 simplifie chaque segment découpé (RDP, en mm).
+        """
+        with self._lock:
+            # Les calculs en attente du verrou ont souvent été dépassés entre-temps
+            if cancel and cancel(): raise CalculationCancelled()
+            perf = self.perf
+            tolerance = max(0.0, float(tolerance or 0.0))
+            if not perf.enabled:
+                return self._calculate_geometry(layers_state, brut_data, cancel, progress, preview, tolerance, False)
+            perf.reset()
+            self._timed = True
+            t0 = time.perf_counter()
             try:
-                spec = importlib.util.spec_from_file_location(f"dyn_wave_{clean}", path)
-                mod = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(mod)
-                if hasattr(mod, "get_offset"):
-                    self.wave_cache[clean] = mod.get_offset
-                    return mod.get_offset(t, {})
-            except: pass
-        return math.sin(t)
-
-    def calculate_geometry(self, layers_state, brut_data):
-        render_list = []
+                result = self._calculate_geometry(layers_state, brut_data, cancel, progress, preview, tolerance, True)
+                perf.set("segments", len(result))
+                perf.set("points", result.point_count)
+                return result
+            finally:
+                perf.add("total", time.perf_counter() - t0)
+                self._timed = False
+                self._perf_keys = {}
+                self._perf_layer = None
+                stats = perf.snapshot()
+                stats["preview"] = preview
+                self.last_stats = stats
+
+    def _calculate_geometry(self, layers_state, brut_data, cancel, progress, preview, tolerance, timed=False):
+        render_list = RenderGeometry()
         try:
             brut_w = float(brut_data.get("dim1", 50.0))
             brut_h = float(brut_data.get("dim2", 50.0))
@@ -58,12 +333,29 @@ class GuillochageEngine:
         # Marge de génération pour éviter les bords coupés
         gen_len = diag * 1.5 
         max_dim = max(brut_w, brut_h)
-        start_offset_mm = (gen_len - max_dim) / 2
 
-        for layer in layers_state:
+        brut_ctx = {
+            "is_circle": is_circle, "brut_w": brut_w, "brut_h": brut_h, "corner_radius": corner_radius,
+            "gen_len": gen_len, "max_dim": max_dim, "start_offset_mm": (gen_len - max_dim) / 2,
+        }
+        brut_key = (is_circle, brut_w, brut_h, corner_radius, self.adaptive_sampling)
+        perf = self.perf
+        if timed: t_stage = time.perf_counter()
+        # Plugins modifiés depuis le dernier calcul : rechargés, leurs lignes en cache oubliées
+        changed = self.plugins.refresh()
+        if changed: self.invalidate_plugins(changed)
+        self._plan_deps = {}
+        # Plan : (id, nom, couleur, clé calque, lignes) ou (id, nom, None, None, éléments en cache)
+        plan = []
+
+        for position, layer in enumerate(layers_state):
+            if cancel and cancel(): raise CalculationCancelled()
             if not layer.get("visible", True): continue
             
             layer_name = layer.get("name", "")
+            # Identité du calque (les noms peuvent se répéter) : uid de la ligne, sinon sa position
+            layer_id = layer.get("uid")
+            if layer_id is None: layer_id = ("position", position)
             data = layer.get("data", {})
             global_params = data.get("global", {})
             layer_color = layer.get("color", "black")
@@ -88,6 +380,9 @@ class GuillochageEngine:
             step = dist_axis / (nb_total - 1) if nb_total > 1 else 0
             if nb_total == 1: min_y_axis = 0; step = 0
 
+            # Lignes à dessiner et clé de cache de chacune
+            line_jobs = []
+
             # --- BOUCLE PRINCIPALE DES LIGNES ---
             for i, line_data in enumerate(lines_list):
                 
@@ -112,152 +407,665 @@ class GuillochageEngine:
                 current_params["gen_len"] = gen_len 
                 current_params["brut_w"] = brut_w
                 current_params["brut_h"] = brut_h
+                if preview:
+                    current_params["resolution"] = self.preview_resolution
+                    current_params["sampling"] = "fixed"
+
+                key = self._line_cache_key(current_params, brut_key)
+                line_jobs.append((i, current_params, key))
 
-                traj_name = current_params.get("traj_type", "ligne_droite")
-                traj_func = self._get_trajectory_func(traj_name)
-                if not traj_func: traj_func = lambda t, p: (((t-0.5)*p.get("gen_len", 100), 0), (0, 1))
+            # --- CALQUE INCHANGÉ : ON RÉUTILISE SES ÉLÉMENTS ---
+            layer_key = (layer_name, layer_color, tolerance, tuple(job[2] for job in line_jobs))
+            cached_items = self.layer_cache.get(layer_id)
+            if self.cache_enabled and cached_items and cached_items[0] == layer_key:
+                plan.append((layer_id, layer_name, None, None, cached_items[1]))
+                if timed: perf.count("calques_en_cache", 1, layer_name)
+                continue
+            plan.append((layer_id, layer_name, layer_color, layer_key, line_jobs))
+            if timed:
+                for job in line_jobs: self._perf_keys[job[2]] = layer_name
 
-                wave_name = current_params.get("wave_type", "sinus")
-                is_flambage = current_params.get("flambage", False)
-                amp_global = float(current_params.get("amplitude", 2.0))
-                amp_start = float(current_params.get("amp_start", 1.0))
-                amp_end = float(current_params.get("amp_end", 3.0))
+        if timed:
+            t_end = time.perf_counter()
+            perf.add("plan", t_end - t_stage, end=t_end)
+            t_stage = t_end
+        if cancel and cancel(): raise CalculationCancelled()
+
+        # --- CALCUL DES LIGNES ABSENTES DU CACHE (séquentiel ou pool) ---
+        fresh = {}
+        pending = []
+        seen = set()
+        for _, layer_name, layer_color, layer_key, line_jobs in plan:
+            if layer_key is None: continue
+            jobs = []
+            for i, current_params, key in line_jobs:
+                if key in seen: continue
+                seen.add(key)
+                segments = self._cache_get(key)
+                if segments is not None:
+                    fresh[key] = segments
+                    if timed: perf.count("lignes_en_cache", 1, layer_name)
+                else: jobs.append((key, current_params))
+            if jobs: pending.append(jobs)
+        if pending:
+            fresh.update(self._compute_missing(pending, brut_ctx, cancel, progress, timed))
+        if timed:
+            t_end = time.perf_counter()
+            perf.add("calcul", t_end - t_stage, end=t_end)
+            t_stage = t_end
+
+        # --- ASSEMBLAGE DANS L'ORDRE DES CALQUES ---
+        for layer_id, layer_name, layer_color, layer_key, line_jobs in plan:
+            if cancel and cancel(): raise CalculationCancelled()
+            if layer_key is None:
+                render_list.extend(line_jobs)
+                continue
+
+            layer_items = RenderGeometry()
+            for i, current_params, key in line_jobs:
+                clipped_segments = fresh[key]
+                if tolerance > 0:
+                    if timed: t_simp = time.perf_counter()
+                    clipped_segments = self._simplified(key, clipped_segments, tolerance)
+                    if timed: perf.add("simplification", time.perf_counter() - t_simp, layer_name)
                 thickness = float(current_params.get("thickness", 1.0))
-                is_mir_h = current_params.get("mirror_h", False)
-                is_mir_v = current_params.get("mirror_v", False)
-                rot_deg = float(current_params.get("rotation", 0.0))
-                rad_rot = math.radians(rot_deg)
-                cr, sr = math.cos(rad_rot), math.sin(rad_rot)
-                pos_x = float(current_params.get("pos_x", 0.0))
-                pos_y = float(current_params.get("pos_y", 0.0))
-
-                # Résolution
-                res_key = str(current_params.get("resolution", "Moyenne"))
-                if "Faible" in res_key: steps = 200
-                elif "Haute" in res_key: steps = 2000
-                elif "Ultra" in res_key: steps = 10000
-                else: steps = 800 
-
-                nb_cycles_user = float(current_params.get("period", 10.0))
-                phase_user = float(current_params.get("phase", 0.0))
-                cycles_per_mm = nb_cycles_user / max_dim
-
-                pts = []
-                
-                # --- CALCUL DES POINTS ---
-                for j in range(steps + 1):
-                    t = j / steps
-                    (tx, ty), (nx, ny) = traj_func(t, current_params)
-                    
-                    if "ligne" in traj_name.lower() or "straight" in traj_name.lower():
-                        ty = current_params["y_base"]
-                    
-                    dist_mm = t * gen_len
-                    dist_relative_to_brut = dist_mm - start_offset_mm
-                    angle_wave = dist_relative_to_brut * cycles_per_mm * 2 * math.pi
-                    angle_wave += phase_user * 2 * math.pi
-                    
-                    offset_val = self._eval_wave(wave_name, angle_wave)
-                    
-                    if is_flambage: current_amp = amp_start + (amp_end - amp_start) * t
-                    else: current_amp = amp_global
-                    
-                    fx = tx + nx * offset_val * current_amp
-                    fy = ty + ny * offset_val * current_amp
-                    
-                    # Rotation et Position
-                    rx = fx * cr - fy * sr 
-                    ry = fx * sr + fy * cr
-                    final_x = rx + pos_x
-                    final_y = ry + pos_y
-                    
-                    if is_mir_h: final_x = -final_x
-                    if is_mir_v: final_y = -final_y
-                    
-                    pts.append((final_x, final_y))
-                
-                # Clipping (Découpe selon la forme brut)
-                clipped_segments = self._clip_polyline(pts, is_circle, brut_w, brut_h, corner_radius)
-                
-                for seg in clipped_segments:
-                    if len(seg) > 1:
-                        render_list.append({
-                            "type": "polyline",
-                            "points": seg,
-                            "color": layer_color,
-                            "thickness": thickness,
-                            "layer_name": layer_name,
-                            "line_index": i
-                        })
+                layer_items.add_line(clipped_segments, layer_name, i, layer_color, thickness)
+            layer_items.layer_versions[layer_id] = (layer_name, layer_key)
 
+            if self.cache_enabled: self.layer_cache[layer_id] = (layer_key, layer_items)
+            render_list.extend(layer_items)
+
+        if timed: perf.add("assemblage", time.perf_counter() - t_stage)
         return render_list
 
-    def _clip_polyline(self, points, is_circle, w, h, r_corner):
-        segments = []
-        current_segment = []
+    def _compute_line_segments(self, current_params, brut_ctx):
+        """Calcule une ligne complète puis la découpe selon le brut."""
+        traj_func, geo = self._line_setup(current_params, brut_ctx)
+
+        if self._timed: return self._compute_line_segments_timed(traj_func, current_params, geo, brut_ctx)
+
+        # --- CALCUL DES POINTS ---
+        if self.vectorized:
+            xy = self._compute_line_points_array(traj_func, current_params, geo)
+            if xy is not None:
+                if brut_ctx["brut_w"] <= 0 or brut_ctx["brut_h"] <= 0: return LineSegments()
+                shape = self._brut_shape(brut_ctx["is_circle"], brut_ctx["brut_w"], brut_ctx["brut_h"], brut_ctx["corner_radius"])
+                return LineSegments.from_arrays(self._clip_pieces_array(xy[0], xy[1], shape))
+        pts = self._compute_line_points(traj_func, current_params, geo)
         
-        rx = w / 2
-        ry = h / 2
-        rx_sq = rx**2
-        ry_sq = ry**2
-
-        def is_inside(p):
-            px, py = p
-            if is_circle:
-                if rx_sq > 0 and ry_sq > 0:
-                    return (px*px)/rx_sq + (py*py)/ry_sq <= 1.00001
-                return False
-            
+        # Clipping (Découpe selon la forme brut)
+        return LineSegments.from_points(self._clip_polyline(pts, brut_ctx["is_circle"], brut_ctx["brut_w"], brut_ctx["brut_h"], brut_ctx["corner_radius"]))
+
+    def _line_setup(self, current_params, brut_ctx):
+        """Fonction de trajectoire et constantes (geo) d'une ligne, communes aux modes scalaire et tableau"""
+        gen_len = brut_ctx["gen_len"]
+
+        traj_name = current_params.get("traj_type", "ligne_droite")
+        traj_func = self._get_trajectory_func(traj_name)
+        if not traj_func: traj_func = _trajectoire_defaut
+
+        wave, wave_array = self._bind_wave(current_params.get("wave_type", "sinus"), current_params)
+        rad_rot = math.radians(float(current_params.get("rotation", 0.0)))
+
+        # Résolution : nombre de pas fixe et tolérance de corde (mm) du palier
+        res_key = str(current_params.get("resolution", "Moyenne"))
+        steps, chord_tol = RESOLUTION_TIERS["Moyenne"]
+        for tier, values in RESOLUTION_TIERS.items():
+            if tier in res_key:
+                steps, chord_tol = values
+                break
+        if current_params.get("chord_tol"):
+            chord_tol = float(current_params["chord_tol"])
+        # Pas fixe si désactivé globalement ou demandé par la ligne (aperçu notamment)
+        if not self.adaptive_sampling or current_params.get("sampling") == "fixed": chord_tol = None
+
+        nb_cycles_user = float(current_params.get("period", 10.0))
+
+        # Constantes de la ligne (partagées par les modes scalaire et tableau)
+        geo = {
+            "steps": steps,
+            "chord_tol": chord_tol,
+            "is_straight": "ligne" in traj_name.lower() or "straight" in traj_name.lower(),
+            "wave": wave,
+            "wave_array": wave_array,
+            "gen_len": gen_len,
+            "start_offset_mm": brut_ctx["start_offset_mm"],
+            "cycles_per_mm": nb_cycles_user / brut_ctx["max_dim"],
+            "phase_user": float(current_params.get("phase", 0.0)),
+            "is_flambage": current_params.get("flambage", False),
+            "amp_global": float(current_params.get("amplitude", 2.0)),
+            "amp_start": float(current_params.get("amp_start", 1.0)),
+            "amp_end": float(current_params.get("amp_end", 3.0)),
+            "cr": math.cos(rad_rot),
+            "sr": math.sin(rad_rot),
+            "pos_x": float(current_params.get("pos_x", 0.0)),
+            "pos_y": float(current_params.get("pos_y", 0.0)),
+            "is_mir_h": current_params.get("mirror_h", False),
+            "is_mir_v": current_params.get("mirror_v", False),
+        }
+        return traj_func, geo
+
+    def _compute_line_segments_timed(self, traj_func, current_params, geo, brut_ctx):
+        """
+        Même calcul que _compute_line_segments, étape par étape (mesures activées).
+        En mode scalaire, le temps des ondes reste compris dans l'échantillonnage.
+        """
+        perf, layer = self.perf, self._perf_layer
+        t0 = time.perf_counter()
+        xy = self._compute_line_points_array(traj_func, current_params, geo) if self.vectorized else None
+        if xy is not None:
+            t1 = time.perf_counter()
+            perf.add("echantillonnage", t1 - t0, layer, end=t1)
+            perf.count("points_bruts", len(xy[0]), layer)
+            if brut_ctx["brut_w"] <= 0 or brut_ctx["brut_h"] <= 0: return LineSegments()
+            shape = self._brut_shape(brut_ctx["is_circle"], brut_ctx["brut_w"], brut_ctx["brut_h"], brut_ctx["corner_radius"])
+            segments = LineSegments.from_arrays(self._clip_pieces_array(xy[0], xy[1], shape))
+            perf.add("decoupe", time.perf_counter() - t1, layer)
+            return segments
+
+        def timed_traj(t, params):
+            ts = time.perf_counter()
+            try: return traj_func(t, params)
+            finally: perf.add("trajectoire", time.perf_counter() - ts, layer)
+        t0 = time.perf_counter()
+        pts = self._compute_line_points(timed_traj, current_params, geo)
+        t1 = time.perf_counter()
+        perf.add("echantillonnage", t1 - t0, layer, end=t1)
+        perf.count("points_bruts", len(pts), layer)
+        segments = LineSegments.from_points(self._clip_polyline(pts, brut_ctx["is_circle"], brut_ctx["brut_w"], brut_ctx["brut_h"], brut_ctx["corner_radius"]))
+        perf.add("decoupe", time.perf_counter() - t1, layer)
+        return segments
+
+    # --- CACHE DE GÉOMÉTRIE ---
+    def _line_cache_key(self, current_params, brut_key):
+        """Empreinte stable : paramètres fusionnés + brut + version (contenu) des plugins"""
+        traj = self.plugins.resolve("Trajectoires", current_params.get("traj_type", "ligne_droite"))
+        wave = self.plugins.resolve("Ondes", current_params.get("wave_type", "sinus"))
+        raw = json.dumps([current_params, brut_key, (traj.version, wave.version)], sort_keys=True, default=str)
+        key = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+        if self.cache_enabled: self._plan_deps[key] = (traj.ident, wave.ident)
+        return key
+
+    def _cache_get(self, key):
+        if not self.cache_enabled: return None
+        segments = self.line_cache.get(key)
+        if segments is not None: self.line_cache.move_to_end(key)
+        return segments
+
+    def _cache_put(self, key, segments):
+        if not self.cache_enabled: return
+        if key in self.line_cache: return
+        self.line_cache[key] = segments
+        deps = self._plan_deps.get(key)
+        if deps: self._cache_deps[key] = deps
+        self._cache_points += segments.point_count
+        # Éviction LRU au-delà du budget de points
+        while self._cache_points > self.cache_max_points and len(self.line_cache) > 1:
+            old_key, old = self.line_cache.popitem(last=False)
+            self._cache_points -= old.point_count
+            self._cache_deps.pop(old_key, None)
+
+    def _simplified(self, key, segments, tolerance):
+        """Segments simplifiés d'une ligne, mis en cache à côté des segments bruts"""
+        skey = f"{key}@{tolerance!r}"
+        simplified = self._cache_get(skey)
+        if simplified is None:
+            simplified = segments.simplified(tolerance)
+            self._cache_put(skey, simplified)
+        return simplified
+
+    def clear_cache(self):
+        self.line_cache.clear()
+        self.layer_cache.clear()
+        self._cache_deps.clear()
+        self._cache_points = 0
+
+    def _line_point(self, traj_func, current_params, geo, t):
+        """Point final (après onde, rotation, position, miroirs) de la ligne en t."""
+        (tx, ty), (nx, ny) = traj_func(t, current_params)
+        
+        if geo["is_straight"]:
+            ty = current_params["y_base"]
+        
+        dist_mm = t * geo["gen_len"]
+        dist_relative_to_brut = dist_mm - geo["start_offset_mm"]
+        angle_wave = dist_relative_to_brut * geo["cycles_per_mm"] * 2 * math.pi
+        angle_wave += geo["phase_user"] * 2 * math.pi
+        
+        offset_val = geo["wave"](angle_wave)
+        
+        if geo["is_flambage"]: current_amp = geo["amp_start"] + (geo["amp_end"] - geo["amp_start"]) * t
+        else: current_amp = geo["amp_global"]
+        
+        fx = tx + nx * offset_val * current_amp
+        fy = ty + ny * offset_val * current_amp
+        
+        # Rotation et Position
+        cr, sr = geo["cr"], geo["sr"]
+        final_x = fx * cr - fy * sr + geo["pos_x"]
+        final_y = fx * sr + fy * cr + geo["pos_y"]
+        
+        if geo["is_mir_h"]: final_x = -final_x
+        if geo["is_mir_v"]: final_y = -final_y
+        return final_x, final_y
+
+    def _compute_line_points(self, traj_func, current_params, geo):
+        """Boucle scalaire (référence) : un appel plugin par échantillon."""
+        if geo["chord_tol"] is not None:
+            return self._adaptive_line_points(traj_func, current_params, geo)
+        steps = geo["steps"]
+        return [self._line_point(traj_func, current_params, geo, j / steps) for j in range(steps + 1)]
+
+    def _line_points_at(self, traj_func, current_params, geo, t):
+        """
+        Même calcul que _line_point, sur un tableau de t.
+        Renvoie les tableaux (x, y), ou None si le plugin ne se laisse pas vectoriser (repli scalaire).
+        """
+        perf = self.perf
+        if self._timed: ts = time.perf_counter()
+        traj = self._eval_trajectory_array(traj_func, t, current_params)
+        if self._timed: perf.add("trajectoire", time.perf_counter() - ts, self._perf_layer)
+        if traj is None: return None
+        tx, ty, nx, ny = traj
+        if geo["is_straight"]:
+            ty = np.full_like(t, float(current_params["y_base"]))
+
+        dist_relative_to_brut = t * geo["gen_len"] - geo["start_offset_mm"]
+        angle_wave = dist_relative_to_brut * geo["cycles_per_mm"] * 2 * math.pi
+        angle_wave += geo["phase_user"] * 2 * math.pi
+
+        if self._timed: ts = time.perf_counter()
+        offset_val = geo["wave_array"](angle_wave)
+        if self._timed: perf.add("onde", time.perf_counter() - ts, self._perf_layer)
+        if offset_val is None: return None
+
+        if geo["is_flambage"]: current_amp = geo["amp_start"] + (geo["amp_end"] - geo["amp_start"]) * t
+        else: current_amp = geo["amp_global"]
+
+        fx = tx + nx * offset_val * current_amp
+        fy = ty + ny * offset_val * current_amp
+
+        cr, sr = geo["cr"], geo["sr"]
+        final_x = fx * cr - fy * sr + geo["pos_x"]
+        final_y = fx * sr + fy * cr + geo["pos_y"]
+
+        if geo["is_mir_h"]: final_x = -final_x
+        if geo["is_mir_v"]: final_y = -final_y
+
+        return final_x, final_y
+
+    def _compute_line_points_array(self, traj_func, current_params, geo):
+        """Grille t complète d'un coup (pas fixe ou échantillonnage adaptatif)."""
+        if geo["chord_tol"] is not None:
+            return self._adaptive_line_points_array(traj_func, current_params, geo)
+        # j / steps comme la boucle scalaire (linspace diffère parfois d'un ulp)
+        t = np.arange(geo["steps"] + 1) / geo["steps"]
+        return self._line_points_at(traj_func, current_params, geo, t)
+
+    # --- ÉCHANTILLONNAGE ADAPTATIF (TOLÉRANCE DE CORDE) ---
+    def _seed_count(self, geo):
+        """Grille initiale : assez dense pour ne manquer aucune ondulation ni motif de trajectoire"""
+        cycles = abs(geo["cycles_per_mm"]) * geo["gen_len"]
+        return max(self.adaptive_min_seed, int(cycles * self.adaptive_seed_per_cycle), geo["steps"] // self.adaptive_seed_divisor) + 1
+
+    @staticmethod
+    def _chord_deviation(ax, ay, bx, by, mx, my):
+        """Distance du point (mx, my) au segment [a, b]"""
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        if length_sq == 0: return math.hypot(mx - ax, my - ay)
+        u = min(1.0, max(0.0, ((mx - ax) * dx + (my - ay) * dy) / length_sq))
+        return math.hypot(mx - ax - u * dx, my - ay - u * dy)
+
+    @staticmethod
+    def _chord_deviation_array(xa, ya, xb, yb, xm, ym):
+        dx, dy = xb - xa, yb - ya
+        length_sq = dx * dx + dy * dy
+        with np.errstate(all="ignore"):
+            u = np.clip(np.where(length_sq > 0, ((xm - xa) * dx + (ym - ya) * dy) / length_sq, 0.0), 0.0, 1.0)
+        return np.hypot(xm - xa - u * dx, ym - ya - u * dy)
+
+    def _adaptive_line_points(self, traj_func, current_params, geo):
+        """Subdivision de t selon la tolérance de corde (mode scalaire)."""
+        return self._adaptive_samples(traj_func, current_params, geo)[1]
+
+    def _adaptive_samples(self, traj_func, current_params, geo):
+        """
+        Subdivision de t (mode scalaire) : un intervalle est accepté quand son milieu et ses deux quarts
+        sont assez près de la corde (ADAPTIVE_MARGIN × chord_tol) ; sinon il est coupé en deux (les quarts deviennent
+        les milieux des moitiés). Renvoie (liste des t, liste des points).
+        """
+        limit = geo["chord_tol"] * ADAPTIVE_MARGIN
+        min_dt = 1.0 / (geo["steps"] * self.adaptive_max_density)
+        n0 = self._seed_count(geo)
+        point = lambda t: self._line_point(traj_func, current_params, geo, t)
+        dev = self._chord_deviation
+
+        t0 = 0.0
+        p0 = point(t0)
+        ts, pts = [t0], [p0]
+        for k in range(1, n0):
+            t1 = k / (n0 - 1)
+            p1 = point(t1)
+            # Pile d'intervalles (a, milieu, b) à examiner, le plus à gauche en haut
+            tm = (t0 + t1) / 2
+            stack = [(t0, p0, tm, point(tm), t1, p1)]
+            while stack:
+                ta, pa, tm, pm, tb, pb = stack.pop()
+                if tb - ta > min_dt:
+                    tq1, tq3 = (ta + tm) / 2, (tm + tb) / 2
+                    pq1, pq3 = point(tq1), point(tq3)
+                    if max(dev(pa[0], pa[1], pb[0], pb[1], pm[0], pm[1]),
+                           dev(pa[0], pa[1], pb[0], pb[1], pq1[0], pq1[1]),
+                           dev(pa[0], pa[1], pb[0], pb[1], pq3[0], pq3[1])) > limit:
+                        stack.append((tm, pm, tq3, pq3, tb, pb))
+                        stack.append((ta, pa, tq1, pq1, tm, pm))
+                        continue
+                ts.append(tb)
+                pts.append(pb)
+            t0, p0 = t1, p1
+        return ts, pts
+
+    def _adaptive_line_points_array(self, traj_func, current_params, geo):
+        """Même subdivision, un niveau à la fois : tous les quarts d'un niveau en un seul appel."""
+        samples = self._adaptive_samples_array(traj_func, current_params, geo)
+        return None if samples is None else samples[1:]
+
+    def _adaptive_samples_array(self, traj_func, current_params, geo):
+        """Version tableau de _adaptive_samples ; renvoie (t, x, y) triés, ou None (repli scalaire)"""
+        limit = geo["chord_tol"] * ADAPTIVE_MARGIN
+        min_dt = 1.0 / (geo["steps"] * self.adaptive_max_density)
+        t = np.linspace(0.0, 1.0, self._seed_count(geo))
+        xy = self._line_points_at(traj_func, current_params, geo, t)
+        if xy is None: return None
+        x, y = xy
+        tm = (t[:-1] + t[1:]) / 2
+        xym = self._line_points_at(traj_func, current_params, geo, tm)
+        if xym is None: return None
+        # Intervalles à examiner (extrémités a, b et milieu m) ; points ajoutés mis de côté puis triés à la fin
+        ta, xa, ya, tb, xb, yb = t[:-1], x[:-1], y[:-1], t[1:], x[1:], y[1:]
+        xm, ym = xym
+        added_t, added_x, added_y = [t], [x], [y]
+        count = len(t)
+
+        while ta.size and count < self.adaptive_max_points:
+            # Les intervalles au pas minimal sont acceptés tels quels
+            open_ = tb - ta > min_dt
+            if not open_.all():
+                ta, xa, ya, tm, xm, ym, tb, xb, yb = (v[open_] for v in (ta, xa, ya, tm, xm, ym, tb, xb, yb))
+                if not ta.size: break
+            n = ta.size
+            tq = np.concatenate(((ta + tm) / 2, (tm + tb) / 2))
+            xyq = self._line_points_at(traj_func, current_params, geo, tq)
+            if xyq is None: return None
+            xq1, xq3, yq1, yq3 = xyq[0][:n], xyq[0][n:], xyq[1][:n], xyq[1][n:]
+
+            dev = np.maximum(self._chord_deviation_array(xa, ya, xb, yb, xm, ym),
+                             np.maximum(self._chord_deviation_array(xa, ya, xb, yb, xq1, yq1),
+                                        self._chord_deviation_array(xa, ya, xb, yb, xq3, yq3)))
+            split = dev > limit
+            if not split.any(): break
+
+            tq1, tq3 = tq[:n][split], tq[n:][split]
+            xq1, yq1, xq3, yq3 = xq1[split], yq1[split], xq3[split], yq3[split]
+            ta, xa, ya, tm, xm, ym, tb, xb, yb = (v[split] for v in (ta, xa, ya, tm, xm, ym, tb, xb, yb))
+            added_t.append(tm); added_x.append(xm); added_y.append(ym)
+            count += len(tm)
+            # Les deux moitiés seront réexaminées au niveau suivant (leurs milieux sont les quarts)
+            ta, tm, tb = np.concatenate((ta, tm)), np.concatenate((tq1, tq3)), np.concatenate((tm, tb))
+            xa, xm, xb = np.concatenate((xa, xm)), np.concatenate((xq1, xq3)), np.concatenate((xm, xb))
+            ya, ym, yb = np.concatenate((ya, ym)), np.concatenate((yq1, yq3)), np.concatenate((ym, yb))
+
+        t = np.concatenate(added_t)
+        order = np.argsort(t, kind="stable")
+        return t[order], np.concatenate(added_x)[order], np.concatenate(added_y)[order]
+
+    # --- DÉCOUPE ANALYTIQUE SELON LE BRUT ---
+    def _brut_shape(self, is_circle, w, h, r_corner):
+        """Géométrie du brut utilisée par la découpe (rayon de coin borné comme à l'affichage)"""
+        rx, ry = w / 2, h / 2
+        r = 0.0 if is_circle else max(0.0, min(float(r_corner), rx, ry))
+        return {"is_circle": is_circle, "rx": rx, "ry": ry, "r": r, "cx": rx - r, "cy": ry - r}
+
+    def _make_inside_test(self, shape):
+        rx, ry = shape["rx"], shape["ry"]
+        rx_sq, ry_sq = rx*rx, ry*ry
+        r = shape["r"]
+        r_sq = r*r
+        cx, cy = shape["cx"], shape["cy"]
+
+        if shape["is_circle"]:
+            def is_inside(px, py):
+                return (px*px)/rx_sq + (py*py)/ry_sq <= 1.00001
+            return is_inside
+
+        def is_inside(px, py):
             if not (-rx <= px <= rx and -ry <= py <= ry):
                 return False
-            
-            if r_corner <= 0: return True
-            
+            if r <= 0: return True
             ax, ay = abs(px), abs(py)
-            cx = rx - r_corner
-            cy = ry - r_corner
-            
             if ax > cx and ay > cy:
                 dx = ax - cx
                 dy = ay - cy
-                return (dx*dx + dy*dy) <= (r_corner * r_corner)
+                return (dx*dx + dy*dy) <= r_sq
             return True
+        return is_inside
+
+    @staticmethod
+    def _circle_roots(fx, fy, dx, dy, radius):
+        """Paramètres u où (fx + u.dx, fy + u.dy) coupe le cercle centré en 0"""
+        A = dx*dx + dy*dy
+        if A == 0: return None
+        B = 2 * (fx*dx + fy*dy)
+        C = fx*fx + fy*fy - radius*radius
+        disc = B*B - 4*A*C
+        if disc < 0: return None
+        sq = math.sqrt(disc)
+        return (-B - sq) / (2*A), (-B + sq) / (2*A)
+
+    def _line_interval(self, x0, y0, dx, dy, shape):
+        """
+        Intervalle [lo, hi] de la droite P(u) = (x0, y0) + u.(dx, dy) contenu dans le brut
+        (forme convexe), ou None si la droite ne le traverse pas.
+        """
+        rx, ry = shape["rx"], shape["ry"]
+        if shape["is_circle"]:
+            # Ellipse ramenée au cercle unité
+            return self._circle_roots(x0 / rx, y0 / ry, dx / rx, dy / ry, 1.0)
+
+        # Rectangle : Liang-Barsky sur la droite infinie
+        lo, hi = -math.inf, math.inf
+        for p0, d, half in ((x0, dx, rx), (y0, dy, ry)):
+            if d == 0:
+                if abs(p0) > half: return None
+                continue
+            u1, u2 = (-half - p0) / d, (half - p0) / d
+            if u1 > u2: u1, u2 = u2, u1
+            lo, hi = max(lo, u1), min(hi, u2)
+        if lo > hi: return None
+
+        # Coins arrondis : si l'entrée/sortie tombe dans une zone de coin, on passe par l'arc
+        r = shape["r"]
+        if r > 0:
+            cx, cy = shape["cx"], shape["cy"]
+            px, py = x0 + lo*dx, y0 + lo*dy
+            if abs(px) > cx and abs(py) > cy:
+                roots = self._circle_roots(x0 - math.copysign(cx, px), y0 - math.copysign(cy, py), dx, dy, r)
+                if roots is None: return None
+                lo = roots[0]
+            px, py = x0 + hi*dx, y0 + hi*dy
+            if abs(px) > cx and abs(py) > cy:
+                roots = self._circle_roots(x0 - math.copysign(cx, px), y0 - math.copysign(cy, py), dx, dy, r)
+                if roots is None: return None
+                hi = roots[1]
+            if lo > hi: return None
+        return lo, hi
+
+    def _exit_point(self, p_in, p_out, shape):
+        """Point exact où le segment intérieur -> extérieur franchit le contour du brut"""
+        dx, dy = p_out[0] - p_in[0], p_out[1] - p_in[1]
+        span = self._line_interval(p_in[0], p_in[1], dx, dy, shape)
+        u = min(1.0, max(0.0, span[1])) if span else 0.0
+        return (p_in[0] + u*dx, p_in[1] + u*dy)
+
+    def _chord(self, p1, p2, shape):
+        """Portion intérieure d'un segment dont les deux extrémités sont hors du brut"""
+        rx, ry = shape["rx"], shape["ry"]
+        # Rejet rapide : les deux points du même côté de la boîte englobante
+        if (p1[0] > rx and p2[0] > rx) or (p1[0] < -rx and p2[0] < -rx): return None
+        if (p1[1] > ry and p2[1] > ry) or (p1[1] < -ry and p2[1] < -ry): return None
+        dx, dy = p2[0] - p1[0], p2[1] - p1[1]
+        span = self._line_interval(p1[0], p1[1], dx, dy, shape)
+        if not span or not (0 < span[0] < span[1] < 1): return None
+        lo, hi = span
+        return [(p1[0] + lo*dx, p1[1] + lo*dy), (p1[0] + hi*dx, p1[1] + hi*dy)]
+
+    def _clip_polyline(self, points, is_circle, w, h, r_corner):
+        if len(points) == 0: return []
+        if w <= 0 or h <= 0: return []
+        shape = self._brut_shape(is_circle, w, h, r_corner)
+        if self.vectorized:
+            pts = np.asarray(points, dtype=float)
+            return self._clip_polyline_array(pts[:, 0], pts[:, 1], shape)
+
+        is_inside = self._make_inside_test(shape)
+        segments = []
+        current_segment = []
 
-        def get_intersection(p1, p2):
-            in_p, out_p = p1, p2
-            if not is_inside(p1): in_p, out_p = p2, p1
-            for _ in range(12): 
-                mid_x = (in_p[0] + out_p[0]) / 2
-                mid_y = (in_p[1] + out_p[1]) / 2
-                mid = (mid_x, mid_y)
-                if is_inside(mid): in_p = mid
-                else: out_p = mid
-            return in_p
-
-        if not points: return []
-        
         p_prev = points[0]
-        prev_inside = is_inside(p_prev)
+        prev_inside = is_inside(p_prev[0], p_prev[1])
         if prev_inside:
             current_segment.append(p_prev)
             
         for i in range(1, len(points)):
             p_curr = points[i]
-            curr_inside = is_inside(p_curr)
+            curr_inside = is_inside(p_curr[0], p_curr[1])
             
             if prev_inside and curr_inside:
                 current_segment.append(p_curr)
             elif prev_inside and not curr_inside:
-                inter = get_intersection(p_prev, p_curr)
-                current_segment.append(inter)
+                current_segment.append(self._exit_point(p_prev, p_curr, shape))
                 segments.append(current_segment)
                 current_segment = []
             elif not prev_inside and curr_inside:
-                inter = get_intersection(p_curr, p_prev)
-                current_segment = [inter, p_curr]
+                current_segment = [self._exit_point(p_curr, p_prev, shape), p_curr]
+            else:
+                # Corde : segment qui traverse le brut entre deux points extérieurs
+                chord = self._chord(p_prev, p_curr, shape)
+                if chord: segments.append(chord)
             
             p_prev = p_curr
             prev_inside = curr_inside
             
         if current_segment: segments.append(current_segment)
         return segments
+
+    def _line_interval_array(self, x0, y0, dx, dy, shape):
+        """Version tableau de _line_interval : (lo, hi, ok) pour chaque segment."""
+        rx, ry = shape["rx"], shape["ry"]
+        with np.errstate(all="ignore"):
+            if shape["is_circle"]:
+                lo, hi, ok = self._circle_roots_array(x0 / rx, y0 / ry, dx / rx, dy / ry, 1.0)
+                return lo, hi, ok
+
+            lo = np.full(x0.shape, -np.inf)
+            hi = np.full(x0.shape, np.inf)
+            ok = np.ones(x0.shape, dtype=bool)
+            for p0, d, half in ((x0, dx, rx), (y0, dy, ry)):
+                flat = d == 0
+                u1 = (-half - p0) / d
+                u2 = (half - p0) / d
+                lo = np.where(flat, lo, np.maximum(lo, np.minimum(u1, u2)))
+                hi = np.where(flat, hi, np.minimum(hi, np.maximum(u1, u2)))
+                ok &= ~(flat & (np.abs(p0) > half))
+            ok &= lo <= hi
+
+            r = shape["r"]
+            if r > 0:
+                cx, cy = shape["cx"], shape["cy"]
+                for is_entry in (True, False):
+                    u = lo if is_entry else hi
+                    px, py = x0 + u*dx, y0 + u*dy
+                    zone = ok & (np.abs(px) > cx) & (np.abs(py) > cy)
+                    if not zone.any(): continue
+                    c_lo, c_hi, c_ok = self._circle_roots_array(x0 - np.copysign(cx, px), y0 - np.copysign(cy, py), dx, dy, r)
+                    if is_entry: lo = np.where(zone, c_lo, lo)
+                    else: hi = np.where(zone, c_hi, hi)
+                    ok &= ~zone | c_ok
+                ok &= lo <= hi
+        return lo, hi, ok
+
+    @staticmethod
+    def _circle_roots_array(fx, fy, dx, dy, radius):
+        A = dx*dx + dy*dy
+        B = 2 * (fx*dx + fy*dy)
+        C = fx*fx + fy*fy - radius*radius
+        disc = B*B - 4*A*C
+        ok = (A > 0) & (disc >= 0)
+        sq = np.sqrt(np.where(ok, disc, 0.0))
+        A2 = np.where(ok, 2*A, 1.0)
+        return (-B - sq) / A2, (-B + sq) / A2, ok
+
+    def _clip_polyline_array(self, X, Y, shape):
+        """Découpe exacte de tous les segments d'un coup (X, Y : tableaux NumPy), en listes de tuples."""
+        return [list(zip(px.tolist(), py.tolist())) for px, py in self._clip_pieces_array(X, Y, shape)]
+
+    def _clip_pieces_array(self, X, Y, shape):
+        """Découpe exacte, segments renvoyés en couples de tableaux (X, Y) dans l'ordre de la ligne."""
+        rx, ry = shape["rx"], shape["ry"]
+
+        # 1. Points intérieurs (même tolérance que la version scalaire)
+        if shape["is_circle"]:
+            inside = (X*X)/(rx*rx) + (Y*Y)/(ry*ry) <= 1.00001
+        else:
+            inside = (np.abs(X) <= rx) & (np.abs(Y) <= ry)
+            r = shape["r"]
+            if r > 0:
+                ddx = np.abs(X) - shape["cx"]
+                ddy = np.abs(Y) - shape["cy"]
+                in_zone = (ddx > 0) & (ddy > 0)
+                inside &= ~in_zone | (ddx*ddx + ddy*ddy <= r*r)
+
+        # 2. Intersections exactes des segments qui changent d'état (orientés intérieur -> extérieur)
+        seg_in0, seg_in1 = inside[:-1], inside[1:]
+        cross = np.flatnonzero(seg_in0 != seg_in1)
+        cross_pts = {}
+        if len(cross):
+            k_in = np.where(seg_in0[cross], cross, cross + 1)
+            k_out = np.where(seg_in0[cross], cross + 1, cross)
+            xi, yi = X[k_in], Y[k_in]
+            dx, dy = X[k_out] - xi, Y[k_out] - yi
+            _, hi, ok = self._line_interval_array(xi, yi, dx, dy, shape)
+            u = np.where(ok, np.clip(hi, 0.0, 1.0), 0.0)
+            for k, px, py in zip(cross.tolist(), (xi + u*dx).tolist(), (yi + u*dy).tolist()):
+                cross_pts[k] = (px, py)
+
+        # 3. Cordes : segments extérieurs aux deux bouts qui traversent le brut
+        pieces = []
+        X0, X1, Y0, Y1 = X[:-1], X[1:], Y[:-1], Y[1:]
+        same_side = ((X0 > rx) & (X1 > rx)) | ((X0 < -rx) & (X1 < -rx)) | ((Y0 > ry) & (Y1 > ry)) | ((Y0 < -ry) & (Y1 < -ry))
+        outside_seg = np.flatnonzero(~seg_in0 & ~seg_in1 & ~same_side)
+        if len(outside_seg):
+            x0, y0 = X[outside_seg], Y[outside_seg]
+            dx, dy = X[outside_seg + 1] - x0, Y[outside_seg + 1] - y0
+            lo, hi, ok = self._line_interval_array(x0, y0, dx, dy, shape)
+            hit = ok & (lo > 0) & (lo < hi) & (hi < 1)
+            for k, l, h in zip(outside_seg[hit].tolist(), lo[hit].tolist(), hi[hit].tolist()):
+                x, y, ddx, ddy = X[k], Y[k], X[k+1] - X[k], Y[k+1] - Y[k]
+                pieces.append((k + 0.5, (np.array([x + l*ddx, x + h*ddx]), np.array([y + l*ddy, y + h*ddy]))))
+
+        # 4. Suites de points intérieurs, bornées par les intersections exactes
+        flags = np.concatenate(([False], inside, [False])).astype(np.int8)
+        edges = np.flatnonzero(np.diff(flags))
+        n = len(X)
+        for s, e in zip(edges[0::2].tolist(), (edges[1::2] - 1).tolist()):
+            px, py = X[s:e+1], Y[s:e+1]
+            if s > 0 or e < n - 1:
+                head = [cross_pts[s - 1]] if s > 0 else []
+                tail = [cross_pts[e]] if e < n - 1 else []
+                px = np.concatenate(([p[0] for p in head], px, [p[0] for p in tail]))
+                py = np.concatenate(([p[1] for p in head], py, [p[1] for p in tail]))
+            pieces.append((s, (px, py)))
+
+        pieces.sort(key=lambda item: item[0])
+        return [seg for _, seg in pieces]
@@ -73,9 +73,7 @@ class FormulaLab(tk.Toplevel):
         self.txt_code.pack(fill="both", expand=True, padx=5, pady=5)
         
         # CODE INITIAL TRADUIT
-        v_amp = self.t("p_amplitude")
-        v_nb = self.t("p_nb_lines")
-        code_init = self.t("lab_code_wave") + f"\n\nval = t * {v_nb}\nresult = {v_amp} * math.sin(val)"
+        code_init = self.t("lab_code_wave") + "\n\nresult = math.sin(t)"
         self.txt_code.insert("1.0", code_init)
 
         f_act = tk.Frame(self.frame_left, bg="#252526", pady=10)
@@ -123,9 +121,7 @@ class FormulaLab(tk.Toplevel):
             self.txt_code.delete("1.0", tk.END)
             self.txt_code.insert("1.0", code_txt)
         else:
-            v_amp = self.t("p_amplitude")
-            v_nb = self.t("p_nb_lines")
-            code_txt = self.t("lab_code_wave") + f"\n\nval = t * {v_nb}\nresult = {v_amp} * math.sin(val)"
+            code_txt = self.t("lab_code_wave") + "\n\nresult = math.sin(t)"
             self.txt_code.delete("1.0", tk.END)
             self.txt_code.insert("1.0", code_txt)
 
@@ -143,17 +139,19 @@ class FormulaLab(tk.Toplevel):
         try:
             local_context = {"math": math, "abs": abs, "params": params}
             steps = 200
+            is_traj = (self.var_type.get() == self.t("lab_cat_traj"))
             for i in range(steps):
-                t = i / (steps - 1)
+                u = i / (steps - 1)
+                # Onde : t est l'angle (deux périodes affichées), result normalisé entre -1 et 1
+                t = u if is_traj else u * 4 * math.pi
                 local_context["t"] = t
                 for k, v in params.items(): local_context[k] = v
                 exec(user_code, {}, local_context)
                 res = local_context.get("result", 0)
                 
-                is_traj = (self.var_type.get() == self.t("lab_cat_traj"))
                 if not is_traj:
-                    px = t * w
-                    py = cy - (res * 10) 
+                    px = u * w
+                    py = cy - (res * h / 4)
                     points.extend([px, py])
                 else:
                     pos, vec = res
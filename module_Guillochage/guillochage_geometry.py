@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Module Géométrie - Conteneurs compacts pour les polylignes calculées
+(coordonnées en tableaux contigus de flottants au lieu de listes de tuples)
+"""
+import math
+from array import array
+
+# NumPy est optionnel : il sert seulement d'accélérateur
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Taille de portion à partir de laquelle la simplification passe par NumPy
+_RDP_NUMPY_MIN = 64
+
+
+# --- SIMPLIFICATION (RAMER-DOUGLAS-PEUCKER) ---
+def rdp_keep(X, Y, tolerance):
+    """
+    Masque des points conservés par Ramer-Douglas-Peucker : on retire les points situés
+    à moins de tolerance (mm) de la corde qui les enjambe. Extrémités toujours conservées.
+    """
+    n = len(X)
+    keep = [True] * n
+    if tolerance <= 0 or n < 3: return keep
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    # NumPy seulement sur les longues portions (en dessous, la boucle est plus rapide)
+    AX = np.asarray(X, dtype=float) if np is not None and n > _RDP_NUMPY_MIN else None
+    AY = np.asarray(Y, dtype=float) if AX is not None else None
+
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2: continue
+        ax, ay = X[a], Y[a]
+        dx, dy = X[b] - ax, Y[b] - ay
+        length = math.hypot(dx, dy)
+        if AX is not None and b - a > _RDP_NUMPY_MIN:
+            xs, ys = AX[a+1:b] - ax, AY[a+1:b] - ay
+            # Corde nulle (boucle fermée) : distance au point de départ
+            dist = np.abs(xs * dy - ys * dx) / length if length > 0 else np.hypot(xs, ys)
+            k = int(dist.argmax())
+            d_max, m = dist[k], a + 1 + k
+        else:
+            d_max, m = -1.0, a
+            for j in range(a + 1, b):
+                xs, ys = X[j] - ax, Y[j] - ay
+                d = abs(xs * dy - ys * dx) / length if length > 0 else math.hypot(xs, ys)
+                if d > d_max: d_max, m = d, j
+        if d_max > tolerance:
+            keep[m] = True
+            stack.append((m, b))
+            stack.append((a, m))
+    return keep
+
+def simplify_polyline(points, tolerance):
+    """Version liste de tuples de rdp_keep"""
+    if tolerance <= 0 or len(points) < 3: return points
+    keep = rdp_keep([p[0] for p in points], [p[1] for p in points], tolerance)
+    return [p for p, kept in zip(points, keep) if kept]
+
+
+# --- SEGMENTS D'UNE LIGNE ---
+class LineSegments:
+    """
+    Segments découpés d'une seule ligne : xs / ys contigus, offsets[i]:offsets[i+1] = segment i.
+    C'est la forme stockée dans le cache du moteur et renvoyée par le pool de calcul.
+    """
+    def __init__(self, xs=None, ys=None, offsets=None):
+        self.xs = xs if xs is not None else array("d")
+        self.ys = ys if ys is not None else array("d")
+        self.offsets = offsets if offsets is not None else array("q", [0])
+
+    @classmethod
+    def from_points(cls, segments):
+        """Depuis une liste de segments [(x, y), ...]"""
+        line = cls()
+        for seg in segments:
+            line.xs.extend(p[0] for p in seg)
+            line.ys.extend(p[1] for p in seg)
+            line.offsets.append(len(line.xs))
+        return line
+
+    @classmethod
+    def from_arrays(cls, pieces):
+        """Depuis une liste de couples de tableaux NumPy (X, Y), sans passer par des tuples"""
+        line = cls()
+        if not pieces: return line
+        line.xs.frombytes(np.concatenate([p[0] for p in pieces]).astype(float).tobytes())
+        line.ys.frombytes(np.concatenate([p[1] for p in pieces]).astype(float).tobytes())
+        total = 0
+        for p in pieces:
+            total += len(p[0])
+            line.offsets.append(total)
+        return line
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def point_count(self):
+        return len(self.xs)
+
+    def segment(self, i):
+        s, e = self.offsets[i], self.offsets[i + 1]
+        return self.xs[s:e], self.ys[s:e]
+
+    def points(self, i):
+        """Segment i en liste de tuples (compatibilité)"""
+        xs, ys = self.segment(i)
+        return list(zip(xs, ys))
+
+    def simplified(self, tolerance):
+        """Copie simplifiée (RDP) segment par segment"""
+        if tolerance <= 0: return self
+        line = LineSegments()
+        for i in range(len(self)):
+            xs, ys = self.segment(i)
+            keep = rdp_keep(xs, ys, tolerance)
+            line.xs.extend(x for x, kept in zip(xs, keep) if kept)
+            line.ys.extend(y for y, kept in zip(ys, keep) if kept)
+            line.offsets.append(len(line.xs))
+        return line
+
+
+# --- LISTE DE RENDU ---
+class RenderGeometry:
+    """
+    Liste de rendu compacte consommée par le canvas et les exports.
+    Un segment = une polyligne ; ses métadonnées (calque, ligne, style) sont des
+    index dans des tableaux parallèles, les noms et couleurs n'étant stockés qu'une fois.
+    """
+    def __init__(self):
+        self.xs = array("d")
+        self.ys = array("d")
+        self.offsets = array("q", [0])
+        self.seg_layer = array("i")
+        self.seg_line = array("i")
+        self.seg_style = array("i")
+        self.layer_names = []
+        self.styles = []          # (couleur, épaisseur)
+        self._layer_ids = {}
+        self._style_ids = {}
+        self._bounds = None
+        # {identifiant du calque (uid): (nom, version)} ; la version (clé de cache du moteur) repère
+        # les calques modifiés, même quand deux calques portent le même nom
+        self.layer_versions = {}
+
+    def _layer_id(self, name):
+        lid = self._layer_ids.get(name)
+        if lid is None:
+            lid = self._layer_ids[name] = len(self.layer_names)
+            self.layer_names.append(name)
+        return lid
+
+    def _style_id(self, color, thickness):
+        key = (color, float(thickness))
+        sid = self._style_ids.get(key)
+        if sid is None:
+            sid = self._style_ids[key] = len(self.styles)
+            self.styles.append(key)
+        return sid
+
+    def add_line(self, line, layer_name, line_index, color, thickness):
+        """Ajoute tous les segments (≥ 2 points) d'une LineSegments"""
+        self._bounds = None
+        lid = self._layer_id(layer_name)
+        sid = self._style_id(color, thickness)
+        offs = line.offsets
+        for i in range(len(offs) - 1):
+            s, e = offs[i], offs[i + 1]
+            if e - s < 2: continue
+            self.xs.extend(line.xs[s:e])
+            self.ys.extend(line.ys[s:e])
+            self.offsets.append(len(self.xs))
+            self.seg_layer.append(lid)
+            self.seg_line.append(int(line_index))
+            self.seg_style.append(sid)
+
+    def extend(self, other):
+        """Concatène une autre RenderGeometry (les index de calque/style sont renumérotés)"""
+        self._bounds = None
+        base = len(self.xs)
+        self.xs.extend(other.xs)
+        self.ys.extend(other.ys)
+        self.offsets.extend(o + base for o in other.offsets[1:])
+        layer_map = [self._layer_id(name) for name in other.layer_names]
+        style_map = [self._style_id(*style) for style in other.styles]
+        self.seg_layer.extend(layer_map[l] for l in other.seg_layer)
+        self.seg_line.extend(other.seg_line)
+        self.seg_style.extend(style_map[s] for s in other.seg_style)
+        self.layer_versions.update(other.layer_versions)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def point_count(self):
+        return len(self.xs)
+
+    @property
+    def nbytes(self):
+        arrays = (self.xs, self.ys, self.offsets, self.seg_layer, self.seg_line, self.seg_style)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def segment_bounds(self):
+        """Boîtes englobantes (xmin, ymin, xmax, ymax) de chaque segment, calculées une seule fois"""
+        if self._bounds is None:
+            n = len(self)
+            if np is not None and n:
+                X, Y = self.as_numpy()
+                starts = np.frombuffer(self.offsets, dtype=np.int64)[:-1]
+                self._bounds = (np.minimum.reduceat(X, starts), np.minimum.reduceat(Y, starts),
+                                np.maximum.reduceat(X, starts), np.maximum.reduceat(Y, starts))
+            else:
+                offs = self.offsets
+                xs_min, ys_min, xs_max, ys_max = [], [], [], []
+                for i in range(n):
+                    xs, ys = self.xs[offs[i]:offs[i+1]], self.ys[offs[i]:offs[i+1]]
+                    xs_min.append(min(xs)); ys_min.append(min(ys))
+                    xs_max.append(max(xs)); ys_max.append(max(ys))
+                self._bounds = (xs_min, ys_min, xs_max, ys_max)
+        return self._bounds
+
+    def layer_index(self, name):
+        """Index du calque dans layer_names (None s'il n'a aucun segment)"""
+        return self._layer_ids.get(name)
+
+    def layer_bounds(self, names):
+        """{nom: (xmin, ymin, xmax, ymax)} de la géométrie des calques demandés"""
+        bx0, by0, bx1, by1 = self.segment_bounds()
+        boxes = {}
+        for name in names:
+            lid = self._layer_ids.get(name)
+            if lid is None: continue
+            if np is not None:
+                mask = np.frombuffer(self.seg_layer, dtype=np.int32) == lid
+                if not mask.any(): continue
+                boxes[name] = (float(bx0[mask].min()), float(by0[mask].min()), float(bx1[mask].max()), float(by1[mask].max()))
+            else:
+                sel = [i for i, l in enumerate(self.seg_layer) if l == lid]
+                if not sel: continue
+                boxes[name] = (min(bx0[i] for i in sel), min(by0[i] for i in sel), max(bx1[i] for i in sel), max(by1[i] for i in sel))
+        return boxes
+
+    def segment_info(self, i):
+        """(nom du calque, index de ligne, couleur, épaisseur) du segment i"""
+        color, thickness = self.styles[self.seg_style[i]]
+        return self.layer_names[self.seg_layer[i]], self.seg_line[i], color, thickness
+
+    def iter_segments(self):
+        """(xs, ys, calque, ligne, couleur, épaisseur) pour chaque segment"""
+        xs, ys, offs = self.xs, self.ys, self.offsets
+        for i in range(len(offs) - 1):
+            s, e = offs[i], offs[i + 1]
+            color, thickness = self.styles[self.seg_style[i]]
+            yield xs[s:e], ys[s:e], self.layer_names[self.seg_layer[i]], self.seg_line[i], color, thickness
+
+    def items(self):
+        """Ancien format (dicts avec points en liste de tuples), pour les scripts externes"""
+        for xs, ys, layer_name, line_index, color, thickness in self.iter_segments():
+            yield {"type": "polyline", "points": list(zip(xs, ys)), "color": color,
+                   "thickness": thickness, "layer_name": layer_name, "line_index": line_index}
+
+    def as_numpy(self):
+        """Vues NumPy (sans copie) des coordonnées"""
+        if np is None or not self.xs: return None
+        return np.frombuffer(self.xs, dtype=float), np.frombuffer(self.ys, dtype=float)
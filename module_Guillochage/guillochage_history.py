@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Module Historique - Annuler / Rétablir par différences
+(chaque étape ne stocke que les valeurs modifiées : chemin + ancienne/nouvelle valeur)
+"""
+import copy
+
+class _Missing:
+    """Clé absente d'un dict (ajout ou suppression de clé) ; survit à deepcopy"""
+    def __deepcopy__(self, memo): return self
+    def __copy__(self): return self
+    def __repr__(self): return "MISSING"
+
+MISSING = _Missing()
+
+
+# --- DIFFÉRENCES ---
+def diff_state(old, new, path=()):
+    """
+    Liste des changements [(chemin, ancienne, nouvelle)] pour passer de old à new.
+    Les dicts et les listes sont parcourus ; quand une liste change de longueur, sa fin
+    est remplacée en bloc (chemin terminé par une slice). Ailleurs la valeur est remplacée.
+    """
+    if type(old) is not type(new):
+        return [(path, old, new)]
+    if isinstance(new, dict):
+        changes = []
+        for key, value in new.items():
+            if key in old: changes.extend(diff_state(old[key], value, path + (key,)))
+            else: changes.append((path + (key,), MISSING, value))
+        for key in old:
+            if key not in new: changes.append((path + (key,), old[key], MISSING))
+        return changes
+    if isinstance(new, list):
+        changes = []
+        for i, (a, b) in enumerate(zip(old, new)):
+            changes.extend(diff_state(a, b, path + (i,)))
+        common = min(len(old), len(new))
+        if len(old) != len(new): changes.append((path + (slice(common, None),), old[common:], new[common:]))
+        return changes
+    return [] if old == new else [(path, old, new)]
+
+def set_path(state, path, value):
+    """Écrit value au chemin donné (MISSING supprime la clé) ; renvoie la racine"""
+    if not path: return value
+    parent = state
+    for key in path[:-1]: parent = parent[key]
+    if value is MISSING: del parent[path[-1]]
+    else: parent[path[-1]] = value
+    return state
+
+
+# --- HISTORIQUE ---
+class History:
+    """
+    Pile d'annulation par deltas. `base` est l'unique copie complète : l'état au dernier
+    enregistrement, tenue à jour en y rejouant les deltas (jamais re-sérialisée).
+    """
+    def __init__(self, max_depth=1000):
+        self.max_depth = max_depth
+        self.base = None
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def reset(self, state):
+        self.base = copy.deepcopy(state)
+        self.undo_stack = []
+        self.redo_stack = []
+
+    def record(self, state):
+        """Enregistre l'état courant ; renvoie False s'il n'a pas changé"""
+        if self.base is None:
+            self.reset(state)
+            return False
+        changes = [(path, old, copy.deepcopy(new)) for path, old, new in diff_state(self.base, state)]
+        if not changes: return False
+        for path, _, new in changes:
+            self.base = set_path(self.base, path, copy.deepcopy(new))
+        self.undo_stack.append(changes)
+        if len(self.undo_stack) > self.max_depth: self.undo_stack.pop(0)
+        self.redo_stack.clear()
+        return True
+
+    def can_undo(self): return bool(self.undo_stack)
+
+    def can_redo(self): return bool(self.redo_stack)
+
+    def undo(self):
+        """Revient d'une étape ; renvoie les chemins touchés (None si rien à annuler)"""
+        if not self.undo_stack: return None
+        changes = self.undo_stack.pop()
+        for path, old, _ in reversed(changes):
+            self.base = set_path(self.base, path, copy.deepcopy(old))
+        self.redo_stack.append(changes)
+        return [path for path, _, _ in changes]
+
+    def redo(self):
+        if not self.redo_stack: return None
+        changes = self.redo_stack.pop()
+        for path, _, new in changes:
+            self.base = set_path(self.base, path, copy.deepcopy(new))
+        self.undo_stack.append(changes)
+        return [path for path, _, _ in changes]
+
+    def state(self, path=()):
+        """Copie de l'état enregistré (ou d'une partie) à réinjecter dans l'interface"""
+        node = self.base
+        for key in path: node = node[key]
+        return copy.deepcopy(node)
@@ -45,7 +45,7 @@ class GuillochageIO:
 
     @staticmethod
     def export_dxf(filename, render_list, brut_data=None):
-        """Export DXF standard avec Brut"""
+        """Export DXF standard avec Brut (render_list : RenderGeometry du moteur)"""
         with open(filename, 'w', encoding='utf-8') as f:
             # Header
             f.write("0\nSECTION\n2\nHEADER\n9\n$ACADVER\n1\nAC1009\n0\nENDSEC\n")
@@ -82,17 +82,16 @@ class GuillochageIO:
                     print(f"Err Brut DXF: {e}")
 
             # --- 2. DESSIN DU GUILLOCHAGE ---
-            for item in render_list:
-                pts = item.get("points", [])
-                if len(pts) < 2: continue
-                col = GuillochageIO.rgb_to_dxf_color(item.get("color", "#000000"))
-                GuillochageIO._write_dxf_polyline(f, pts, color=col, layer="Guillochage")
+            for xs, ys, _layer, _line, color, _thk in render_list.iter_segments():
+                if len(xs) < 2: continue
+                col = GuillochageIO.rgb_to_dxf_color(color or "#000000")
+                GuillochageIO._write_dxf_polyline(f, list(zip(xs, ys)), color=col, layer="Guillochage")
 
             f.write("0\nENDSEC\n0\nEOF\n")
 
     @staticmethod
     def export_svg(filename, render_list, brut_data=None):
-        """Export SVG vectoriel avec Brut"""
+        """Export SVG vectoriel avec Brut (render_list : RenderGeometry du moteur)"""
         try:
             bw = float(brut_data.get("dim1", 100))
             bh = float(brut_data.get("dim2", 100))
@@ -121,14 +120,11 @@ class GuillochageIO:
                 except: pass
 
             # --- 2. DESSIN DU GUILLOCHAGE ---
-            for item in render_list:
-                pts = item.get("points", [])
-                if len(pts) < 2: continue
-                col = item.get("color", "black")
-                thk = item.get("thickness", 1.0)
+            for xs, ys, _layer, _line, col, thk in render_list.iter_segments():
+                if len(xs) < 2: continue
                 
                 path_d = []
-                for i, (x, y) in enumerate(pts):
+                for i, (x, y) in enumerate(zip(xs, ys)):
                     # Inversion Y pour SVG et centrage
                     sx = cx + x
                     sy = cy - y
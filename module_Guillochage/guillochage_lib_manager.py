@@ -3,15 +3,18 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import os
 import glob
-import importlib.util
 import shutil
 import sys
 
+from guillochage_plugins import plugin_index
+
 class LibraryManager(tk.Toplevel):
     def __init__(self, parent, app_instance=None, on_update_callback=None):
         super().__init__(parent)
         self.app = app_instance
         self.on_update_callback = on_update_callback 
+        # INFO des plugins lus sans les exécuter (cache disque partagé avec la Zone 4)
+        self.index = plugin_index()
         
         self.title(self.t("lib_title"))
         self.geometry("1000x650")
@@ -62,6 +65,10 @@ class LibraryManager(tk.Toplevel):
         self.lbl_formula = tk.Label(self.header_info, text="", fg="#6a9955", bg="#252526", font=("Consolas", 10), anchor="w")
         self.lbl_formula.pack(fill="x", pady=(5,0))
 
+        # Erreur du dernier chargement par le moteur (plugin en service : version précédente ou repli)
+        self.lbl_error = tk.Label(self.header_info, text="", fg="#f48771", bg="#252526", font=("Consolas", 9), anchor="w", wraplength=500, justify="left")
+        self.lbl_error.pack(fill="x", pady=(5,0))
+
         tk.Label(self.frame_right, text=self.t("lib_grp_default"), fg="#007acc", bg="#1e1e1e", font=("Segoe UI", 9, "bold")).pack(anchor="w", padx=10, pady=(10, 5))
         
         self.param_tree = ttk.Treeview(self.frame_right, columns=("Key", "Value"), show="headings")
@@ -96,14 +103,31 @@ class LibraryManager(tk.Toplevel):
         
         base_path = os.path.join(os.path.dirname(__file__), "lib_courbes")
         
-        self._scan_folder(os.path.join(base_path, "Trajectoires"), root_traj, is_python=True)
-        self._scan_folder(os.path.join(base_path, "Ondes"), root_onde, is_python=True)
+        self._scan_plugins("Trajectoires", root_traj)
+        self._scan_plugins("Ondes", root_onde)
         self._scan_folder(os.path.join(base_path, "Prereglages"), root_pre, is_python=False)
         
         if self.on_update_callback:
             try: self.on_update_callback()
             except: pass
 
+    def _plugin_errors(self):
+        """{chemin normalisé: message} des plugins que le moteur n'a pas pu charger"""
+        engine = getattr(self.app, "engine", None)
+        if engine is None: return {}
+        return {os.path.normcase(os.path.abspath(path)): error for path, error in engine.plugins.errors().items()}
+
+    def _scan_plugins(self, folder, parent_node):
+        errors = self._plugin_errors()
+        for name, path, info in self.index.list(folder):
+            display_name = os.path.basename(path)
+            if info and "nom" in info: display_name = info["nom"]
+            file_key = "file_" + name.lower()
+            trans_name = self.t(file_key)
+            if trans_name != file_key: display_name = trans_name
+            if os.path.normcase(os.path.abspath(path)) in errors: display_name = "⚠ " + display_name
+            self.tree.insert(parent_node, "end", text=display_name, values=(path, "py"))
+
     def _scan_folder(self, path, parent_node, is_python):
         if not os.path.exists(path): return
         ext = "*.py" if is_python else "*.json"
@@ -125,13 +149,8 @@ class LibraryManager(tk.Toplevel):
             self.tree.insert(parent_node, "end", text=display_name, values=(f, "py" if is_python else "json"))
 
     def _load_py_info(self, filepath):
-        try:
-            spec = importlib.util.spec_from_file_location("temp_module", filepath)
-            mod = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(mod)
-            if hasattr(mod, "INFO"): return mod.INFO
-        except: pass
-        return None
+        """INFO du fichier par analyse statique (jamais exécuté, même à l'import)"""
+        return self.index.info(filepath)
 
     def on_select(self, event):
         item = self.tree.selection()
@@ -144,9 +163,12 @@ class LibraryManager(tk.Toplevel):
         self.lbl_titre.config(text="...")
         self.lbl_desc.config(text="")
         self.lbl_formula.config(text="")
+        self.lbl_error.config(text="")
         self.param_tree.delete(*self.param_tree.get_children())
         
         if type_file == "py":
+            error = self._plugin_errors().get(os.path.normcase(os.path.abspath(filepath)))
+            if error: self.lbl_error.config(text=f"{self.t('lib_lbl_error')} {error}")
             info = self._load_py_info(filepath)
             if info:
                 # Traduction du Titre du fichier
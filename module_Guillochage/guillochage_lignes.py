@@ -76,9 +76,75 @@ COL_CONFIG = [
 ]
 
 class LigneRow(tk.Frame):
+    """
+    Ligne du tableau. Les widgets sont créés une seule fois : bind_line() les réaffecte
+    à une autre ligne, ce qui permet au panneau de recycler les lignes au défilement.
+    """
     def __init__(self, parent, manager, index, line_dict, global_params, calque_color):
         super().__init__(parent, bg="#2d2d30", pady=2)
         self.manager = manager
+        self.elements = []
+        
+        self.var_active = tk.BooleanVar(value=True)
+        self.chk = tk.Checkbutton(self, variable=self.var_active, bg="#2d2d30", activebackground="#2d2d30", selectcolor="#2d2d30", bd=0, command=self.on_toggle_active)
+        self.chk.grid(row=0, column=0, sticky="w", padx=(5, 2))
+        self.elements.append(self.chk)
+
+        self.lbl_idx = tk.Label(self, width=3, font=("Segoe UI", 9, "normal"))
+        self.lbl_idx.grid(row=0, column=1, sticky="w")
+        self.elements.append(self.lbl_idx)
+
+        self.canvas_color = tk.Canvas(self, width=14, height=14, bg="#2d2d30", highlightthickness=0)
+        self.color_rect = self.canvas_color.create_rectangle(1, 1, 13, 13, outline="#555")
+        self.canvas_color.grid(row=0, column=2, padx=5)
+        self.elements.append(self.canvas_color)
+
+        self.col_labels = []
+        current_col = 3
+        for key, title_key, weight, fmt in COL_CONFIG:
+            l = tk.Label(self, anchor="c", font=("Segoe UI", 9))
+            l.grid(row=0, column=current_col, sticky="ew", padx=1)
+            self.columnconfigure(current_col, weight=weight)
+            self.elements.append(l)
+            self.col_labels.append(l)
+            l.bind("<Button-1>", self.on_simple_click)
+            current_col += 1
+
+        self.frame_actions = tk.Frame(self)
+        self.frame_actions.grid(row=0, column=99, sticky="e", padx=(5, 10))
+        self.columnconfigure(99, weight=0)
+        self.elements.append(self.frame_actions)
+        
+        self.btn_edit = tk.Button(self.frame_actions, text="✎", command=self.on_edit_click, bg="#3e3e42", fg="white", bd=0, width=3, cursor="hand2")
+        self.btn_edit.pack(side="left", padx=2)
+        ToolTip(self.btn_edit, lambda: self.manager.t("z5_act_edit"))
+        
+        self.btn_reset = tk.Button(self.frame_actions, text="⟲", command=self.on_reset, bg="#3e3e42", bd=0, width=3, cursor="hand2")
+        self.btn_reset.pack(side="left", padx=2)
+        ToolTip(self.btn_reset, lambda: self.manager.t("z5_act_reset"))
+
+        self.btn_del = tk.Button(self.frame_actions, command=self.on_toggle_delete, bg="#3e3e42", bd=0, width=3, cursor="hand2")
+        self.btn_del.pack(side="left", padx=2)
+        ToolTip(self.btn_del, lambda: "Restaurer" if self.is_deleted else self.manager.t("z5_act_del"))
+
+        all_widgets = [self, self.lbl_idx, self.canvas_color, self.frame_actions] + self.elements
+        for w in all_widgets:
+            if isinstance(w, (tk.Button, tk.Checkbutton)): continue
+            w.bind("<Button-1>", self.on_simple_click, add="+")
+            w.bind("<Control-Button-1>", self.on_multi_select, add="+")
+            w.bind("<Button-3>", self.on_right_click, add="+")
+            
+        self.bind("<Enter>", self.on_enter)
+        self.bind("<Leave>", self.on_leave)
+        for el in self.elements:
+            if isinstance(el, tk.Label):
+                el.bind("<Enter>", self.on_enter)
+                el.bind("<Leave>", self.on_leave)
+
+        self.bind_line(index, line_dict, global_params, calque_color)
+
+    def bind_line(self, index, line_dict, global_params, calque_color):
+        """Affiche la ligne `index` dans ces widgets (aucune création/destruction)"""
         self.index = index
         self.line_dict = line_dict
         
@@ -96,31 +162,16 @@ class LigneRow(tk.Frame):
             self.default_fg = "#ffae00" if self.has_override else "#d4d4d4"
             self.bg_color = "#2d2d30"
 
-        self.config(bg=self.bg_color)
-        
-        self.elements = []
-        
-        self.var_active = tk.BooleanVar(value=line_dict.get("is_active", True))
-        self.chk = tk.Checkbutton(self, variable=self.var_active, bg=self.bg_color, activebackground=self.bg_color, selectcolor="#2d2d30", bd=0, command=self.on_toggle_active)
-        self.chk.grid(row=0, column=0, sticky="w", padx=(5, 2))
-        if self.is_deleted: self.chk.config(state="disabled")
-        self.elements.append(self.chk)
+        self.var_active.set(line_dict.get("is_active", True))
+        self.chk.config(state="disabled" if self.is_deleted else "normal")
 
         font_style = ("Segoe UI", 9, "bold" if self.has_override else "normal")
         if self.is_deleted: font_style = ("Segoe UI", 9, "overstrike")
-        
-        self.lbl_idx = tk.Label(self, text=f"{index + 1:02d}", fg=self.default_fg, bg=self.bg_color, width=3, font=font_style)
-        self.lbl_idx.grid(row=0, column=1, sticky="w")
-        self.elements.append(self.lbl_idx)
+        self.lbl_idx.config(text=f"{index + 1:02d}", font=font_style)
 
-        self.canvas_color = tk.Canvas(self, width=14, height=14, bg=self.bg_color, highlightthickness=0)
-        if not self.is_deleted:
-            self.canvas_color.create_rectangle(1, 1, 13, 13, fill=calque_color, outline="#555")
-        self.canvas_color.grid(row=0, column=2, padx=5)
-        self.elements.append(self.canvas_color)
+        self.canvas_color.itemconfig(self.color_rect, fill=calque_color, state="hidden" if self.is_deleted else "normal")
 
-        current_col = 3
-        for key, title_key, weight, fmt in COL_CONFIG:
+        for l, (key, title_key, weight, fmt) in zip(self.col_labels, COL_CONFIG):
             raw_val = self.final_params.get(key, 0)
             if callable(fmt): val_str = fmt(raw_val)
             elif isinstance(fmt, str): val_str = fmt.format(float(raw_val)) if isinstance(raw_val, (int, float)) else str(raw_val)
@@ -143,53 +194,14 @@ class LigneRow(tk.Frame):
                 if val_str in res_map: val_str = self.manager.t(res_map[val_str])
 
             if self.is_deleted: val_str = "---"
+            l.config(text=val_str)
 
-            l = tk.Label(self, text=val_str, fg="#666" if self.is_deleted else "#969696", bg=self.bg_color, anchor="c", font=("Segoe UI", 9))
-            l.grid(row=0, column=current_col, sticky="ew", padx=1)
-            self.columnconfigure(current_col, weight=weight)
-            self.elements.append(l)
-            l.bind("<Button-1>", self.on_simple_click)
-            current_col += 1
-
-        self.frame_actions = tk.Frame(self, bg=self.bg_color)
-        self.frame_actions.grid(row=0, column=99, sticky="e", padx=(5, 10))
-        self.columnconfigure(99, weight=0)
-        self.elements.append(self.frame_actions)
-        
-        btn_edit = tk.Button(self.frame_actions, text="✎", command=self.on_edit_click, bg="#3e3e42", fg="white", bd=0, width=3, cursor="hand2")
-        btn_edit.pack(side="left", padx=2)
-        if self.is_deleted: btn_edit.config(state="disabled", bg="#222")
-        ToolTip(btn_edit, lambda: self.manager.t("z5_act_edit"))
+        self.btn_edit.config(state="disabled" if self.is_deleted else "normal", bg="#222" if self.is_deleted else "#3e3e42")
         
         can_reset = self.has_override or self.is_deleted
-        state_reset = "normal" if can_reset else "disabled"
-        fg_reset = "white" if can_reset else "#555"
-        
-        self.btn_reset = tk.Button(self.frame_actions, text="⟲", command=self.on_reset, state=state_reset, bg="#3e3e42", fg=fg_reset, bd=0, width=3, cursor="hand2")
-        self.btn_reset.pack(side="left", padx=2)
-        ToolTip(self.btn_reset, lambda: self.manager.t("z5_act_reset"))
+        self.btn_reset.config(state="normal" if can_reset else "disabled", fg="white" if can_reset else "#555")
 
-        icon_del = "♻" if self.is_deleted else "🗑️"
-        fg_del = "#4CAF50" if self.is_deleted else "#f48771"
-        tooltip_del = "Restaurer" if self.is_deleted else self.manager.t("z5_act_del")
-        
-        btn_del = tk.Button(self.frame_actions, text=icon_del, command=self.on_toggle_delete, bg="#3e3e42", fg=fg_del, bd=0, width=3, cursor="hand2")
-        btn_del.pack(side="left", padx=2)
-        ToolTip(btn_del, lambda: tooltip_del)
-
-        all_widgets = [self, self.lbl_idx, self.canvas_color, self.frame_actions] + self.elements
-        for w in all_widgets:
-            if isinstance(w, (tk.Button, tk.Checkbutton)): continue
-            w.bind("<Button-1>", self.on_simple_click, add="+")
-            w.bind("<Control-Button-1>", self.on_multi_select, add="+")
-            w.bind("<Button-3>", self.on_right_click, add="+")
-            
-        self.bind("<Enter>", self.on_enter)
-        self.bind("<Leave>", self.on_leave)
-        for el in self.elements:
-            if isinstance(el, tk.Label):
-                el.bind("<Enter>", self.on_enter)
-                el.bind("<Leave>", self.on_leave)
+        self.btn_del.config(text="♻" if self.is_deleted else "🗑️", fg="#4CAF50" if self.is_deleted else "#f48771")
 
     def on_enter(self, event=None):
         if self.index not in self.manager.selected_indices and self.index != self.manager.editing_index:
@@ -273,7 +285,11 @@ class LignesPanel:
         self.on_delete_callback = on_delete_callback
         self.on_paste_callback = on_paste_callback
         
+        # Liste virtualisée : seules les lignes visibles ont des widgets, recyclés au défilement
         self.rows = []
+        self.row_items = []          # item canvas (create_window) de chaque ligne du pool
+        self.row_height = 28         # remesuré sur la première ligne créée
+        self._layout_busy = False
         self.current_calque_global = {}
         self.current_calque_lines = []
         self.current_calque_color = "#ffffff"
@@ -307,18 +323,13 @@ class LignesPanel:
 
         self.canvas = tk.Canvas(self.parent, bg="#252526", highlightthickness=0)
         self.scrollbar = tk.Scrollbar(self.parent, orient="vertical", command=self.canvas.yview)
-        self.list_frame = tk.Frame(self.canvas, bg="#252526")
-        
-        self.window_id = self.canvas.create_window((0, 0), window=self.list_frame, anchor="nw")
         
         def on_canvas_configure(event):
-            self.canvas.itemconfig(self.window_id, width=event.width)
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            for item in self.row_items: self.canvas.itemconfig(item, width=event.width)
+            self.layout_rows()
         self.canvas.bind("<Configure>", on_canvas_configure)
-        self.list_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.configure(yscrollcommand=self.on_yscroll)
         
-        self.list_frame.bind("<Button-1>", self.deselect_all)
         self.canvas.bind("<Button-1>", self.deselect_all)
         
         self.canvas.pack(side="left", fill="both", expand=True)
@@ -351,19 +362,59 @@ class LignesPanel:
         self.refresh_table()
 
     def refresh_table(self):
-        for row in self.rows: row.destroy()
-        self.rows = []
-        if not self.current_calque_lines: return
-        max_idx = len(self.current_calque_lines) - 1
-        self.selected_indices = {i for i in self.selected_indices if i <= max_idx}
-        
-        for i, line_dict in enumerate(self.current_calque_lines):
-            row = LigneRow(self.list_frame, self, i, line_dict, self.current_calque_global, self.current_calque_color)
-            row.pack(fill="x", pady=0)
+        """Nouvelles données : on ajuste la zone de défilement et on réaffecte les lignes visibles"""
+        n = len(self.current_calque_lines)
+        self.selected_indices = {i for i in self.selected_indices if i < n}
+        self.canvas.configure(scrollregion=(0, 0, 0, n * self.row_height))
+        # Calque plus court que la position de défilement : on remonte
+        view_h = max(1, self.canvas.winfo_height())
+        if self.canvas.canvasy(0) > max(0, n * self.row_height - view_h):
+            self.canvas.yview_moveto(0)
+        self.layout_rows(force=True)
+
+    def on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.layout_rows()
+
+    def layout_rows(self, force=False):
+        """Place le pool de LigneRow sur les lignes visibles ; force=True réaffiche même les lignes inchangées"""
+        # update_idletasks (mesure de la hauteur) peut rappeler on_yscroll pendant la mise en place
+        if self._layout_busy: return
+        self._layout_busy = True
+        try: self._layout_rows(force)
+        finally: self._layout_busy = False
+
+    def _layout_rows(self, force):
+        lines = self.current_calque_lines
+        n = len(lines)
+        view_h = max(1, self.canvas.winfo_height())
+        first = max(0, int(self.canvas.canvasy(0) // self.row_height))
+        count = min(n - first, view_h // self.row_height + 2) if n else 0
+
+        while len(self.rows) < count:
+            i = first + len(self.rows)
+            row = LigneRow(self.canvas, self, i, lines[i], self.current_calque_global, self.current_calque_color)
+            if not self.rows:
+                row.update_idletasks()
+                if row.winfo_reqheight() > 1: self.row_height = row.winfo_reqheight()
+                self.canvas.configure(scrollregion=(0, 0, 0, n * self.row_height))
+            item = self.canvas.create_window(0, i * self.row_height, window=row, anchor="nw", width=self.canvas.winfo_width(), height=self.row_height)
             self.rows.append(row)
-            is_selected = (i in self.selected_indices)
-            is_editing = (i == self.editing_index)
-            row.set_selected(is_selected or is_editing, is_editing_mode=is_editing)
+            self.row_items.append(item)
+            force = True
+
+        for slot, (row, item) in enumerate(zip(self.rows, self.row_items)):
+            if slot >= count:
+                self.canvas.itemconfig(item, state="hidden")
+                row.index = None
+                continue
+            i = first + slot
+            if force or row.index != i or row.line_dict is not lines[i]:
+                row.bind_line(i, lines[i], self.current_calque_global, self.current_calque_color)
+                self.canvas.coords(item, 0, i * self.row_height)
+                self.canvas.itemconfig(item, state="normal")
+                is_edit = i == self.editing_index
+                row.set_selected(i in self.selected_indices or is_edit, is_editing_mode=is_edit)
 
     def trigger_redraw(self):
         if self.app and hasattr(self.app, 'trigger_calculation'):
@@ -405,7 +456,9 @@ class LignesPanel:
         if self.on_line_select_callback: self.on_line_select_callback(None, self.current_calque_global)
 
     def update_visual_selection(self):
+        """Seules les lignes affichées (le pool) sont restylées"""
         for row in self.rows:
+            if row.index is None: continue
             is_sel = row.index in self.selected_indices
             is_edit = row.index == self.editing_index
             row.set_selected(is_sel or is_edit, is_editing_mode=is_edit)
@@ -5,6 +5,9 @@ import sys
 import os
 import json
 import time
+import copy
+import queue
+import threading
 
 # Ajout du dossier courant au path pour les imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -26,8 +29,12 @@ try: from guillochage_lignes import LignesPanel
 except ImportError as e: print(f"Err Lignes: {e}")
 try: from guillochage_menu import GuillochageMenu
 except ImportError as e: print(f"Err Menu: {e}")
-try: from guillochage_engine import GuillochageEngine
+try: from guillochage_engine import GuillochageEngine, CalculationCancelled
 except ImportError as e: print(f"Err Engine: {e}")
+try: from guillochage_history import History
+except ImportError as e: print(f"Err History: {e}")
+try: from guillochage_perf import TraceRecorder
+except ImportError as e: print(f"Err Perf: {e}")
 
 class TranslationManager:
     def __init__(self, lang_dir, default_lang="fr"):
@@ -59,12 +66,29 @@ class ModuleApp:
         self.is_zone3_full = False 
         self.current_file_path = None
         self.is_dirty = False 
-        self.undo_stack = []
-        self.redo_stack = []
+        # Annuler/Rétablir par deltas (voir guillochage_history)
+        self.history = History()
         self.clipboard_data = None 
         self.is_snapshotting = False 
         self.is_25d_active = False
         self._calc_job = None
+        # Calcul en arrière-plan : seul le résultat de la dernière génération est affiché
+        self._calc_generation = 0
+        self._calc_queue = queue.Queue()
+        self._calc_threads = []
+        self._calc_poll_job = None
+        # Génération dont l'affinage est lancé : son aperçu devient inutile
+        self._calc_refining = None
+        # Aperçu progressif : basse résolution pendant l'édition, puis affinage au repos
+        self.progressive_preview = True
+        self.refine_delay_ms = 400
+        self._refine_job = None
+        # Simplification des polylignes (mm, 0 = désactivée) : écran et fichiers séparément
+        self.display_tolerance = 0.0
+        self.export_tolerance = 0.0
+        # Trace chronologique (menu Affichage) : moteur, canvas, historique et anti-rebond
+        self.trace = TraceRecorder()
+        self._trace_trigger = None
         
         # Moteur de Traduction
         lang_path = os.path.join(os.path.dirname(__file__), "lang")
@@ -72,6 +96,7 @@ class ModuleApp:
         
         # Moteur de Calcul
         self.engine = GuillochageEngine() if 'GuillochageEngine' in globals() else None
+        if self.engine: self.engine.perf.trace = self.trace
         
         # Menu Principal
         self.menu = GuillochageMenu(self.parent, self)
@@ -92,6 +117,11 @@ class ModuleApp:
         # Zone 3 : Canvas (Centre)
         self.frame_visu = tk.Frame(self.top_paned, bg="#1e1e1e")
         self.panneau_canvas = CanvasPanel(self.frame_visu)
+        self.panneau_canvas.perf.trace = self.trace
+        # Overlay ⏱ : mesures du moteur affichées avec celles du canvas
+        if self.engine:
+            self.panneau_canvas.stats_source = lambda: self.engine.last_stats
+            self.panneau_canvas.on_perf_toggle = self.set_perf_enabled
         self.top_paned.add(self.frame_visu, minsize=400, stretch="always")
 
         # Zone 1 : Forme Brut
@@ -153,24 +183,142 @@ class ModuleApp:
 
     # --- MOTEUR DE CALCUL ---
     def trigger_calculation(self):
-        if self._calc_job:
-            try: self.root.after_cancel(self._calc_job)
-            except: pass
-        self._calc_job = self.root.after(50, self._perform_calculation)
+        # Toute demande rend obsolète le calcul en cours (il s'interrompt de lui-même)
+        self._calc_generation += 1
+        if self.trace.enabled:
+            self.trace.instant("trigger_calculation", "ui")
+            self._trace_trigger = time.perf_counter()
+        for job in (self._calc_job, self._refine_job):
+            if job:
+                try: self.root.after_cancel(job)
+                except: pass
+        self._refine_job = None
+        if self.progressive_preview:
+            # Aperçu grossier tout de suite, résolution réelle quand la saisie s'arrête
+            self._calc_job = self.root.after(10, lambda: self._perform_calculation(preview=True))
+            self._refine_job = self.root.after(self.refine_delay_ms, self._perform_calculation)
+        else:
+            self._calc_job = self.root.after(50, self._perform_calculation)
 
-    def _perform_calculation(self):
-        self._calc_job = None
+    def _perform_calculation(self, preview=False):
+        if preview: self._calc_job = None
+        else: self._calc_job = self._refine_job = None
         if not self.engine or not hasattr(self, 'panneau_calques'): return
+        if self.trace.enabled and self._trace_trigger is not None:
+            # Attente entre la dernière demande et le lancement (anti-rebond)
+            self.trace.complete("anti_rebond", time.perf_counter() - self._trace_trigger, cat="ui", args={"apercu": preview})
         try:
-            layers_state = self.panneau_calques.get_all_layers_state()
-            brut_data = self.panneau_forme.get_shape_data()
-            render_data = self.engine.calculate_geometry(layers_state, brut_data)
-            
-            if hasattr(self, 'panneau_canvas'):
-                if hasattr(self.panneau_canvas, 'set_calculated_lines'):
-                    self.panneau_canvas.set_calculated_lines(render_data)
+            # Lecture de l'état sur le thread Tk, copie pour le thread de calcul
+            with self.trace.span("lecture_etat", "ui"):
+                layers_state = copy.deepcopy(self.panneau_calques.get_all_layers_state())
+                brut_data = copy.deepcopy(self.panneau_forme.get_shape_data())
         except Exception as e:
             print(f"Erreur calcul: {e}")
+            return
+        # La génération est celle de la dernière demande (trigger_calculation) ; l'affinage remplace l'aperçu
+        gen = self._calc_generation
+        if not preview: self._calc_refining = gen
+        worker = threading.Thread(target=self._calculation_worker, args=(gen, layers_state, brut_data, preview), daemon=True)
+        self._calc_threads = [th for th in self._calc_threads if th.is_alive()]
+        self._calc_threads.append(worker)
+        worker.start()
+        if self._calc_poll_job is None:
+            self._calc_poll_job = self.root.after(30, self._poll_calculation)
+
+    def _calculation_worker(self, gen, layers_state, brut_data, preview=False):
+        """Thread de fond : aucun appel Tk ici, tout passe par la file"""
+        def is_stale():
+            return self._is_stale(gen, preview)
+        def progress(done, total):
+            self._calc_queue.put(("progress", gen, preview, done / total if total else 1.0))
+        try:
+            render_data = self.engine.calculate_geometry(layers_state, brut_data, cancel=is_stale, progress=progress, preview=preview, tolerance=self.display_tolerance)
+            self._calc_queue.put(("done", gen, preview, render_data))
+        except CalculationCancelled:
+            pass
+        except Exception as e:
+            self._calc_queue.put(("error", gen, preview, e))
+
+    def _preempt_calculation(self):
+        """
+        Calcul sur le thread Tk (exports) : le calcul d'affichage en cours ou planifié est abandonné
+        pour libérer tout de suite le verrou du moteur. Renvoie True s'il faut le relancer ensuite.
+        """
+        self._calc_threads = [th for th in self._calc_threads if th.is_alive()]
+        if not (self._calc_job or self._refine_job or self._calc_threads): return False
+        self._calc_generation += 1
+        for job in (self._calc_job, self._refine_job):
+            if job:
+                try: self.root.after_cancel(job)
+                except: pass
+        self._calc_job = self._refine_job = None
+        return True
+
+    def _is_stale(self, gen, preview):
+        """Calcul dépassé : nouvelle demande depuis, ou aperçu dont l'affinage a démarré"""
+        return gen != self._calc_generation or (preview and self._calc_refining == gen)
+
+    def _poll_calculation(self):
+        self._calc_poll_job = None
+        last_progress = None
+        while True:
+            try: kind, gen, preview, payload = self._calc_queue.get_nowait()
+            except queue.Empty: break
+            # Résultats d'une génération dépassée (ou aperçu déjà remplacé par l'affinage) : ignorés
+            if self._is_stale(gen, preview): continue
+            if kind == "progress":
+                last_progress = payload
+            elif kind == "done":
+                last_progress = None
+                self.panneau_canvas.set_progress(None)
+                if hasattr(self.panneau_canvas, 'set_calculated_lines'):
+                    with self.trace.span("reception_geometrie", "ui", segments=len(payload)):
+                        self.panneau_canvas.set_calculated_lines(payload)
+            else:
+                last_progress = None
+                self.panneau_canvas.set_progress(None)
+                print(f"Erreur calcul: {payload}")
+        if last_progress is not None:
+            self.panneau_canvas.set_progress(last_progress)
+
+        self._calc_threads = [th for th in self._calc_threads if th.is_alive()]
+        if self._calc_threads or not self._calc_queue.empty():
+            self._calc_poll_job = self.root.after(30, self._poll_calculation)
+        else:
+            self.panneau_canvas.set_progress(None)
+
+    def set_perf_enabled(self, active):
+        """Active les mesures du moteur (bilan au prochain calcul ; les calques en cache y sont comptés)"""
+        self._sync_perf()
+        if not active:
+            if not self.trace.enabled: self.engine.last_stats = None
+        else: self.trigger_calculation()
+
+    def _sync_perf(self):
+        """Mesures actives tant que l'overlay ⏱ est affiché ou qu'une trace est enregistrée"""
+        active = self.panneau_canvas.show_perf or self.trace.enabled
+        self.panneau_canvas.perf.enabled = active
+        if self.engine: self.engine.perf.enabled = active
+
+    def set_trace_recording(self, active):
+        """Démarre l'enregistrement ; à l'arrêt, propose d'enregistrer la trace (.json)"""
+        if active:
+            self.trace.start()
+            self._sync_perf()
+            return
+        count = self.trace.stop()
+        self._trace_trigger = None
+        self._sync_perf()
+        if not count:
+            messagebox.showinfo(self.t("m_trace_record"), self.t("msg_trace_empty"))
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("Chrome Trace", "*.json"), ("Tous", "*.*")],
+                                            initialfile=time.strftime("trace_%Y%m%d_%H%M%S.json"), title=self.t("m_trace_record"))
+        if not path: return
+        try:
+            self.trace.save(path)
+            messagebox.showinfo(self.t("m_trace_record"), self.t("msg_trace_saved").format(count=count, path=path))
+        except Exception as e: messagebox.showerror(self.t("msg_error"), f"{e}")
 
     # --- STATE MANAGEMENT (UNDO/REDO/SAVE) ---
     def get_project_state(self):
@@ -195,31 +343,53 @@ class ModuleApp:
 
     def take_snapshot(self):
         if self.is_snapshotting: return
-        state = self.get_project_state()
-        if self.undo_stack:
-            last = self.undo_stack[-1]
-            if json.dumps(last, sort_keys=True) == json.dumps(state, sort_keys=True): return
-        self.undo_stack.append(state)
-        if len(self.undo_stack) > 50: self.undo_stack.pop(0)
-        self.redo_stack.clear() 
-        self.is_dirty = True
-        self.update_title()
+        # Premier appel : état de référence, rien à annuler
+        first = self.history.base is None
+        with self.trace.span("snapshot", "historique"):
+            changed = self.history.record(self.get_project_state())
+        if not changed:
+            if not first: return
+        else:
+            self.is_dirty = True
+            self.update_title()
         self.trigger_calculation()
 
     def undo(self):
-        if len(self.undo_stack) <= 1: return 
-        current = self.undo_stack.pop()
-        self.redo_stack.append(current)
-        previous = self.undo_stack[-1]
-        self.load_project_state(previous)
-        self.is_dirty = True
-        self.update_title()
+        with self.trace.span("undo", "historique"):
+            paths = self.history.undo()
+            if paths is None: return
+            self.apply_history_paths(paths)
 
     def redo(self):
-        if not self.redo_stack: return
-        next_state = self.redo_stack.pop()
-        self.undo_stack.append(next_state)
-        self.load_project_state(next_state)
+        with self.trace.span("redo", "historique"):
+            paths = self.history.redo()
+            if paths is None: return
+            self.apply_history_paths(paths)
+
+    def apply_history_paths(self, paths):
+        """Réinjecte dans l'interface les seules parties modifiées (forme, calques touchés)"""
+        self.is_snapshotting = True
+        try:
+            layers = set()
+            forme = full_layers = False
+            for path in paths:
+                if path[:1] == ("forme",): forme = True
+                elif path[:1] == ("calques",):
+                    # Ajout / suppression / déplacement de calque (uid changé à un index) :
+                    # réconciliation complète par uid, sinon la ligne garderait l'uid d'un autre calque
+                    if len(path) < 3 or isinstance(path[1], slice) or path[2] == "uid": full_layers = True
+                    else: layers.add(path[1])
+            if forme:
+                self.panneau_forme.set_shape_data(self.history.state(("forme",)))
+                self.update_brut_on_canvas()
+            if full_layers:
+                self.panneau_calques.load_all_layers_state(self.history.state(("calques",)))
+            else:
+                for index in sorted(layers):
+                    self.panneau_calques.apply_layer_state(index, self.history.state(("calques", index)))
+            self.trigger_calculation()
+        except Exception as e: print(f"Erreur annulation: {e}")
+        finally: self.is_snapshotting = False
         self.is_dirty = True
         self.update_title()
 
@@ -229,9 +399,8 @@ class ModuleApp:
             if not messagebox.askyesno(self.t("m_new"), self.t("msg_save_changes")): return
         self.current_file_path = None
         self.panneau_calques.load_all_layers_state([]) 
-        self.undo_stack = []
-        self.redo_stack = []
-        self.take_snapshot()
+        self.history.reset(self.get_project_state())
+        self.trigger_calculation()
         self.is_dirty = False
         self.update_title()
 
@@ -262,8 +431,7 @@ class ModuleApp:
                 with open(file_path, "r", encoding="utf-8") as f: state = json.load(f)
                 self.load_project_state(state)
                 self.current_file_path = file_path
-                self.undo_stack = [state]
-                self.redo_stack = []
+                self.history.reset(self.get_project_state())
                 self.is_dirty = False
                 self.update_title()
             except Exception as e: messagebox.showerror(self.t("msg_error"), f"Erreur ouverture : {e}")
@@ -300,6 +468,9 @@ class ModuleApp:
             resp = messagebox.askyesnocancel(self.t("msg_quit_title"), self.t("msg_save_changes"))
             if resp is None: return 
             if resp: self.action_save() 
+        # Arrêt du calcul en cours et des processus de calcul éventuels
+        self._calc_generation += 1
+        if self.engine: self.engine.shutdown()
         self.root.destroy()
 
     # --- CALLBACKS UI ---
@@ -342,6 +513,11 @@ class ModuleApp:
             self.take_snapshot()
             self.trigger_calculation()
 
+    def on_library_changed(self):
+        """Bibliothèque modifiée (Formula Lab, gestionnaire) : listes à jour et plugins rechargés au calcul suivant"""
+        if hasattr(self, 'panneau_courbes'): self.panneau_courbes.refresh_library()
+        self.trigger_calculation()
+
     def refresh_all_zones(self):
         if not self.panneau_calques.selected_row: return
         full_data = self.panneau_calques.selected_row.data
@@ -498,7 +674,10 @@ class ModuleApp:
                 single["visible"] = True
                 layers_to_export = [single]
             brut_data = self.panneau_forme.get_shape_data()
-            render_list = self.engine.calculate_geometry(layers_to_export, brut_data)
+            resume = self._preempt_calculation()
+            try: render_list = self.engine.calculate_geometry(layers_to_export, brut_data, tolerance=self.export_tolerance)
+            finally:
+                if resume: self.trigger_calculation()
             if not render_list:
                 messagebox.showinfo("Export", "Rien à exporter.")
                 return
@@ -521,21 +700,28 @@ class ModuleApp:
             all_layers = self.panneau_calques.get_all_layers_state()
             brut_data = self.panneau_forme.get_shape_data()
             count = 0
-            for layer in all_layers:
-                layer_copy = layer.copy()
-                layer_copy["visible"] = True
-                render_list = self.engine.calculate_geometry([layer_copy], brut_data)
-                clean_name = "".join([c for c in layer["name"] if c.isalpha() or c.isdigit() or c in (' ', '-', '_')]).strip()
-                if not clean_name: clean_name = f"Calque_{count}"
-                filename = f"{clean_name}.{fmt}"
-                full_path = os.path.join(export_folder, filename)
-                if fmt == "svg": GuillochageIO.export_svg(full_path, render_list, brut_data)
-                else: GuillochageIO.export_dxf(full_path, render_list, brut_data)
-                count += 1
+            resume = self._preempt_calculation()
+            try:
+                for layer in all_layers:
+                    layer_copy = layer.copy()
+                    layer_copy["visible"] = True
+                    render_list = self.engine.calculate_geometry([layer_copy], brut_data, tolerance=self.export_tolerance)
+                    clean_name = "".join([c for c in layer["name"] if c.isalpha() or c.isdigit() or c in (' ', '-', '_')]).strip()
+                    if not clean_name: clean_name = f"Calque_{count}"
+                    filename = f"{clean_name}.{fmt}"
+                    full_path = os.path.join(export_folder, filename)
+                    if fmt == "svg": GuillochageIO.export_svg(full_path, render_list, brut_data)
+                    else: GuillochageIO.export_dxf(full_path, render_list, brut_data)
+                    count += 1
+            finally:
+                if resume: self.trigger_calculation()
             messagebox.showinfo("Export Batch", f"Terminé !\n{count} fichiers générés.")
         except Exception as e: messagebox.showerror("Erreur Export Batch", str(e))
 
 if __name__ == "__main__":
+    # Indispensable au pool de calcul une fois l'application gelée (exe Windows)
+    import multiprocessing
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = ModuleApp(root)
     root.mainloop()
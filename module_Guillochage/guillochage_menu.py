@@ -57,6 +57,9 @@ class GuillochageMenu:
         self.dxf_menu.add_command(label="DXF (Global)", command=lambda: print("Export DXF Global (A faire)"))
         self.dxf_menu.add_command(label="DXF (Layer)", command=lambda: print("Export DXF Layer (A faire)"))
         self.file_menu.add_cascade(label=self.t("m_export_dxf"), menu=self.dxf_menu)
+        self.simplify_export_menu = tk.Menu(self.file_menu, tearoff=0)
+        self.var_export_tol = self.build_tolerance_menu(self.simplify_export_menu, "export_tolerance")
+        self.file_menu.add_cascade(label=self.t("m_simplify_export"), menu=self.simplify_export_menu)
         
         self.file_menu.add_separator()
         self.var_autosave = tk.BooleanVar(value=True)
@@ -92,6 +95,23 @@ class GuillochageMenu:
         self.view_menu.add_command(label=self.t("m_fs_app"), command=self.toggle_fullscreen_app)
         self.view_menu.add_command(label=self.t("m_fs_z3"), command=self.toggle_fullscreen_zone3)
         self.view_menu.add_command(label=self.t("m_view_25d"), command=lambda: print("2.5D Mode (A faire)"))
+        self.view_menu.add_separator()
+        self.var_progressive = tk.BooleanVar(value=getattr(self.app, "progressive_preview", True))
+        self.view_menu.add_checkbutton(label=self.t("m_progressive"), variable=self.var_progressive, command=self.toggle_progressive)
+        self.var_raster = tk.BooleanVar(value=False)
+        self.view_menu.add_checkbutton(label=self.t("m_raster_preview"), variable=self.var_raster, command=self.toggle_raster)
+        self.var_trace = tk.BooleanVar(value=self.app.trace.enabled if hasattr(self.app, "trace") else False)
+        self.view_menu.add_checkbutton(label=self.t("m_trace_record"), variable=self.var_trace, command=self.toggle_trace)
+        engine = getattr(self.app, "engine", None)
+        self.var_adaptive = tk.BooleanVar(value=engine.adaptive_sampling if engine else False)
+        self.view_menu.add_checkbutton(label=self.t("m_adaptive"), variable=self.var_adaptive, command=self.toggle_adaptive)
+        if engine is None: self.view_menu.entryconfig("end", state="disabled")
+        self.simplify_display_menu = tk.Menu(self.view_menu, tearoff=0)
+        self.var_display_tol = self.build_tolerance_menu(self.simplify_display_menu, "display_tolerance")
+        self.view_menu.add_cascade(label=self.t("m_simplify_display"), menu=self.simplify_display_menu)
+        self.workers_menu = tk.Menu(self.view_menu, tearoff=0)
+        self.refresh_workers()
+        self.view_menu.add_cascade(label=self.t("m_workers"), menu=self.workers_menu)
         self.menubar.add_cascade(label=self.t("m_view"), menu=self.view_menu)
 
         # 6. AIDE
@@ -118,6 +138,38 @@ class GuillochageMenu:
                 command=lambda l=lang_code: self.app.change_language(l)
             )
 
+    def build_tolerance_menu(self, menu, attr):
+        """Choix de la tolérance de simplification (mm) stockée dans self.app.<attr>"""
+        var = tk.DoubleVar(value=getattr(self.app, attr, 0.0))
+        for tol in (0.0, 0.001, 0.002, 0.005, 0.01, 0.02):
+            label = self.t("m_simplify_off") if tol == 0 else f"{tol} mm"
+            menu.add_radiobutton(label=label, value=tol, variable=var, command=lambda: self.set_tolerance(attr, var))
+        return var
+
+    def set_tolerance(self, attr, var):
+        setattr(self.app, attr, var.get())
+        # Seule la tolérance écran change l'affichage
+        if attr == "display_tolerance" and hasattr(self.app, 'trigger_calculation'): self.app.trigger_calculation()
+
+    def refresh_workers(self):
+        """Choix du nombre de processus de calcul (1 = séquentiel)"""
+        self.workers_menu.delete(0, "end")
+        engine = getattr(self.app, "engine", None)
+        self.var_workers = tk.IntVar(value=engine.workers if engine else 1)
+        nb_cpu = os.cpu_count() or 1
+        choices = [n for n in (1, 2, 4, 8, 16) if n <= nb_cpu]
+        if nb_cpu not in choices: choices.append(nb_cpu)
+        for n in choices:
+            label = self.t("m_workers_off") if n == 1 else str(n)
+            self.workers_menu.add_radiobutton(label=label, value=n, variable=self.var_workers, command=self.set_workers)
+        if engine is None: self.workers_menu.entryconfig(0, state="disabled")
+
+    def set_workers(self):
+        engine = getattr(self.app, "engine", None)
+        if engine is None: return
+        engine.set_workers(self.var_workers.get())
+        if hasattr(self.app, 'trigger_calculation'): self.app.trigger_calculation()
+
     def show_doc(self, filename):
         doc_path = os.path.join(os.path.dirname(__file__), "docs", filename)
         if os.path.exists(doc_path):
@@ -138,13 +190,29 @@ class GuillochageMenu:
         if hasattr(self.app, 'toggle_zone3_fullscreen'):
             self.app.toggle_zone3_fullscreen()
 
+    def toggle_progressive(self):
+        self.app.progressive_preview = self.var_progressive.get()
+
+    def toggle_adaptive(self):
+        """Échantillonnage adaptatif (tolérance de corde du palier) ou pas fixe, pour l'affichage et les exports"""
+        engine = getattr(self.app, "engine", None)
+        if engine is None: return
+        engine.adaptive_sampling = self.var_adaptive.get()
+        if hasattr(self.app, 'trigger_calculation'): self.app.trigger_calculation()
+
+    def toggle_raster(self):
+        self.app.panneau_canvas.set_raster_mode(self.var_raster.get())
+
+    def toggle_trace(self):
+        self.app.set_trace_recording(self.var_trace.get())
+
     def toggle_autosave(self):
         # L'état est lu directement par le timer du Main
         pass
 
     def open_library_manager(self):
         if LibraryManager:
-            cb = self.app.panneau_courbes.refresh_library if hasattr(self.app, 'panneau_courbes') else None
+            cb = self.app.on_library_changed
             # On passe self.app pour que la fenêtre fille ait accès au contexte si besoin
             LibraryManager(self.main_window, app_instance=self.app, on_update_callback=cb)
         else:
@@ -152,7 +220,7 @@ class GuillochageMenu:
 
     def open_formula_lab(self):
         if FormulaLab:
-            cb = self.app.panneau_courbes.refresh_library if hasattr(self.app, 'panneau_courbes') else None
+            cb = self.app.on_library_changed
             FormulaLab(self.main_window, app_instance=self.app, on_update_callback=cb)
         else:
             messagebox.showerror("Err", "FormulaLab module missing.")
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Module Perf - Mesures par étape (moteur, canvas) et traces chronologiques
+Désactivé par défaut : chaque point de mesure se réduit alors à un test de `enabled`.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PerfStats:
+    """
+    Temps cumulés par étape (globaux et par calque) et compteurs (points, items...).
+    Usage aux points chauds :
+        if perf.enabled: t0 = time.perf_counter()
+        ...
+        if perf.enabled: perf.add("decoupe", time.perf_counter() - t0, layer)
+    """
+    def __init__(self, enabled=False, category=""):
+        self.enabled = enabled
+        self.category = category
+        self.trace = None     # TraceRecorder : chaque étape mesurée y devient aussi un intervalle
+        self.reset()
+
+    def reset(self):
+        self.stages = {}      # étape -> [secondes, appels]
+        self.counters = {}    # compteur -> valeur
+        self.layers = {}      # calque -> {"stages": {...}, "counters": {...}}
+        self.started = time.perf_counter()
+
+    def _layer(self, layer):
+        entry = self.layers.get(layer)
+        if entry is None: entry = self.layers[layer] = {"stages": {}, "counters": {}}
+        return entry
+
+    def add(self, stage, seconds, layer=None, end=None):
+        """end : instant de fin (perf_counter) si l'étape suivante démarre au même instant (trace bien imbriquée)"""
+        if self.trace is not None and self.trace.enabled:
+            self.trace.complete(stage if layer is None else f"{stage} · {layer}", seconds, end=end, cat=self.category,
+                                args=None if layer is None else {"calque": layer})
+        acc = self.stages.setdefault(stage, [0.0, 0])
+        acc[0] += seconds
+        acc[1] += 1
+        if layer is not None:
+            acc = self._layer(layer)["stages"].setdefault(stage, [0.0, 0])
+            acc[0] += seconds
+            acc[1] += 1
+
+    def count(self, name, n=1, layer=None):
+        self.counters[name] = self.counters.get(name, 0) + n
+        if layer is not None:
+            counters = self._layer(layer)["counters"]
+            counters[name] = counters.get(name, 0) + n
+
+    def set(self, name, value):
+        """Compteur instantané (ex. nombre d'items du canvas)"""
+        self.counters[name] = value
+
+    def snapshot(self):
+        """Copie sérialisable : {"stages": {étape: {"s", "calls"}}, "counters": {...}, "layers": {...}}"""
+        def stages(d): return {k: {"s": v[0], "calls": v[1]} for k, v in d.items()}
+        return {
+            "elapsed_s": time.perf_counter() - self.started,
+            "stages": stages(self.stages),
+            "counters": dict(self.counters),
+            "layers": {name: {"stages": stages(e["stages"]), "counters": dict(e["counters"])} for name, e in self.layers.items()},
+        }
+
+    def summary_lines(self, limit=8):
+        """Lignes de texte courtes (étapes les plus coûteuses d'abord) pour l'overlay"""
+        lines = [f"{stage:<16}{v[0] * 1000:9.1f} ms  x{v[1]}" for stage, v in
+                 sorted(self.stages.items(), key=lambda kv: -kv[1][0])[:limit]]
+        lines += [f"{name:<16}{value:>12}" for name, value in sorted(self.counters.items())]
+        return lines
+
+
+# --- TRACE (Chrome Trace Event / Perfetto / speedscope) ---
+class TraceRecorder:
+    """
+    Journal d'intervalles imbriqués, tous threads confondus, enregistré au format Chrome Trace Event
+    (à ouvrir dans chrome://tracing, ui.perfetto.dev ou speedscope.app).
+    Les intervalles plus courts que min_us sont ignorés (appels point par point), et le journal
+    s'arrête à max_events pour borner la mémoire.
+    """
+    def __init__(self, min_us=10.0, max_events=500000):
+        self.enabled = False
+        self.min_us = min_us
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+        self._threads = {}
+        self._t0 = time.perf_counter()
+
+    def start(self):
+        self.events = []
+        self.dropped = 0
+        self._threads = {}
+        self._t0 = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+        return len(self.events)
+
+    def _append(self, event):
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        tid = threading.get_ident()
+        if tid not in self._threads: self._threads[tid] = threading.current_thread().name
+        event["pid"] = os.getpid()
+        event["tid"] = tid
+        self.events.append(event)
+
+    def complete(self, name, seconds, end=None, cat="", args=None):
+        """Intervalle terminé : durée en secondes, fin à `end` (perf_counter) ou maintenant"""
+        if not self.enabled: return
+        dur = seconds * 1e6
+        if dur < self.min_us: return
+        if end is None: end = time.perf_counter()
+        event = {"name": name, "cat": cat or "app", "ph": "X", "ts": (end - self._t0) * 1e6 - dur, "dur": dur}
+        if args: event["args"] = args
+        self._append(event)
+
+    def instant(self, name, cat="", args=None):
+        """Événement ponctuel (ex. une demande de calcul absorbée par l'anti-rebond)"""
+        if not self.enabled: return
+        event = {"name": name, "cat": cat or "app", "ph": "i", "s": "t", "ts": (time.perf_counter() - self._t0) * 1e6}
+        if args: event["args"] = args
+        self._append(event)
+
+    @contextmanager
+    def span(self, name, cat="", **args):
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try: yield
+        finally: self.complete(name, time.perf_counter() - t0, cat=cat, args=args or None)
+
+    def to_dict(self):
+        pid = os.getpid()
+        meta = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "Guillochage"}}]
+        meta += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}} for tid, name in self._threads.items()]
+        return {"traceEvents": meta + self.events, "displayTimeUnit": "ms", "otherData": {"dropped_events": self.dropped}}
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f: json.dump(self.to_dict(), f)
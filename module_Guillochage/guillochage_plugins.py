@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Module Plugins - Registre des trajectoires et ondes de lib_courbes
+Chaque nom est résolu une fois en une poignée (PluginHandle) ; refresh() recharge les fichiers
+modifiés (mtime, puis empreinte du contenu) sans redémarrer l'application.
+PluginIndex lit les INFO sans exécuter les fichiers (listes déroulantes, gestionnaire de bibliothèque).
+"""
+import ast
+import hashlib
+import json
+import os
+import types
+
+# Dossier -> (fonction scalaire, entrée batch optionnelle)
+PLUGIN_ENTRIES = {
+    "Trajectoires": ("get_trajectoire", "get_trajectoire_batch"),
+    "Ondes": ("get_offset", "get_offset_batch"),
+}
+
+
+def clean_name(name):
+    """Nom de fichier d'un plugin ("Ligne Droite" -> "ligne_droite")"""
+    return str(name).lower().replace(" ", "_").replace(".py", "")
+
+
+class PluginHandle:
+    """Plugin résolu : fonction(s) chargée(s) et version (empreinte du fichier, None si absent)"""
+    __slots__ = ("folder", "name", "path", "func", "batch", "defaults", "mtime", "version", "error")
+
+    def __init__(self, folder, name, path):
+        self.folder = folder
+        self.name = name
+        self.path = path
+        self.func = None
+        self.batch = None
+        self.defaults = {}      # INFO["params_defaut"] du plugin
+        self.mtime = None
+        self.version = None
+        self.error = None
+
+    @property
+    def ident(self):
+        return (self.folder, self.name)
+
+
+class PluginRegistry:
+    """
+    Poignées par (dossier, nom). resolve() ne normalise un nom qu'à sa première rencontre :
+    ensuite c'est une simple lecture de dict. batch_funcs associe chaque fonction à son entrée batch.
+    """
+    def __init__(self, lib_dir):
+        self.lib_dir = lib_dir
+        self.handles = {}       # (dossier, nom propre) -> PluginHandle
+        self._by_name = {}      # (dossier, nom tel que saisi) -> PluginHandle
+        self.batch_funcs = {}
+
+    def resolve(self, folder, name):
+        handle = self._by_name.get((folder, name))
+        if handle is None:
+            clean = clean_name(name)
+            handle = self.handles.get((folder, clean))
+            if handle is None:
+                handle = PluginHandle(folder, clean, os.path.join(self.lib_dir, folder, f"{clean}.py"))
+                self.handles[(folder, clean)] = handle
+                self._load(handle)
+            self._by_name[(folder, name)] = handle
+        return handle
+
+    def refresh(self):
+        """Recharge les plugins dont le fichier a changé ; renvoie les identifiants (dossier, nom) modifiés"""
+        changed = set()
+        for ident, handle in self.handles.items():
+            try: mtime = os.stat(handle.path).st_mtime_ns
+            except OSError: mtime = None
+            if mtime == handle.mtime: continue
+            version = handle.version
+            self._load(handle)
+            if handle.version != version: changed.add(ident)
+        return changed
+
+    def errors(self):
+        """{chemin: message} des plugins dont le dernier chargement a échoué"""
+        return {h.path: h.error for h in list(self.handles.values()) if h.error}
+
+    def _load(self, handle):
+        """
+        Exécute le fichier depuis son contenu (pas de bytecode en cache qui pourrait être périmé).
+        En cas d'erreur, la version précédente reste en service jusqu'à la prochaine modification.
+        """
+        try:
+            handle.mtime = os.stat(handle.path).st_mtime_ns
+            with open(handle.path, "rb") as f: source = f.read()
+        except OSError:
+            self._set(handle, None, None, None)
+            handle.defaults = {}
+            handle.mtime = None
+            return
+        version = hashlib.sha1(source).hexdigest()[:16]
+        if version == handle.version: return
+        entry, batch_entry = PLUGIN_ENTRIES[handle.folder]
+        prefix = "dyn_traj" if handle.folder == "Trajectoires" else "dyn_wave"
+        try:
+            mod = types.ModuleType(f"{prefix}_{handle.name}")
+            mod.__file__ = handle.path
+            exec(compile(source, handle.path, "exec"), mod.__dict__)
+            func = getattr(mod, entry, None)
+            if func is None: raise AttributeError(f"{entry} absent")
+        except Exception as e:
+            # Erreur gardée sur la poignée (affichée par le gestionnaire de bibliothèque), pas de print
+            handle.error = f"{type(e).__name__}: {e}"
+            if handle.func is None: handle.version = version
+            return
+        handle.error = None
+        info = getattr(mod, "INFO", None)
+        defaults = info.get("params_defaut") if isinstance(info, dict) else None
+        handle.defaults = dict(defaults) if isinstance(defaults, dict) else {}
+        self._set(handle, func, getattr(mod, batch_entry, None), version)
+
+    def _set(self, handle, func, batch, version):
+        if handle.func is not None: self.batch_funcs.pop(handle.func, None)
+        handle.func, handle.batch, handle.version = func, batch, version
+        if func is not None and batch is not None: self.batch_funcs[func] = batch
+
+
+# --- INDEX DES MÉTADONNÉES (SANS EXÉCUTION) ---
+INDEX_FORMAT = 1
+
+def read_info(path):
+    """
+    Dict INFO d'un plugin, lu par analyse statique (ast) : le fichier n'est jamais exécuté.
+    Les valeurs non littérales (math.pi, appels...) sont ignorées. None si pas d'INFO.
+    """
+    try:
+        with open(path, "rb") as f: tree = ast.parse(f.read(), filename=path)
+    except (OSError, SyntaxError, ValueError):
+        return None
+    for node in tree.body:
+        if isinstance(node, ast.Assign): targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None: targets, value = [node.target], node.value
+        else: continue
+        if not any(isinstance(t, ast.Name) and t.id == "INFO" for t in targets): continue
+        if not isinstance(value, ast.Dict): return None
+        info = {}
+        for k, v in zip(value.keys, value.values):
+            try: info[ast.literal_eval(k)] = ast.literal_eval(v)
+            except (ValueError, TypeError, SyntaxError): pass
+        return info
+    return None
+
+
+class PluginIndex:
+    """
+    INFO de chaque plugin de lib_courbes, mis en cache sur disque par (chemin, mtime, taille) :
+    une fois le cache à jour, lister la bibliothèque ne coûte qu'un parcours de dossier.
+    """
+    def __init__(self, lib_dir, cache_path=None):
+        self.lib_dir = os.path.abspath(lib_dir)
+        self.cache_path = cache_path or os.path.join(self.lib_dir, ".plugin_index.json")
+        self.entries = {}       # chemin relatif -> {"mtime", "size", "info"}
+        self._dirty = False
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f: data = json.load(f)
+            if data.get("format") == INDEX_FORMAT: self.entries = data.get("entries", {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def _key(self, path):
+        """Clé relative au dossier lib_courbes (None hors de la bibliothèque : pas de cache)"""
+        rel = os.path.relpath(os.path.abspath(path), self.lib_dir)
+        return None if rel.startswith("..") or os.path.isabs(rel) else rel.replace(os.sep, "/")
+
+    def _lookup(self, path, stat=None):
+        key = self._key(path)
+        if key is None: return read_info(path)
+        try: st = stat or os.stat(path)
+        except OSError: return None
+        entry = self.entries.get(key)
+        if entry is None or entry["mtime"] != st.st_mtime_ns or entry["size"] != st.st_size:
+            entry = self.entries[key] = {"mtime": st.st_mtime_ns, "size": st.st_size, "info": read_info(path)}
+            self._dirty = True
+        return entry["info"]
+
+    def info(self, path):
+        """INFO du plugin (dict) ou None ; accepte aussi un fichier hors bibliothèque (import)"""
+        info = self._lookup(path)
+        self.save()
+        return info
+
+    def list(self, folder):
+        """[(nom, chemin, INFO ou None)] des plugins .py d'un dossier, triés par nom"""
+        directory = os.path.join(self.lib_dir, folder)
+        found = []
+        try: scan = list(os.scandir(directory))
+        except OSError: scan = []
+        for e in scan:
+            if not e.name.endswith(".py") or e.name.startswith("__") or e.name.startswith("init"): continue
+            try: st = e.stat()
+            except OSError: continue
+            found.append((e.name[:-3], e.path, self._lookup(e.path, st)))
+        # Fichiers disparus : retirés du cache
+        prefix = folder + "/"
+        present = {f"{prefix}{name}.py" for name, _, _ in found}
+        for key in [k for k in self.entries if k.startswith(prefix) and k not in present]:
+            del self.entries[key]
+            self._dirty = True
+        self.save()
+        return sorted(found, key=lambda item: item[0].lower())
+
+    def save(self):
+        """Écrit le cache s'il a changé (écriture atomique ; dossier en lecture seule toléré)"""
+        if not self._dirty: return
+        tmp = self.cache_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"format": INDEX_FORMAT, "entries": self.entries}, f, ensure_ascii=False, default=str)
+            os.replace(tmp, self.cache_path)
+            self._dirty = False
+        except OSError:
+            pass
+
+
+_INDEXES = {}
+
+def plugin_index(lib_dir=None):
+    """Index partagé par dossier (les listes déroulantes et le gestionnaire lisent le même)"""
+    lib_dir = os.path.abspath(lib_dir or os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib_courbes"))
+    index = _INDEXES.get(lib_dir)
+    if index is None: index = _INDEXES[lib_dir] = PluginIndex(lib_dir)
+    return index
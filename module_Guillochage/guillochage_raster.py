@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Module Raster - Aperçu matriciel en tuiles pour les projets très denses
+(la géométrie est rasterisée une fois par niveau de zoom, le pan devient un simple déplacement d'images)
+"""
+import base64
+import math
+import struct
+import zlib
+from collections import OrderedDict
+
+# NumPy est optionnel : sans lui, le rasteriseur reste en Python pur (plus lent)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TILE_SIZE = 256
+# Pas d'échantillonnage le long des segments (px)
+_SAMPLE_STEP = 0.5
+
+
+def encode_png_rgba(width, height, rgba):
+    """PNG RGBA 8 bits minimal (zlib seulement) : fond transparent pour laisser voir grille et brut"""
+    stride = width * 4
+    raw = b"".join(b"\x00" + bytes(rgba[y*stride:(y+1)*stride]) for y in range(height))
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 1))
+            + chunk(b"IEND", b""))
+
+def png_data(width, height, rgba):
+    """Données prêtes pour tk.PhotoImage(data=..., format="png")"""
+    return base64.b64encode(encode_png_rgba(width, height, rgba)).decode("ascii")
+
+def tile_bounds(tx, ty, zoom, size=TILE_SIZE):
+    """Emprise en mm (xmin, ymin, xmax, ymax) d'une tuile (y écran vers le bas)"""
+    return (tx * size / zoom, -(ty + 1) * size / zoom, (tx + 1) * size / zoom, -ty * size / zoom)
+
+def _disk(radius):
+    """Décalages entiers d'un disque (épaisseur de trait)"""
+    r = int(math.ceil(radius))
+    return [(dx, dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1) if dx*dx + dy*dy <= radius*radius + 0.25]
+
+
+def rasterize_tile(geo, indices, tx, ty, zoom, rgb_of, size=TILE_SIZE):
+    """
+    Rasterise les segments `indices` de la RenderGeometry dans la tuile (tx, ty) au zoom donné.
+    rgb_of(couleur) -> (r, g, b). Renvoie les octets RGBA (fond transparent).
+    """
+    if np is not None: return _rasterize_numpy(geo, indices, tx, ty, zoom, rgb_of, size)
+    return _rasterize_python(geo, indices, tx, ty, zoom, rgb_of, size)
+
+def _rasterize_numpy(geo, indices, tx, ty, zoom, rgb_of, size):
+    img = np.zeros((size, size, 4), dtype=np.uint8)
+    if not indices: return img.tobytes()
+    sel = np.asarray(indices, dtype=np.int64)
+    offs = np.frombuffer(geo.offsets, dtype=np.int64)
+    starts, lengths = offs[sel], offs[sel + 1] - offs[sel]
+    firsts = np.cumsum(lengths) - lengths
+    idx = np.arange(lengths.sum()) + np.repeat(starts - firsts, lengths)
+    X, Y = geo.as_numpy()
+    px = X[idx] * zoom - tx * size
+    py = -Y[idx] * zoom - ty * size
+    del X, Y
+    style = np.repeat(np.frombuffer(geo.seg_style, dtype=np.int32)[sel], lengths)
+
+    # Arêtes (point j -> j+1 d'un même segment), bornées à la tuile élargie (Liang-Barsky)
+    last = firsts + lengths - 1
+    edge = np.ones(len(idx), dtype=bool)
+    edge[last] = False
+    e0 = np.flatnonzero(edge)
+    x0, y0 = px[e0], py[e0]
+    dx, dy = px[e0 + 1] - x0, py[e0 + 1] - y0
+    lo, hi = np.zeros(len(e0)), np.ones(len(e0))
+    pad = 4.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for p, q in ((-dx, x0 + pad), (dx, size + pad - x0), (-dy, y0 + pad), (dy, size + pad - y0)):
+            r = q / p
+            lo = np.where(p < 0, np.maximum(lo, r), lo)
+            hi = np.where(p > 0, np.minimum(hi, r), hi)
+            outside = (p == 0) & (q < 0)
+            hi = np.where(outside, -1.0, hi)
+    keep = hi >= lo
+    x0, y0, dx, dy, lo, hi, e0 = x0[keep], y0[keep], dx[keep], dy[keep], lo[keep], hi[keep], e0[keep]
+    if not len(e0): return img.tobytes()
+
+    # Échantillons le long de chaque arête
+    span = np.hypot(dx, dy) * (hi - lo)
+    n = np.ceil(span / _SAMPLE_STEP).astype(np.int64) + 1
+    k = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+    u = np.repeat(lo, n) + np.repeat(hi - lo, n) * k / np.repeat(np.maximum(n - 1, 1), n)
+    sx = np.repeat(x0, n) + np.repeat(dx, n) * u
+    sy = np.repeat(y0, n) + np.repeat(dy, n) * u
+    s_style = np.repeat(style[e0], n)
+
+    colors = np.array([rgb_of(col) + (255,) for col, _ in geo.styles], dtype=np.uint8)
+    radii = [max(0.0, (thk - 1.0) / 2) for _, thk in geo.styles]
+    ix, iy = np.floor(sx).astype(np.int64), np.floor(sy).astype(np.int64)
+    for radius in sorted(set(radii)):
+        mask = np.array([r == radius for r in radii])[s_style]
+        if not mask.any(): continue
+        bx, by, bs = ix[mask], iy[mask], s_style[mask]
+        for ddx, ddy in _disk(radius):
+            qx, qy = bx + ddx, by + ddy
+            inside = (qx >= 0) & (qx < size) & (qy >= 0) & (qy < size)
+            img[qy[inside], qx[inside]] = colors[bs[inside]]
+    return img.tobytes()
+
+def _rasterize_python(geo, indices, tx, ty, zoom, rgb_of, size):
+    img = bytearray(size * size * 4)
+    ox, oy = tx * size, ty * size
+    for i in indices:
+        color, thickness = geo.styles[geo.seg_style[i]]
+        pixel = bytes(rgb_of(color)) + b"\xff"
+        disk = _disk(max(0.0, (thickness - 1.0) / 2))
+        s, e = geo.offsets[i], geo.offsets[i + 1]
+        prev = None
+        for j in range(s, e):
+            cur = (geo.xs[j] * zoom - ox, -geo.ys[j] * zoom - oy)
+            if prev is not None:
+                x0, y0 = prev
+                dx, dy = cur[0] - x0, cur[1] - y0
+                # Arête hors tuile : rien à dessiner
+                if not (max(x0, cur[0]) < -4 or min(x0, cur[0]) > size + 4 or max(y0, cur[1]) < -4 or min(y0, cur[1]) > size + 4):
+                    n = int(math.ceil(math.hypot(dx, dy) / _SAMPLE_STEP)) + 1
+                    for k in range(n):
+                        u = k / (n - 1) if n > 1 else 0.0
+                        cx, cy = int(math.floor(x0 + dx * u)), int(math.floor(y0 + dy * u))
+                        for ddx, ddy in disk:
+                            qx, qy = cx + ddx, cy + ddy
+                            if 0 <= qx < size and 0 <= qy < size:
+                                pos = (qy * size + qx) * 4
+                                img[pos:pos + 4] = pixel
+            prev = cur
+    return bytes(img)
+
+
+class TileCache:
+    """
+    Tuiles rendues (LRU) : clé (zoom, tx, ty) -> (image, calques présents dans la tuile).
+    Une tuile n'est jetée que si un calque qu'elle contient, ou qui la recouvre désormais, a changé.
+    """
+    def __init__(self, max_tiles=512):
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()
+
+    def get(self, key):
+        entry = self.tiles.get(key)
+        if entry is not None: self.tiles.move_to_end(key)
+        return entry
+
+    def put(self, key, image, layers):
+        self.tiles[key] = (image, frozenset(layers))
+        self.tiles.move_to_end(key)
+        while len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+
+    def invalidate_layers(self, changed, layer_boxes, size=TILE_SIZE):
+        """
+        changed : noms des calques modifiés ; layer_boxes : {nom: (xmin, ymin, xmax, ymax)} de leur
+        nouvelle géométrie. Renvoie les clés supprimées.
+        """
+        if not changed: return []
+        dropped = []
+        for key, (_, layers) in list(self.tiles.items()):
+            hit = bool(layers & changed)
+            if not hit:
+                zoom, tx, ty = key
+                x0, y0, x1, y1 = tile_bounds(tx, ty, zoom, size)
+                for name in changed:
+                    box = layer_boxes.get(name)
+                    if box and box[2] >= x0 and box[0] <= x1 and box[3] >= y0 and box[1] <= y1:
+                        hit = True
+                        break
+            if hit:
+                del self.tiles[key]
+                dropped.append(key)
+        return dropped
+
+    def clear(self):
+        self.tiles.clear()
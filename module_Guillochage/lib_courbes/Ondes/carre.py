@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Carre",
     "categorie": "Type d'Onde",
@@ -44,4 +50,14 @@ def get_offset(t, params):
         
     # 4. Plateau Bas
     else:
-        return -1.0
\ No newline at end of file
+        return -1.0
+
+def get_offset_batch(t, params):
+    """Version tableau de get_offset (t : tableau NumPy d'angles en radians)"""
+    prog = (t / (2 * math.pi)) % 1.0
+    pente = params.get("douceur", 0.02)
+    return np.select(
+        [prog < pente, prog < 0.5, prog < 0.5 + pente],
+        [-1.0 + (prog / pente) * 2.0, 1.0, 1.0 - ((prog - 0.5) / pente) * 2.0],
+        default=-1.0,
+    )
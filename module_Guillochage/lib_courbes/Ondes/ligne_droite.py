@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Ligne Droite",
     "categorie": "Type d'Onde",
@@ -15,4 +21,8 @@ def get_offset(t, params):
     Retourne 0 quelle que soit la valeur de t.
     Cela annule l'effet d'ondulation.
     """
-    return 0.0
\ No newline at end of file
+    return 0.0
+
+def get_offset_batch(t, params):
+    """Version tableau de get_offset : toujours 0."""
+    return np.zeros_like(t, dtype=float)
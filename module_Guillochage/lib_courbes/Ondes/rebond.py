@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Rebond",
     "categorie": "Type d'Onde",
@@ -20,3 +26,7 @@ def get_offset(t, params):
     """
     # t est l'angle en radians fourni par le moteur
     return abs(math.sin(t))
+
+def get_offset_batch(t, params):
+    """Version tableau de get_offset (t : tableau NumPy d'angles en radians)"""
+    return np.abs(np.sin(t))
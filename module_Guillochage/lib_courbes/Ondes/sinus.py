@@ -6,57 +6,66 @@ Onde : Sinus
 Génère une onde sinusoïdale pour le guillochage.
 L'onde la plus classique et la plus utilisée.
 
+Contrat des ondes : get_offset(t, params) reçoit l'angle de l'onde (radians, une période = 2π)
+et renvoie un offset normalisé entre -1 et 1. Le moteur applique ensuite amplitude, période,
+phase et flambage ; params contient les params_defaut ci-dessous complétés par ceux de la ligne.
+Le moteur évalue cette onde directement (même formule, sans appel au plugin) : ce fichier
+en est la référence et sert de modèle pour de nouvelles ondes.
+
 Auteur : GravureStudioV1
-Version : 1.0
+Version : 2.0
 """
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Sinus",
     "categorie": "Type d'Onde",
-    "version": "1.0",
+    "version": "2.0",
     "description": "Onde sinusoïdale classique pour motifs ondulés",
-    "formule": "amplitude * sin(2π * t * nb_cycles + phase)",
-    "params_defaut": {
-        "amplitude": 2.0,      # Amplitude de l'onde en mm
-        "nb_lines": 12.0,      # Nombre de cycles (fréquence)
-        "phase": 0.0,          # Phase initiale en degrés
-        "period": 1.0,         # Période (non utilisé ici, gardé pour compatibilité)
-    }
+    "formule": "sin(t)  (amplitude, période et phase appliquées par le moteur)",
+    "params_defaut": {}
 }
 
 def get_offset(t, params):
     """
-    Calcule l'offset ondulé pour un paramètre t.
+    Calcule l'offset ondulé pour un angle t.
     
     Args:
-        t: Paramètre normalisé [0, 1] représentant la position le long de la trajectoire
-        params: Dictionnaire des paramètres de l'onde
+        t: Angle de l'onde en radians (période, phase et position le long de la trajectoire déjà prises en compte)
+        params: Paramètres fusionnés de la ligne (amplitude, period, phase, ...), non utilisés ici
     
     Returns:
-        float: Valeur de l'offset en mm (perpendiculaire à la trajectoire)
+        float: Offset normalisé entre -1 et +1
     
     Exemple d'utilisation:
-        >>> offset = get_offset(0.5, {"amplitude": 2.0, "nb_lines": 10.0, "phase": 0.0})
-        >>> print(offset)  # Valeur entre -2.0 et +2.0
+        >>> offset = get_offset(math.pi / 2, {"amplitude": 2.0})
+        >>> print(offset)  # 1.0 : le moteur multiplie ensuite par l'amplitude (2 mm)
     
     Note:
-        L'offset est ensuite multiplié par le vecteur normal de la trajectoire
-        pour obtenir le déplacement perpendiculaire.
+        L'offset est ensuite multiplié par l'amplitude puis par le vecteur normal
+        de la trajectoire pour obtenir le déplacement perpendiculaire.
     """
-    # Récupération des paramètres
-    amplitude = params.get("amplitude", 2.0)
-    nb_cycles = params.get("nb_lines", 12.0)  # Nombre de cycles complets
-    phase_deg = params.get("phase", 0.0)
-    
-    # Conversion de la phase en radians
-    phase_rad = math.radians(phase_deg)
+    return math.sin(t)
+
+
+def get_offset_batch(t, params):
+    """
+    Version tableau de get_offset.
     
-    # Calcul de l'onde sinusoïdale
-    # t varie de 0 à 1, nb_cycles détermine combien de périodes complètes
-    result = amplitude * math.sin(2.0 * math.pi * t * nb_cycles + phase_rad)
+    Args:
+        t: Tableau NumPy d'angles (même convention que get_offset)
+        params: Paramètres fusionnés de la ligne
     
-    return result
+    Returns:
+        ndarray: Offsets normalisés, même forme que t
+    """
+    return np.sin(t)
 
 
 # === TESTS UNITAIRES (optionnel) ===
@@ -64,58 +73,21 @@ if __name__ == "__main__":
     print("Test de l'onde Sinus")
     print("=" * 50)
     
-    # Test 1 : Onde standard
-    params = {"amplitude": 2.0, "nb_lines": 4.0, "phase": 0.0}
-    
-    print("\nTest 1 : Amplitude 2mm, 4 cycles, phase 0°")
-    print("t    | offset (mm)")
-    print("-----|------------")
-    
-    for i in range(11):  # 11 points de 0.0 à 1.0
-        t = i / 10.0
-        offset = get_offset(t, params)
-        print(f"{t:.1f}  | {offset:+6.3f}")
-    
-    # Test 2 : Avec phase de 90°
-    print("\nTest 2 : Avec phase de 90°")
-    params = {"amplitude": 2.0, "nb_lines": 4.0, "phase": 90.0}
-    
-    print("t    | offset (mm)")
-    print("-----|------------")
-    
-    for i in range(11):
-        t = i / 10.0
-        offset = get_offset(t, params)
-        print(f"{t:.1f}  | {offset:+6.3f}")
-    
-    # Test 3 : Haute fréquence
-    print("\nTest 3 : Haute fréquence (20 cycles)")
-    params = {"amplitude": 1.0, "nb_lines": 20.0, "phase": 0.0}
-    
-    print("t    | offset (mm)")
-    print("-----|------------")
-    
-    for i in range(11):
-        t = i / 10.0
-        offset = get_offset(t, params)
-        print(f"{t:.1f}  | {offset:+6.3f}")
-    
-    # Test 4 : Vérification des extremums
-    print("\nTest 4 : Vérification des extremums")
-    params = {"amplitude": 5.0, "nb_lines": 1.0, "phase": 0.0}
+    print("\nUne période (t de 0 à 2π)")
+    print("t (rad) | offset")
+    print("--------|-------")
     
-    # À t=0.25, sin doit être max (+1)
-    t_max = 0.25
-    offset_max = get_offset(t_max, params)
-    print(f"À t={t_max} (max théorique) : {offset_max:.3f} mm (attendu: +5.0)")
+    for i in range(9):
+        t = i * math.pi / 4
+        print(f"{t:6.3f}  | {get_offset(t, {}):+6.3f}")
     
-    # À t=0.75, sin doit être min (-1)
-    t_min = 0.75
-    offset_min = get_offset(t_min, params)
-    print(f"À t={t_min} (min théorique) : {offset_min:.3f} mm (attendu: -5.0)")
+    # Vérification des extremums (offset normalisé)
+    offset_max = get_offset(math.pi / 2, {})
+    offset_min = get_offset(3 * math.pi / 2, {})
+    print(f"\nÀ t=π/2 : {offset_max:.3f} (attendu: +1.0)")
+    print(f"À t=3π/2 : {offset_min:.3f} (attendu: -1.0)")
     
-    # Vérifications
-    assert abs(offset_max - 5.0) < 0.01, "Erreur sur le maximum"
-    assert abs(offset_min + 5.0) < 0.01, "Erreur sur le minimum"
+    assert abs(offset_max - 1.0) < 1e-9, "Erreur sur le maximum"
+    assert abs(offset_min + 1.0) < 1e-9, "Erreur sur le minimum"
     
     print("\n✅ Tests terminés - Tous les extremums sont corrects")
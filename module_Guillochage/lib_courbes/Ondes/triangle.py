@@ -1,44 +1,38 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Triangle",
     "categorie": "Type d'Onde",
-    "version": "1.0",
+    "version": "2.0",
     "description": "Onde triangulaire",
-    "formule": "y = A·(4/T)|t mod T - T/2| - A",
-    "params_defaut": {
-        "amplitude": 2.0,
-        "nb_lines": 12.0,
-        "phase": 0.0,
-    }
+    "formule": "y = 2·|2·(c - round(c))| - 1, c = t / 2π",
+    "params_defaut": {}
 }
 
 def get_offset(t, params):
     """
-    Retourne l'offset (déplacement perpendiculaire) pour t ∈ [0, 1]
+    Retourne l'offset normalisé (-1 à 1) pour un angle t en radians (une période = 2π).
+    Amplitude, période et phase sont appliquées par le moteur, qui évalue d'ailleurs
+    cette onde directement (même formule) : ce fichier en est la référence.
     
     Args:
-        t: Paramètre de progression (0 à 1)
-        params: Dictionnaire des paramètres
+        t: Angle de l'onde (radians)
+        params: Paramètres fusionnés de la ligne
         
     Returns:
-        float: Valeur de l'offset
+        float: Offset entre -1 (creux, t = 0) et +1 (sommet, t = π)
     """
-    amplitude = params.get('amplitude', 2.0)
-    nb_lines = params.get('nb_lines', 12.0)
-    phase = params.get('phase', 0.0)
-    
-    # Normalisation avec phase
-    phase_norm = phase / 360.0
-    t_phase = (t + phase_norm) % 1.0
-    
-    # Calcul de l'onde triangulaire
-    val = (t_phase * nb_lines) % 1.0
-    
-    if val < 0.5:
-        result = amplitude * (4 * val - 1)
-    else:
-        result = amplitude * (3 - 4 * val)
-    
-    return result
+    cyc = t / (2 * math.pi)
+    return 2 * abs(2 * (cyc - math.floor(cyc + 0.5))) - 1
+
+def get_offset_batch(t, params):
+    """Version tableau de get_offset (t : tableau NumPy d'angles en radians)"""
+    cyc = t / (2 * math.pi)
+    return 2 * np.abs(2 * (cyc - np.floor(cyc + 0.5))) - 1
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Carré Arrondi (Coussin)",
     "categorie": "Trajectoire Forme",
@@ -53,4 +59,23 @@ def get_trajectoire(t, params):
     nx = math.cos(angle)
     ny = math.sin(angle)
 
-    return ((x, y), (nx, ny))
\ No newline at end of file
+    return ((x, y), (nx, ny))
+
+def get_trajectoire_batch(t, params):
+    """Version tableau de get_trajectoire (t : tableau NumPy de 0 à 1)"""
+    i = params.get("line_index", 0)
+    nb_total = max(1, params.get("total_lines", 1))
+    size_max = params.get("gen_len", 100.0) / 2
+    size_min = params.get("margin_in", 0.0)
+    if nb_total > 1:
+        scale = size_min + (i / (nb_total - 1)) * (size_max - size_min)
+    else:
+        scale = (size_min + size_max) / 2
+    n = params.get("courbure", 4.0)
+
+    angle = t * 2 * math.pi
+    cos_a = np.cos(angle)
+    sin_a = np.sin(angle)
+    x = scale * np.sign(cos_a) * (np.abs(cos_a) ** (2 / n))
+    y = scale * np.sign(sin_a) * (np.abs(sin_a) ** (2 / n))
+    return ((x, y), (cos_a, sin_a))
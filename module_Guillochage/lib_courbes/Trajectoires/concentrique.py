@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Concentrique",
     "categorie": "Trajectoire Circulaire",
@@ -45,4 +51,20 @@ def get_trajectoire(t, params):
     nx = math.cos(angle)
     ny = math.sin(angle)
 
-    return ((x, y), (nx, ny))
\ No newline at end of file
+    return ((x, y), (nx, ny))
+
+def get_trajectoire_batch(t, params):
+    """Version tableau de get_trajectoire (t : tableau NumPy de 0 à 1)"""
+    i = params.get("line_index", 0)
+    nb_total = max(1, params.get("total_lines", 1))
+    max_radius = params.get("gen_len", 100.0) / 2
+    min_radius = params.get("margin_in", 0.0)
+    if nb_total > 1:
+        r = min_radius + (i / (nb_total - 1)) * (max_radius - min_radius)
+    else:
+        r = (min_radius + max_radius) / 2
+
+    angle = t * 2 * math.pi
+    nx = np.cos(angle)
+    ny = np.sin(angle)
+    return ((r * nx, r * ny), (nx, ny))
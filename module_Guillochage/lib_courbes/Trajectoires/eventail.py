@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Eventail (Auto-Centré)",
     "categorie": "Trajectoire Base",
@@ -60,4 +66,31 @@ def get_trajectoire(t, params):
     nx = -math.sin(current_angle)
     ny = math.cos(current_angle)
 
-    return ((x, y), (nx, ny))
\ No newline at end of file
+    return ((x, y), (nx, ny))
+
+def get_trajectoire_batch(t, params):
+    """Version tableau de get_trajectoire (t : tableau NumPy de 0 à 1)"""
+    h_brut = params.get("brut_h", 50.0)
+    p_y = -h_brut / 2 + params.get("pivot_offset_y", 0.0)
+    p_x = 0.0
+
+    idx = params.get("line_index", 0)
+    nb_total = max(1, params.get("total_lines", 1))
+    ang_start = math.radians(params.get("angle_debut", 45.0))
+    ang_end = math.radians(params.get("angle_fin", 135.0))
+    r_min = params.get("rayon_min", 10.0)
+    r_max = params.get("rayon_max", 100.0)
+
+    if nb_total > 1:
+        ratio = idx / (nb_total - 1)
+        current_angle = ang_start + ratio * (ang_end - ang_start)
+    else:
+        current_angle = (ang_start + ang_end) / 2
+
+    # L'angle est constant sur la ligne : seul le rayon dépend de t
+    current_r = r_min + t * (r_max - r_min)
+    x = p_x + current_r * math.cos(current_angle)
+    y = p_y + current_r * math.sin(current_angle)
+    nx = np.full_like(t, -math.sin(current_angle))
+    ny = np.full_like(t, math.cos(current_angle))
+    return ((x, y), (nx, ny))
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Eventail Centré (Bas)",
     "categorie": "Trajectoire Base",
@@ -59,4 +65,28 @@ def get_trajectoire(t, params):
     nx = -math.sin(angle_rad)
     ny = math.cos(angle_rad)
 
-    return ((x, y), (nx, ny))
\ No newline at end of file
+    return ((x, y), (nx, ny))
+
+def get_trajectoire_batch(t, params):
+    """Version tableau de get_trajectoire (t : tableau NumPy de 0 à 1)"""
+    h_brut = params.get("brut_h", 50.0)
+    pivot_x = 0.0
+    pivot_y = (-h_brut / 2) + params.get("decale_y", 0.0)
+
+    idx = params.get("line_index", 0)
+    nb_total = max(1, params.get("total_lines", 1))
+    deg_start = params.get("angle_debut", 45.0)
+    deg_end = params.get("angle_fin", 135.0)
+    if nb_total > 1:
+        ratio = idx / (nb_total - 1)
+        angle_deg = deg_start + ratio * (deg_end - deg_start)
+    else:
+        angle_deg = 90.0
+    angle_rad = math.radians(angle_deg)
+
+    current_dist = t * params.get("longueur", 100.0)
+    x = pivot_x + current_dist * math.cos(angle_rad)
+    y = pivot_y + current_dist * math.sin(angle_rad)
+    nx = np.full_like(t, -math.sin(angle_rad))
+    ny = np.full_like(t, math.cos(angle_rad))
+    return ((x, y), (nx, ny))
@@ -1,4 +1,10 @@
 # -*- coding: utf-8 -*-
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Ligne Droite",
     "categorie": "Trajectoire Base",
@@ -14,4 +20,11 @@ def get_trajectoire(t, params):
     # Centre la ligne en 0 (de -L/2 à +L/2)
     x = (t - 0.5) * l
     y = 0
-    return ((x, y), (0, 1))
\ No newline at end of file
+    return ((x, y), (0, 1))
+
+def get_trajectoire_batch(t, params):
+    """Version tableau de get_trajectoire (t : tableau NumPy de 0 à 1)"""
+    l = params.get("gen_len", 100.0)
+    x = (t - 0.5) * l
+    y = np.zeros_like(t)
+    return ((x, y), (np.zeros_like(t), np.ones_like(t)))
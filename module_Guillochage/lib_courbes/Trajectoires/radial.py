@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Radial",
     "categorie": "Trajectoire Circulaire",
@@ -44,4 +50,19 @@ def get_trajectoire(t, params):
     nx = -math.sin(angle)
     ny = math.cos(angle)
 
-    return ((x, y), (nx, ny))
\ No newline at end of file
+    return ((x, y), (nx, ny))
+
+def get_trajectoire_batch(t, params):
+    """Version tableau de get_trajectoire (t : tableau NumPy de 0 à 1)"""
+    i = params.get("line_index", 0)
+    nb_total = max(1, params.get("total_lines", 1))
+    angle = (i / nb_total) * 2 * math.pi
+    max_radius = params.get("gen_len", 100.0) / 2
+    min_radius = params.get("margin_in", 0.0)
+
+    current_r = min_radius + t * (max_radius - min_radius)
+    x = current_r * math.cos(angle)
+    y = current_r * math.sin(angle)
+    nx = np.full_like(t, -math.sin(angle))
+    ny = np.full_like(t, math.cos(angle))
+    return ((x, y), (nx, ny))
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Rosace",
     "categorie": "Trajectoire Circulaire",
@@ -73,4 +79,48 @@ def get_trajectoire(t, params):
         nx = dy_dt / norm_len
         ny = -dx_dt / norm_len
 
-    return ((x, y), (nx, ny))
\ No newline at end of file
+    return ((x, y), (nx, ny))
+
+def get_trajectoire_batch(t, params):
+    """Version tableau de get_trajectoire (t : tableau NumPy de 0 à 1)"""
+    i = params.get("line_index", 0)
+    nb_total = max(1, params.get("total_lines", 1))
+    max_radius_base = params.get("gen_len", 100.0) / 2
+    min_radius = params.get("margin_in", 0.0)
+    if nb_total > 1:
+        progress = i / (nb_total - 1)
+        r_base = min_radius + progress * (max_radius_base - min_radius)
+    else:
+        progress = 0
+        r_base = (min_radius + max_radius_base) / 2
+
+    nb_lobes = params.get("nb_petales", 12.0)
+    amp = params.get("amplitude", 2.0)
+    phase_deg = params.get("phase", 0.0)
+    torsade_factor = params.get("torsade", 0.0)
+
+    torsade_phase = 0
+    if nb_total > 1:
+        cycle_rad = (2 * math.pi) / nb_lobes if nb_lobes != 0 else 0
+        torsade_phase = progress * torsade_factor * cycle_rad
+    total_phase = math.radians(phase_deg) + torsade_phase
+
+    angle = t * 2 * math.pi
+    cos_a = np.cos(angle)
+    sin_a = np.sin(angle)
+    lobe = angle * nb_lobes + total_phase
+    r_actual = r_base + amp * np.cos(lobe)
+    x = r_actual * cos_a
+    y = r_actual * sin_a
+
+    dr_dtheta = -amp * nb_lobes * np.sin(lobe)
+    dx_dt = dr_dtheta * cos_a - r_actual * sin_a
+    dy_dt = dr_dtheta * sin_a + r_actual * cos_a
+    norm_len = np.sqrt(dx_dt * dx_dt + dy_dt * dy_dt)
+
+    # Normale radiale là où la vitesse s'annule (même repli que la version scalaire)
+    is_zero = norm_len == 0
+    safe_len = np.where(is_zero, 1.0, norm_len)
+    nx = np.where(is_zero, cos_a, dy_dt / safe_len)
+    ny = np.where(is_zero, sin_a, -dx_dt / safe_len)
+    return ((x, y), (nx, ny))
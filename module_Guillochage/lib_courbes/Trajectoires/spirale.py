@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 import math
 
+# NumPy n'est requis que pour l'entrée batch (appelée par le moteur vectorisé)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 INFO = {
     "nom": "Spirale (Colimaçon)",
     "categorie": "Trajectoire Circulaire",
@@ -83,4 +89,38 @@ def get_trajectoire(t, params):
             nx = -nx
             ny = -ny
 
-    return ((x, y), (nx, ny))
\ No newline at end of file
+    return ((x, y), (nx, ny))
+
+def get_trajectoire_batch(t, params):
+    """Version tableau de get_trajectoire (t : tableau NumPy de 0 à 1)"""
+    i = params.get("line_index", 0)
+    nb_total = max(1, params.get("total_lines", 1))
+    angle_offset = (i / nb_total) * 2 * math.pi
+    max_radius = params.get("gen_len", 100.0) / 2
+    min_radius = params.get("margin_in", 0.0)
+    nb_tours = params.get("tours", 15.0)
+    sens = params.get("sens_horaire", 1)
+
+    r = min_radius + t * (max_radius - min_radius)
+    theta = (t * nb_tours * 2 * math.pi * sens) + angle_offset
+    cos_t = np.cos(theta)
+    sin_t = np.sin(theta)
+    x = r * cos_t
+    y = r * sin_t
+
+    dr = max_radius - min_radius
+    dtheta = nb_tours * 2 * math.pi * sens
+    dx_dt = dr * cos_t - r * dtheta * sin_t
+    dy_dt = dr * sin_t + r * dtheta * cos_t
+    norm_len = np.sqrt(dx_dt**2 + dy_dt**2)
+
+    is_zero = norm_len == 0
+    safe_len = np.where(is_zero, 1.0, norm_len)
+    nx = np.where(is_zero, cos_t, dy_dt / safe_len)
+    ny = np.where(is_zero, sin_t, -dx_dt / safe_len)
+
+    # Même correction de sens que la version scalaire (normale vers l'extérieur)
+    flip = ~is_zero & ((nx * x + ny * y) < 0)
+    nx = np.where(flip, -nx, nx)
+    ny = np.where(flip, -ny, ny)
+    return ((x, y), (nx, ny))
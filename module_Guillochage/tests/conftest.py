@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Les modules du projet s'importent depuis le dossier module_Guillochage (comme au lancement)"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
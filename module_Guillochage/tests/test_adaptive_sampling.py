@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Échantillonnage adaptatif : la polyligne reste à moins de chord_tol de la courbe réelle"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from guillochage_bench import BRUT, BRUT_RECT, TIERS, scenarios
+from guillochage_engine import GuillochageEngine
+
+# Points de contrôle par intervalle (en plus des extrémités)
+DENSITY = 16
+
+
+def line_params(engine, layers, brut):
+    """Paramètres (ligne, contexte du brut) de chaque ligne calculée pour ce projet"""
+    calls = []
+    compute = engine._compute_line_segments
+    engine._compute_line_segments = lambda params, ctx: (calls.append((params, ctx)), compute(params, ctx))[1]
+    try: engine.calculate_geometry(layers, brut)
+    finally: del engine._compute_line_segments
+    return calls
+
+
+def max_deviation(engine, params, ctx):
+    """Plus grand écart (en fraction de chord_tol) entre la courbe, échantillonnée finement, et la polyligne"""
+    traj_func, geo = engine._line_setup(params, ctx)
+    t, x, y = engine._adaptive_samples_array(traj_func, params, geo)
+    frac = np.arange(1, DENSITY) / DENSITY
+    tt = (t[:-1, None] + (t[1:] - t[:-1])[:, None] * frac).ravel()
+    xt, yt = engine._line_points_at(traj_func, params, geo, tt)
+    rep = lambda v: np.repeat(v, DENSITY - 1)
+    dev = engine._chord_deviation_array(rep(x[:-1]), rep(y[:-1]), rep(x[1:]), rep(y[1:]), xt, yt)
+    return dev.max() / geo["chord_tol"]
+
+
+@pytest.mark.parametrize("brut", [BRUT, BRUT_RECT], ids=["rond", "rectangle"])
+@pytest.mark.parametrize("tier", list(TIERS))
+def test_presets_within_chord_tolerance(tier, brut):
+    engine = GuillochageEngine(vectorized=True)
+    engine.cache_enabled = False
+    for name, _, layers in scenarios([tier]):
+        calls = line_params(engine, layers, brut)
+        assert calls
+        worst = max(max_deviation(engine, params, ctx) for params, ctx in calls)
+        assert worst <= 1.0, f"{name} ({tier}) : écart {worst:.2f} × chord_tol"
+
+
+def test_scalar_and_array_samplers_agree():
+    engine = GuillochageEngine(vectorized=True)
+    engine.cache_enabled = False
+    for _, _, layers in scenarios(["faible"]):
+        for params, ctx in line_params(engine, layers, BRUT)[::5]:
+            traj_func, geo = engine._line_setup(params, ctx)
+            t, x, y = engine._adaptive_samples_array(traj_func, params, geo)
+            ts, pts = engine._adaptive_samples(traj_func, params, geo)
+            assert np.allclose(ts, t, rtol=0, atol=1e-12)
+            assert np.allclose(np.array(pts), np.column_stack((x, y)), rtol=0, atol=1e-9)
+
+
+def test_disabled_uses_fixed_steps():
+    engine = GuillochageEngine(vectorized=True)
+    engine.cache_enabled = False
+    engine.adaptive_sampling = False
+    _, _, layers = next(scenarios(["moyenne"]))
+    params, ctx = line_params(engine, layers, BRUT)[0]
+    traj_func, geo = engine._line_setup(params, ctx)
+    assert geo["chord_tol"] is None
+    x, _ = engine._compute_line_points_array(traj_func, params, geo)
+    assert len(x) == geo["steps"] + 1
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Découpe selon le brut : chaque extrémité coupée est sur le contour, aucun point n'en sort"""
+import math
+
+import pytest
+
+from guillochage_bench import TIERS, make_layer
+from guillochage_engine import GuillochageEngine, np
+
+TOL = 1e-9
+
+BRUTS = {
+    "cercle": {"type_index": 0, "dim1": 40.0, "dim2": 40.0, "radius": 0.0},
+    "ellipse": {"type_index": 0, "dim1": 44.0, "dim2": 30.0, "radius": 0.0},
+    "rectangle": {"type_index": 1, "dim1": 44.0, "dim2": 36.0, "radius": 0.0},
+    "rectangle_arrondi": {"type_index": 1, "dim1": 44.0, "dim2": 36.0, "radius": 6.0},
+}
+
+MODES = [False] + ([True] if np is not None else [])
+
+
+def outline_distance(brut, x, y):
+    """Distance signée au contour du brut (négative à l'intérieur)"""
+    rx, ry = brut["dim1"] / 2, brut["dim2"] / 2
+    if brut["type_index"] == 0:
+        # Ellipse : f / |grad f|, exact au premier ordre près du contour
+        f = (x / rx) ** 2 + (y / ry) ** 2 - 1
+        grad = 2 * math.hypot(x / (rx * rx), y / (ry * ry))
+        return f / grad if grad else -min(rx, ry)
+    r = min(brut["radius"], rx, ry)
+    qx, qy = abs(x) - (rx - r), abs(y) - (ry - r)
+    return math.hypot(max(qx, 0.0), max(qy, 0.0)) + min(max(qx, qy), 0.0) - r
+
+
+def clipped_lines(vectorized, brut, rotation):
+    """Segments découpés d'un calque de lignes droites ondulées qui débordent du brut des deux côtés"""
+    engine = GuillochageEngine(vectorized=vectorized)
+    engine.cache_enabled = False
+    layers = [make_layer("lignes", {"traj_type": "ligne_droite", "wave_type": "sinus", "nb_lines": 15.0,
+                                    "height": 38.0, "amplitude": 1.5, "period": 3.0, "rotation": rotation}, TIERS["moyenne"])]
+    return [list(zip(xs, ys)) for xs, ys, *_ in engine.calculate_geometry(layers, brut).iter_segments()]
+
+
+@pytest.mark.parametrize("vectorized", MODES, ids=lambda v: "tableau" if v else "scalaire")
+@pytest.mark.parametrize("rotation", [0.0, 35.0])
+@pytest.mark.parametrize("brut_name", list(BRUTS))
+def test_clipped_endpoints_on_outline(brut_name, rotation, vectorized):
+    brut = BRUTS[brut_name]
+    segments = clipped_lines(vectorized, brut, rotation)
+    assert segments
+    for seg in segments:
+        for x, y in (seg[0], seg[-1]):
+            assert abs(outline_distance(brut, x, y)) <= TOL, f"extrémité ({x}, {y}) hors contour"
+
+
+@pytest.mark.parametrize("vectorized", MODES, ids=lambda v: "tableau" if v else "scalaire")
+@pytest.mark.parametrize("rotation", [0.0, 35.0])
+@pytest.mark.parametrize("brut_name", list(BRUTS))
+def test_no_point_outside(brut_name, rotation, vectorized):
+    brut = BRUTS[brut_name]
+    for seg in clipped_lines(vectorized, brut, rotation):
+        worst = max(outline_distance(brut, x, y) for x, y in seg)
+        assert worst <= TOL, f"point à {worst} mm hors du brut"
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Cache par calque : identité par uid, les noms de calque pouvant se répéter"""
+import copy
+
+from guillochage_bench import BRUT, scenarios
+from guillochage_engine import GuillochageEngine
+
+
+def two_layers_same_name():
+    _, _, layers = next(scenarios(["faible"]))
+    first = copy.deepcopy(layers[0])
+    second = copy.deepcopy(layers[0])
+    first.update(uid=1, name="Calque 2")
+    second.update(uid=2, name="Calque 2")
+    second["data"]["global"]["rotation"] = 30.0
+    return [first, second]
+
+
+def test_duplicate_names_are_cached_separately():
+    engine = GuillochageEngine()
+    layers = two_layers_same_name()
+    first = engine.calculate_geometry(layers, BRUT)
+    assert set(engine.layer_cache) == {1, 2}
+    engine.perf.enabled = True
+    again = engine.calculate_geometry(layers, BRUT)
+    assert engine.last_stats["counters"]["calques_en_cache"] == 2
+    assert again.point_count == first.point_count
+    assert set(again.layer_versions) == {1, 2}
+
+
+def test_change_to_first_duplicate_changes_its_version():
+    engine = GuillochageEngine()
+    layers = two_layers_same_name()
+    before = engine.calculate_geometry(layers, BRUT).layer_versions
+    layers[0]["data"]["global"]["amplitude"] = 0.5
+    after = engine.calculate_geometry(layers, BRUT).layer_versions
+    assert before[1] != after[1]
+    assert before[2] == after[2]
+    assert after[1][0] == "Calque 2"
+
+
+def test_layers_without_uid_use_position():
+    engine = GuillochageEngine()
+    layers = two_layers_same_name()
+    for layer in layers: del layer["uid"]
+    versions = engine.calculate_geometry(layers, BRUT).layer_versions
+    assert set(versions) == {("position", 0), ("position", 1)}
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Calcul abandonné : un résultat dépassé ne coûte rien, même quand toutes ses lignes sont en cache"""
+import pytest
+
+from guillochage_bench import BRUT, scenarios
+from guillochage_engine import CalculationCancelled, GuillochageEngine
+
+
+def project():
+    _, _, layers = next(scenarios(["faible"]))
+    return layers
+
+
+def test_cancel_before_any_work():
+    engine = GuillochageEngine()
+    calls = []
+    engine._line_cache_key = lambda *args: calls.append(args)
+    with pytest.raises(CalculationCancelled):
+        engine.calculate_geometry(project(), BRUT, cancel=lambda: True)
+    assert not calls
+
+
+def test_cancel_with_cached_lines():
+    engine = GuillochageEngine()
+    layers = project()
+    engine.calculate_geometry(layers, BRUT)
+    engine.layer_cache.clear()
+    # Tout est en cache ligne : l'annulation doit tomber avant l'assemblage
+    checks = []
+    def cancel():
+        checks.append(len(checks))
+        return len(checks) > 2
+    with pytest.raises(CalculationCancelled):
+        engine.calculate_geometry(layers, BRUT, cancel=cancel)
+    assert not engine.layer_cache
+
+
+def test_not_cancelled_matches_plain_call():
+    layers = project()
+    plain = GuillochageEngine().calculate_geometry(layers, BRUT)
+    checked = GuillochageEngine().calculate_geometry(layers, BRUT, cancel=lambda: False)
+    assert len(plain) == len(checked) and plain.point_count == checked.point_count
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""Mode tableau (NumPy) : mêmes points que la boucle scalaire de référence, à pas fixe"""
+import glob
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from guillochage_bench import BRUT, TIERS, current_dir, make_layer
+from guillochage_engine import GuillochageEngine
+
+TRAJECTOIRES = sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(current_dir, "lib_courbes", "Trajectoires", "*.py")))
+ONDES = ["sinus", "triangle", "carre", "rebond"]
+
+
+def line_params(engine, layers):
+    """Paramètres (ligne, contexte du brut) de chaque ligne calculée pour ce projet"""
+    calls = []
+    compute = engine._compute_line_segments
+    engine._compute_line_segments = lambda params, ctx: (calls.append((params, ctx)), compute(params, ctx))[1]
+    try: engine.calculate_geometry(layers, BRUT)
+    finally: del engine._compute_line_segments
+    return calls
+
+
+def both_paths(engine, traj_func, params, geo):
+    scalar = np.array(engine._compute_line_points(traj_func, params, geo))
+    x, y = engine._compute_line_points_array(traj_func, params, geo)
+    return scalar, np.column_stack((x, y))
+
+
+@pytest.fixture
+def engine():
+    engine = GuillochageEngine(vectorized=True)
+    engine.cache_enabled = False
+    engine.adaptive_sampling = False
+    return engine
+
+
+@pytest.mark.parametrize("wave", ONDES)
+@pytest.mark.parametrize("traj", TRAJECTOIRES)
+def test_scalar_and_array_points_match(engine, traj, wave):
+    layers = [make_layer(traj, {"traj_type": traj, "wave_type": wave, "nb_lines": 4.0, "flambage": wave == "rebond"}, TIERS["faible"])]
+    calls = line_params(engine, layers)
+    assert calls
+    for params, ctx in calls:
+        traj_func, geo = engine._line_setup(params, ctx)
+        assert geo["chord_tol"] is None
+        scalar, array = both_paths(engine, traj_func, params, geo)
+        assert array.shape == scalar.shape
+        assert np.allclose(array, scalar, rtol=0, atol=1e-9)
+
+
+def test_square_wave_matches_on_discontinuities(engine):
+    """Phase choisie pour qu'un échantillon tombe pile sur un front du carré : les deux modes donnent le même côté"""
+    params, ctx = line_params(engine, [make_layer("carre", {"traj_type": "rosace", "wave_type": "carre", "nb_lines": 2.0}, TIERS["moyenne"])])[0]
+    traj_func, geo = engine._line_setup(params, ctx)
+    steps = geo["steps"]
+    for j in range(1, steps, 7):
+        dist = (j / steps) * geo["gen_len"] - geo["start_offset_mm"]
+        for front in (0.5, 1.0):
+            geo["phase_user"] = front - dist * geo["cycles_per_mm"]
+            scalar, array = both_paths(engine, traj_func, params, geo)
+            assert np.allclose(array, scalar, rtol=0, atol=1e-9), f"échantillon {j}, front {front}"